@@ -1,46 +1,121 @@
+import os
+
 import streamlit as st
-import plotly.express as px
 import pandas as pd
 
 # Importando as funções dos módulos
 from src.data_loader import load_data
 from src.analysis_utils import prepare_data, train_model, analyze_top_winners, analyze_average_attributes, \
     analyze_win_distribution
-from src.analysis_types import analyze_type_win_rate
+from src.analysis_types import analyze_type_win_rate, analyze_type_matchups, analyze_win_rate_intervals, \
+    TYPE_MATCHUP_LEVELS
+from src.team_builder import suggest_teams
+from src.prediction import MATCHUP_BUILD_COMMAND, MatchupMatrixNotFound
+from src.sql_backend import get_sql_backend
+from src.filter_index import get_filter_index
+from src.head_to_head import get_head_to_head_index
+from src.confidence import BOOTSTRAP_REPLICATES, wilson_columns, wilson_interval
+from src.charts import figure_average_attributes, figure_importance, figure_ratings, figure_top_winners, \
+    figure_type_matchups, figure_type_win_rate, figure_win_distribution, interval_bounds
+from src.ratings import analyze_ratings
+from src.scheduler import Stage, run_stages, streamlit_thread_initializer
+from src.instrumentation import enable_memory_tracking, disable_memory_tracking, collect_records, \
+    summarize_records, export_json, export_prometheus
 
 # --- Constantes de Arquivo ---
 FILE_POKEMON_REF = "pokemon.xlsx"
 FILE_COMBAT_REF = "combat_pokemon.xlsx"
 
-# --- Configuração ---
-st.set_page_config(layout="wide", page_title="Análise de Combate Pokémon")
+# Perfil de treino do modelo de importância (ver src/training.py): full, parallel, subsample ou hist_gb
+TRAINING_PROFILE = os.environ.get("POKEMON_TRAINING_PROFILE", "full")
 
-st.title("📊 Análise de Combate Pokémon")
+# Backend das análises agregadas (ver src/sql_backend.py): pandas (padrão) ou sql
+ANALYSIS_BACKEND = os.environ.get("POKEMON_ANALYSIS_BACKEND", "pandas")
 
-try:
-    # 1. Carregamento dos Dados
-    df_pokemon, df_combat = load_data(FILE_POKEMON_REF, FILE_COMBAT_REF)
+# Número de combinações de tipos (as com mais combates) exibidas na matriz de confrontos
+TOP_TYPE_COMBINATIONS = 25
+
+# Número de Pokémon exibidos no gráfico do ranking por rating
+TOP_RATINGS = 20
+
+# Escopos das análises filtradas (ver src/filter_index.py)
+FILTER_SCOPE_LABELS = {
+    'pokemon': "Todos os combates dos Pokémon filtrados",
+    'battles': "Apenas combates entre Pokémon filtrados",
+}
+
+# --- Seções da Página ---
+# Cada seção é desenhada a partir do resultado da sua etapa de análise (ver `SECTIONS`).
+
+
+def sidebar_filters(df_pokemon, type_names):
+    """
+    Filtros da barra lateral para as seções 2, 3 e 5. Retorna None quando nenhum filtro está ativo.
+    """
+    with st.sidebar:
+        st.header("🔎 Filtros")
+        generations = st.multiselect("Geração", sorted(df_pokemon['generation'].unique().tolist()))
+        legendary = st.radio("Status", ["Todos", "Lendários", "Não Lendários"], horizontal=True)
+        types = st.multiselect("Tipo", type_names)
+        scope = st.radio("Combates considerados", list(FILTER_SCOPE_LABELS), format_func=FILTER_SCOPE_LABELS.get)
+        st.caption("Os filtros valem para a taxa de vitória por tipo, o Top N e a distribuição de vitórias.")
+
+    if not generations and legendary == "Todos" and not types:
+        return None
+    return {'generations': generations, 'types': types, 'scope': scope,
+            'legendary': None if legendary == "Todos" else legendary == "Lendários"}
 
-    # 2. Análise de Atributos
-    st.header("1. Importância de Atributos e Status Lendário na Vitória")
 
-    # Prepara e treina o modelo
+def compute_importance(df_pokemon, df_combat):
+    """
+    Prepara as features e treina (ou lê do registro) o modelo de importância de atributos.
+    """
     df_final, feature_cols = prepare_data(df_pokemon, df_combat)
-    importance_df = train_model(df_final, feature_cols)
+    return train_model(df_final, feature_cols, profile=TRAINING_PROFILE)
+
+
+def compute_type_matchups(df_pokemon, df_combat):
+    """
+    Matriz de confrontos para os dois níveis (tipos individuais e combinações de tipos).
+    """
+    return {level: analyze_type_matchups(df_pokemon, df_combat, level) for level in TYPE_MATCHUP_LEVELS}
+
+
+def compute_teams(df_pokemon, df_combat):
+    """
+    Equipe sugerida a partir da matriz de confrontos calculada offline; None se ela ainda não existir.
+    """
+    try:
+        return suggest_teams(df_pokemon, df_combat, profile=TRAINING_PROFILE)
+    except MatchupMatrixNotFound:
+        return None
+
+
+def with_bootstrap_intervals(compute, df_pokemon, df_combat, key):
+    """
+    Etapa que junta à tabela de `compute()` os intervalos bootstrap sobre todos os combates,
+    por tipo (`key='Tipo'`) ou por Pokémon (`key='id'`).
+    """
+    def stage():
+        df_type_intervals, df_pokemon_intervals = analyze_win_rate_intervals(df_pokemon, df_combat)
+        df_intervals = df_type_intervals if key == 'Tipo' else df_pokemon_intervals
+        return compute().merge(df_intervals, on=key, how='left')
+    return stage
+
+
+def interval_caption(low_col):
+    if low_col.startswith('IC Bootstrap'):
+        return (f"Barras de erro: intervalo de confiança de 95% por bootstrap ({BOOTSTRAP_REPLICATES} reamostragens "
+                "dos combates). A tabela traz também o intervalo de Wilson.")
+    return "Barras de erro: intervalo de confiança de 95% de Wilson, calculado sobre os combates considerados."
+
+
+def render_importance(importance_df):
+    # 2. Análise de Atributos
+    st.header("1. Importância de Atributos e Status Lendário na Vitória")
 
     # Gráfico de Importância
-    fig_attr = px.bar(
-        importance_df,
-        x='Atributo',
-        y='Importância',
-        color='Importância',
-        color_continuous_scale=px.colors.sequential.Teal,
-        title='Importância da Diferença de Atributos e Status Lendário (Random Forest)',
-        labels={'Importância': 'Importância Relativa (%)', 'Atributo': 'Atributo Pokémon'}
-        # =================================================
-    )
-    fig_attr.update_layout(xaxis={'categoryorder': 'total descending'}, height=500)
-    st.plotly_chart(fig_attr, use_container_width=True)
+    st.plotly_chart(figure_importance(importance_df), use_container_width=True)
 
     # Nova Interpretação
     st.markdown("### Interpretação da Importância")
@@ -52,28 +127,25 @@ try:
         """)
     st.markdown("---")
 
+
+def render_type_win_rate(df_win_rate):
     # 3. Análise de Tipos
     st.header("2. Taxa de Vitória por Tipo de Pokémon")
     st.markdown("""
     Esta análise calcula a porcentagem de vitórias para cada Tipo (considerando Tipos primário e secundário) em todos os combates.
     """)
 
-    df_win_rate = analyze_type_win_rate(df_pokemon, df_combat)
+    if df_win_rate.empty:
+        st.warning("Nenhum combate para os filtros selecionados.")
+        st.markdown("---")
+        return
 
-    # Gráfico de Taxa de Vitória
-    fig_type = px.bar(
-        df_win_rate,
-        x='Tipo',
-        y='Taxa de Vitória (%)',
-        color='Taxa de Vitória (%)',
-        color_continuous_scale=px.colors.sequential.Viridis,
-        title='Taxa de Vitória Média por Tipo de Pokémon',
-        hover_data=['Total de Combates', 'Total de Vitórias']
-    )
-    fig_type.update_layout(xaxis={'categoryorder': 'total descending'},
-                           height=550, yaxis_range=[30, df_win_rate['Taxa de Vitória (%)'].max() * 1.05])
+    # Intervalo de Wilson a partir das contagens exibidas (vale também com filtros e no backend SQL)
+    df_win_rate = wilson_columns(df_win_rate)
 
-    st.plotly_chart(fig_type, use_container_width=True)
+    # Gráfico de Taxa de Vitória, com o intervalo de confiança de 95% nas barras de erro
+    st.plotly_chart(figure_type_win_rate(df_win_rate), use_container_width=True)
+    st.caption(interval_caption(interval_bounds(df_win_rate)[0]))
 
     # Nova Interpretação
     st.markdown("### Interpretação da Importância")
@@ -88,43 +160,38 @@ try:
 
     st.markdown("---")
 
+
+def render_top_winners(df_sorted_winners):
     # --- Seção 3: Top N Vencedores ---
     st.header("3. 🥇 Top N Pokémon com Mais Vitórias (Barra Horizontal)")
 
-    df_sorted_winners = analyze_top_winners(df_pokemon, df_combat)
-
-    # Adiciona o Slider
+    # Adiciona o Slider (com filtros, pode haver poucos Pokémon)
     max_pokemons = len(df_sorted_winners)
-    top_n = st.slider(
-        'Selecione o número de Pokémon a serem exibidos (Top N):',
-        min_value=5,
-        max_value=min(25, max_pokemons),
-        value=10,
-        step=1
-    )
+    if max_pokemons == 0:
+        st.warning("Nenhum Pokémon com combates para os filtros selecionados.")
+        st.markdown("---")
+        return
+    if max_pokemons <= 5:
+        top_n = max_pokemons
+    else:
+        top_n = st.slider(
+            'Selecione o número de Pokémon a serem exibidos (Top N):',
+            min_value=5,
+            max_value=min(25, max_pokemons),
+            value=min(10, max_pokemons),
+            step=1
+        )
 
     st.markdown(f"**Exibindo os Top {top_n} Pokémon** com o maior número de vitórias.")
 
-    df_top_winners = df_sorted_winners.head(top_n)
-
-    # CÓDIGO: GRÁFICO DE BARRA HORIZONTAL
-    fig_winners = px.bar(
-        df_top_winners,
-        x='Total de Vitórias',  # X agora é o valor (vitórias)
-        y='name',  # Y agora são os nomes dos Pokémon
-        orientation='h',  # Define como horizontal
-        color='Total de Vitórias',
-        color_continuous_scale=px.colors.sequential.Sunset,
-        title=f'Top {top_n} Pokémon pelo Número Absoluto de Vitórias',
-        labels={'name': 'Pokémon', 'Total de Vitórias': 'Total de Vitórias'},
-        hover_data=['Taxa de Vitória (%)', 'Total de Combates']
-    )
-
-    # Inverte o eixo Y para ter o Pokémon #1 no topo
-    fig_winners.update_layout(yaxis={'categoryorder': 'total ascending'},
-                              height=550, xaxis_range=[110, df_top_winners['Total de Vitórias'].max() * 1.01])
+    df_top_winners = wilson_columns(df_sorted_winners.head(top_n))
 
-    st.plotly_chart(fig_winners, use_container_width=True)
+    # CÓDIGO: GRÁFICO DE BARRA HORIZONTAL (a única figura que depende do slider)
+    st.plotly_chart(figure_top_winners(df_top_winners), use_container_width=True)
+    if 'Vitórias IC Inferior' in df_top_winners.columns:
+        st.caption(f"Barras de erro: intervalo de 95% do número de vitórias por bootstrap ({BOOTSTRAP_REPLICATES} "
+                   "reamostragens dos combates). A taxa de vitória de cada Pokémon traz os intervalos de Wilson e "
+                   "bootstrap na tabela.")
 
     # Nova Interpretação
     st.markdown("### Interpretação da Importância")
@@ -139,6 +206,8 @@ try:
 
     st.markdown("---")
 
+
+def render_average_attributes(df_avg_attr):
     # --- Seção 4: Comparativo de Atributos Médios ---
     st.header("4. 🕸️ Comparativo: Perfil Médio de Atributos (Radar Chart)")
     st.markdown("""
@@ -146,35 +215,8 @@ try:
     O formato do polígono visualiza a superioridade relativa em cada atributo.
     """)
 
-    df_avg_attr = analyze_average_attributes(df_pokemon)
-
-    # Define a ordem desejada e as cores (reutilizamos as definições anteriores)
-    status_order = ["Não Lendário", "Média Geral", "Lendário"]
-    color_map = {
-        "Não Lendário": "#3336DE",
-        "Média Geral": "#33a02c",
-        "Lendário": "#e31a1c"
-    }
-
-    # Ordena o DataFrame (IMPORTANTE para o Plotly)
-    df_avg_attr['Status'] = pd.Categorical(df_avg_attr['Status'], categories=status_order, ordered=True)
-    df_avg_attr = df_avg_attr.sort_values(['Atributo', 'Status'])
-
     # === GRÁFICO DE TEIA (RADAR CHART) ===
-    fig_avg = px.line_polar(
-        df_avg_attr,
-        r='Média do Atributo',  # O raio (distância do centro)
-        theta='Atributo',  # O ângulo (os atributos: HP, Attack, etc.)
-        color='Status',  # As diferentes linhas/polígonos
-        line_close=True,  # Fecha o polígono
-        color_discrete_map=color_map,
-        title='Perfil dos Atributos de Pokémon: Lendários, Não Lendários e Média Geral'
-    )
-
-    fig_avg.update_traces(fill='toself')  # Preenche a área do polígono
-    fig_avg.update_layout(height=650)  # Altura maior é melhor para Radar Chart
-
-    st.plotly_chart(fig_avg, use_container_width=True)
+    st.plotly_chart(figure_average_attributes(df_avg_attr), use_container_width=True)
 
     st.subheader("Interpretação:")
     st.markdown(f"""
@@ -184,6 +226,8 @@ try:
 
     st.markdown("---")
 
+
+def render_win_distribution(df_win_dist):
     # --- NOVA SEÇÃO 5: Distribuição de Vitórias ---
     st.header("5. 📈 Distribuição de Vitórias por Pokémon (Concentração de Poder)")
     st.markdown("""
@@ -191,23 +235,13 @@ try:
         Uma distribuição "alta" em vitórias baixas e "rabo longo" em vitórias altas indica que pouquíssimos Pokémon concentram a maioria dos sucessos.
         """)
 
-    df_win_dist = analyze_win_distribution(df_combat)
+    if df_win_dist.empty:
+        st.warning("Nenhuma vitória para os filtros selecionados.")
+        st.markdown("---")
+        return
 
     # Calcula o número de bins (faixas) ideal. 30 é um bom padrão.
-    n_bins = 30
-
-    fig_dist = px.histogram(
-        df_win_dist,
-        x='Total de Vitórias',
-        nbins=n_bins,
-        title='Distribuição da Contagem de Vitórias entre todos os Pokémon',
-        labels={'Total de Vitórias': 'Número de Vitórias por Pokémon', 'count': 'Número de Pokémon nessa Faixa'},
-        color_discrete_sequence=['#4c78a8']  # Cor simples
-    )
-
-    fig_dist.update_layout(bargap=0.05, height=550)  # Espaçamento entre as barras
-
-    st.plotly_chart(fig_dist, use_container_width=True)
+    st.plotly_chart(figure_win_distribution(df_win_dist, n_bins=30), use_container_width=True)
 
     st.subheader("Interpretação da Distribuição:")
     st.markdown("""
@@ -217,8 +251,103 @@ try:
 
     st.markdown("---")
 
-    # --- Seção 6: Conclusão e Montagem da Equipe Ideal ---
-    st.header("6. 🏆 Conclusão: Montagem da Equipe Ideal")
+
+def render_type_matchups(matchups):
+    # --- Seção 6: Matriz de Confrontos entre Tipos ---
+    st.header("6. ⚔️ Matriz de Confrontos entre Tipos")
+    st.markdown("""
+        Cada célula mostra a taxa de vitória dos Pokémon do tipo da linha contra os Pokémon do tipo da coluna.
+        Pokémon com dois tipos contam para os dois; no nível de combinações, cada combinação (ex.: Fire/Flying) é uma categoria.
+        """)
+
+    level = st.radio("Nível", TYPE_MATCHUP_LEVELS, horizontal=True,
+                     format_func={'type': "Tipos individuais", 'combination': "Combinações de tipos"}.get)
+    df_matchups = matchups[level]
+
+    if level == 'combination':
+        # Apenas as combinações com mais combates, para manter a matriz legível
+        battles = df_matchups.groupby('Tipo')['Total de Combates'].sum()
+        top_labels = battles.nlargest(TOP_TYPE_COMBINATIONS).index
+        df_matchups = df_matchups[df_matchups['Tipo'].isin(top_labels) & df_matchups['Tipo do Oponente'].isin(top_labels)]
+        st.caption(f"Exibindo as {len(top_labels)} combinações de tipos com mais combates.")
+
+    st.plotly_chart(figure_type_matchups(df_matchups), use_container_width=True)
+
+    with st.expander("Ver Tabela de Confrontos (com intervalos de confiança de 95%)"):
+        st.dataframe(df_matchups.sort_values('Total de Combates', ascending=False), hide_index=True)
+
+    st.markdown("---")
+
+
+def render_matchup_explorer(explorer):
+    # --- Seção 7: Explorador de Confrontos Diretos ---
+    st.header("7. 🔍 Explorador de Confrontos Diretos")
+    st.markdown("""
+        Escolha um Pokémon e um dos oponentes que ele já enfrentou para ver o histórico de confrontos diretos entre os dois.
+        """)
+
+    index, df_names = explorer
+    names = dict(zip(df_names['id'].tolist(), df_names['name'].tolist()))
+
+    def label(pokemon_id):
+        return f"{names.get(pokemon_id, 'Sem cadastro')} (#{pokemon_id})"
+
+    col_pokemon, col_opponent = st.columns(2)
+    pokemon_id = col_pokemon.selectbox("Pokémon", sorted(names), format_func=label)
+
+    # Oponentes com mais combates diretos primeiro
+    df_opponents = index.opponents(pokemon_id).sort_values(['Total de Combates', 'id'], ascending=[False, True])
+    if df_opponents.empty:
+        st.warning("Este Pokémon não participou de nenhum combate.")
+        st.markdown("---")
+        return
+    opponent_id = col_opponent.selectbox("Oponente", df_opponents['id'].tolist(), format_func=label)
+
+    result = index.lookup(pokemon_id, opponent_id)
+    battles = result.wins + result.losses
+    low, high = wilson_interval(result.wins, battles)
+
+    col_battles, col_wins, col_rate = st.columns(3)
+    col_battles.metric("Combates", battles)
+    col_wins.metric("Vitórias / Derrotas", f"{result.wins} / {result.losses}")
+    col_rate.metric("Taxa de Vitória", f"{result.wins / battles * 100:.0f}%",
+                    help=f"Intervalo de confiança de 95% (Wilson): {low * 100:.0f}% a {high * 100:.0f}%")
+
+    st.dataframe(pd.DataFrame({'battle_id': result.battle_ids, 'Vencedor': [label(w) for w in result.winners.tolist()]}),
+                 hide_index=True)
+
+    with st.expander(f"Ver histórico de {label(pokemon_id)} contra todos os oponentes"):
+        df_opponents.insert(1, 'Oponente', df_opponents['id'].map(label))
+        st.dataframe(df_opponents.drop(columns=['id']), hide_index=True)
+
+    st.markdown("---")
+
+
+def render_ratings(df_ratings):
+    # --- Seção 8: Ranking por Força (Bradley-Terry) ---
+    st.header("8. 📐 Ranking por Força do Pokémon (Bradley-Terry)")
+    st.markdown("""
+        O número absoluto de vitórias depende de quantas vezes cada Pokémon lutou e de quem ele enfrentou.
+        O rating de Bradley-Terry estima a força de cada Pokémon a partir de todos os confrontos, levando em conta a força dos oponentes:
+        uma diferença de 400 pontos corresponde a uma chance de vitória de 10 para 1.
+        """)
+
+    df_top = df_ratings.head(TOP_RATINGS).copy()
+    df_top['name'] = df_top['name'].fillna('#' + df_top['id'].astype(str))
+
+    st.plotly_chart(figure_ratings(df_top), use_container_width=True)
+
+    with st.expander("Ver Ranking Completo (Rating × Posição por Vitórias)"):
+        st.dataframe(wilson_columns(df_ratings).set_index('Posição').round(
+            {'Força': 4, 'Rating': 0, 'Taxa de Vitória (%)': 2, 'IC Wilson Inferior (%)': 2,
+             'IC Wilson Superior (%)': 2}))
+
+    st.markdown("---")
+
+
+def render_team(team_result):
+    # --- Seção 9: Conclusão e Montagem da Equipe Ideal ---
+    st.header("9. 🏆 Conclusão: Montagem da Equipe Ideal")
     st.markdown("""
         Uma equipe padrão em Pokémon é composta por 6 Pokémons's, 
         com base nas análises de importância de atributos, taxa de vitória por tipo e desempenho individual, propomos uma equipe de 6 Pokémon com a maior probabilidade de sucesso.
@@ -264,33 +393,145 @@ try:
 
     st.subheader("⚔️ Passo 3 – Equipe Ideal Sugerida")
 
-    data_equipe = {
-        'Função': ['🐉 Ofensivo 1', '🔥 Ofensivo 2', '🧠 Versátil 1', '⚙️ Versátil 2', '🛡️ Tanque 1', '🌑 Tanque 2'],
-        'Pokémon': ['Mega Rayquaza', 'Infernape', 'Mewtwo', 'Jirachi', 'Mega Salamence', 'Mega Houndoom'],
-        'Tipo(s)': ['Dragon / Flying', 'Fire / Fighting', 'Psychic', 'Steel / Psychic', 'Dragon / Flying',
-                    'Dark / Fire'],
-        'Motivo Principal': [
-            'Altíssimo ataque e velocidade, ótimo contra quase tudo.',
-            'Rápido e versátil, excelente contra Steel, Ice, e Normal.',
-            'Domina em Sp. Attack e velocidade, alto winrate individual.',
-            'Boa defesa e velocidade, cobertura contra Fairy e Ice.',
-            'Excelente bulk e dano, cobre vulnerabilidade de Psychic.',
-            'Contra-ataca Psychic e Grass, cobre fraqueza de Steel.'
-        ]
-    }
-    df_equipe = pd.DataFrame(data_equipe)
-    st.dataframe(df_equipe, hide_index=True)
-
-    st.markdown("### 🧬 Resultado Esperado:")
     st.markdown("""
-        * **Cobertura de Tipos:** Flying, Dragon, Fire, Psychic, Fighting, Steel, Dark.
-        * **Taxa Estimada de Vitória da Equipe (Modelo Agregado):** **~86–88%**, com base na média ponderada das vitórias individuais e sinergias de tipo.
+        A equipe é escolhida por uma busca (beam search) entre os melhores candidatos de cada função, pontuando cada
+        combinação pela taxa de vitória individual, pela taxa de vitória dos tipos e pela probabilidade prevista de vencer
+        cada oponente na matriz de confrontos do modelo.
         """)
-except FileNotFoundError as e:
-    st.error(
-        f"Erro: Arquivos Excel não encontrados. Verifique se '{FILE_POKEMON_REF}' e '{FILE_COMBAT_REF}' estão na mesma pasta do 'app.py' ou se o caminho está correto.")
-except Exception as e:
-    st.error(
-        f"Ocorreu um erro na execução do script. Verifique se todas as bibliotecas estão instaladas (`pandas`, `openpyxl`, `scikit-learn`, `plotly`).")
-
-    st.exception(e)
+
+    if team_result is None:
+        st.warning("A matriz de confrontos do modelo ainda não foi calculada para os dados atuais.")
+        st.info(f"Calcule-a uma vez, fora do app, com `{MATCHUP_BUILD_COMMAND} --profile {TRAINING_PROFILE}` "
+                "e recarregue a página.")
+        return
+
+    df_teams, df_equipe, estimated_win_rate = team_result
+
+    if df_equipe.empty:
+        st.warning("Nenhuma equipe atende às regras de função e cobertura de tipos com os dados atuais.")
+    else:
+        st.dataframe(df_equipe, hide_index=True)
+
+        team_types = sorted({t.strip() for types in df_equipe['Tipo(s)'] for t in types.split('/')})
+        st.markdown("### 🧬 Resultado Esperado:")
+        st.markdown(f"""
+            * **Cobertura de Tipos:** {', '.join(team_types)}.
+            * **Taxa Estimada de Vitória da Equipe (Matriz de Confrontos):** **~{estimated_win_rate:.0f}%**, probabilidade média de um membro da equipe vencer um oponente qualquer.
+            """)
+
+        with st.expander("Ver Ranking das Melhores Equipes"):
+            st.dataframe(df_teams.drop(columns=['ids']), hide_index=True)
+
+
+def render_debug_panel(records):
+    """
+    Painel lateral com a instrumentação das etapas desta execução (ver src/instrumentation.py).
+    """
+    with st.sidebar:
+        st.header("🐞 Depuração")
+        st.caption("Tempo, pico de memória, linhas de entrada e acertos de cache de cada etapa nesta execução "
+                   "(as figuras aparecem como `figure_*`).")
+        st.dataframe(summarize_records(records).round(4), hide_index=True)
+        st.download_button("Exportar JSON", export_json(records), file_name="instrumentacao.json",
+                           mime="application/json")
+        st.download_button("Exportar Prometheus", export_prometheus(records), file_name="instrumentacao.prom",
+                           mime="text/plain")
+
+
+# Ordem das seções na página: (etapa, título exibido enquanto calcula, função de desenho)
+SECTIONS = [
+    ('importance', "1. Importância de Atributos", render_importance),
+    ('types', "2. Taxa de Vitória por Tipo", render_type_win_rate),
+    ('top_winners', "3. Top N Pokémon com Mais Vitórias", render_top_winners),
+    ('average', "4. Perfil Médio de Atributos", render_average_attributes),
+    ('distribution', "5. Distribuição de Vitórias", render_win_distribution),
+    ('matchups', "6. Matriz de Confrontos entre Tipos", render_type_matchups),
+    ('explorer', "7. Explorador de Confrontos Diretos", render_matchup_explorer),
+    ('ratings', "8. Ranking por Força (Bradley-Terry)", render_ratings),
+    ('teams', "9. Montagem da Equipe Ideal", render_team),
+]
+
+
+# --- Configuração ---
+st.set_page_config(layout="wide", page_title="Análise de Combate Pokémon")
+
+st.title("📊 Análise de Combate Pokémon")
+
+# Painel de depuração opcional; o pico de memória só é medido com ele ligado (o rastreamento é
+# desligado ao fim da execução, quando nenhuma outra sessão com o painel ligado o usa)
+debug_mode = st.sidebar.checkbox("🐞 Painel de depuração", value=os.environ.get("POKEMON_DEBUG") == "1")
+if debug_mode:
+    enable_memory_tracking()
+
+# Apenas os registros desta execução (inclusive os das etapas em threads), sem os de outras sessões
+with collect_records() as run_records:
+    try:
+        # 1. Carregamento dos Dados
+        df_pokemon, df_combat = load_data(FILE_POKEMON_REF, FILE_COMBAT_REF)
+
+        # 2. Etapas de análise: independentes entre si depois da carga, executadas em paralelo
+        analyses = {
+            'types': lambda: analyze_type_win_rate(df_pokemon, df_combat),
+            'top_winners': lambda: analyze_top_winners(df_pokemon, df_combat),
+            'average': lambda: analyze_average_attributes(df_pokemon),
+            'distribution': lambda: analyze_win_distribution(df_combat),
+        }
+        if ANALYSIS_BACKEND == "sql":
+            backend = get_sql_backend(df_pokemon, df_combat)
+            analyses = {'types': backend.type_win_rate, 'top_winners': backend.top_winners,
+                        'average': backend.average_attributes, 'distribution': backend.win_distribution}
+
+        # Com filtros ativos, as seções filtráveis são servidas pelo índice pré-calculado
+        filters = sidebar_filters(df_pokemon, df_pokemon['type1'].cat.categories.tolist())
+        if filters is not None:
+            index = get_filter_index(df_pokemon, df_combat)
+            analyses.update({
+                'types': lambda: index.type_win_rate(**filters),
+                'top_winners': lambda: index.top_winners(**filters),
+                'distribution': lambda: index.win_distribution(**filters),
+            })
+        else:
+            # Sem filtros, as taxas por tipo e por Pokémon ganham os intervalos bootstrap sobre todos os combates
+            analyses['types'] = with_bootstrap_intervals(analyses['types'], df_pokemon, df_combat, 'Tipo')
+            analyses['top_winners'] = with_bootstrap_intervals(analyses['top_winners'], df_pokemon, df_combat, 'id')
+
+        stages = [
+            Stage('importance', lambda: compute_importance(df_pokemon, df_combat)),
+            *(Stage(name, func) for name, func in analyses.items()),
+            Stage('matchups', lambda: compute_type_matchups(df_pokemon, df_combat)),
+            Stage('explorer', lambda: (get_head_to_head_index(df_combat), df_pokemon[['id', 'name']])),
+            Stage('ratings', lambda: analyze_ratings(df_pokemon, df_combat)),
+            # A equipe lê a matriz de confrontos calculada offline e reaproveita a taxa por tipo já em cache
+            Stage('teams', lambda: compute_teams(df_pokemon, df_combat), deps=('types',)),
+        ]
+
+        # 3. Um espaço reservado por seção, na ordem da página, preenchido assim que a etapa termina
+        slots = {}
+        for name, title, _ in SECTIONS:
+            slots[name] = st.empty()
+            slots[name].info(f"⏳ Calculando: {title}...")
+        renderers = {name: render for name, _, render in SECTIONS}
+
+        timings = []
+        for stage in run_stages(stages, initializer=streamlit_thread_initializer()):
+            with slots[stage.name].container():
+                renderers[stage.name](stage.result)
+            timings.append({'Etapa': stage.name, 'Duração (s)': round(stage.elapsed, 3),
+                            'Pronta após (s)': round(stage.finished_at, 3)})
+
+        with st.expander("⏱️ Tempo de processamento por seção"):
+            st.dataframe(pd.DataFrame(timings), hide_index=True)
+    except FileNotFoundError as e:
+        st.error(
+            f"Erro: Arquivos Excel não encontrados. Verifique se '{FILE_POKEMON_REF}' e '{FILE_COMBAT_REF}' estão na mesma pasta do 'app.py' ou se o caminho está correto.")
+    except Exception as e:
+        st.error(
+            f"Ocorreu um erro na execução do script. Verifique se todas as bibliotecas estão instaladas (`pandas`, `openpyxl`, `scikit-learn`, `plotly`).")
+
+        st.exception(e)
+    finally:
+        if debug_mode:
+            disable_memory_tracking()
+
+if debug_mode:
+    render_debug_panel(run_records)
@@ -0,0 +1,93 @@
+"""
+Verificação e benchmark dos agregados incrementais (`src/aggregate_store.py`).
+
+Aplica um log sintético de combates em lotes, salvando e relendo o snapshot entre os lotes,
+e confere a cada passo que os agregados incrementais são idênticos ao recálculo completo
+(`compute_combat_stats`, `analyze_type_win_rate` e o histograma de vitórias). Depois compara
+o tempo de aplicar um lote pequeno com o tempo de recalcular tudo para logs crescentes.
+
+Uso:
+    python -m benchmarks.bench_aggregate_store
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_combats
+from src.data_loader import load_data
+from src.analysis_utils import compute_combat_stats
+from src.analysis_types import analyze_type_win_rate
+from src.aggregate_store import AGGREGATES_FILE, refresh_aggregates
+
+PARITY_BATTLES = 200_000
+PARITY_STEPS = 8
+SIZES = [100_000, 1_000_000, 5_000_000]
+DELTA_BATTLES = 1_000
+SEED = 42
+
+
+def full_histogram(combat_stats):
+    participated = combat_stats.loc[combat_stats['total'] > 0, 'wins'].to_numpy()
+    return np.bincount(participated)
+
+
+def check_parity(aggregates, df_pokemon, df_combat):
+    expected_stats = compute_combat_stats.__wrapped__(df_combat)
+    pd.testing.assert_frame_equal(aggregates.combat_stats(), expected_stats)
+
+    expected_types = analyze_type_win_rate.__wrapped__(df_pokemon, df_combat)
+    pd.testing.assert_frame_equal(aggregates.type_win_rate().sort_values('Tipo').reset_index(drop=True),
+                                  expected_types.sort_values('Tipo').reset_index(drop=True))
+
+    histogram = np.trim_zeros(aggregates.win_histogram, 'b')
+    np.testing.assert_array_equal(histogram, np.trim_zeros(full_histogram(expected_stats), 'b'))
+
+
+def main():
+    df_pokemon, df_real = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    rng = np.random.default_rng(SEED)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, AGGREGATES_FILE)
+
+        # 1. Equivalência: o log real (inclui o id 63, ausente no DataFrame de Pokémon) seguido
+        # de combates sintéticos, aplicados em lotes de tamanhos irregulares
+        df_synthetic = make_combats(df_pokemon, PARITY_BATTLES, seed=SEED)
+        df_synthetic['battle_id'] += len(df_real)
+        df_log = pd.concat([df_real, df_synthetic], ignore_index=True)
+        cuts = np.sort(rng.choice(np.arange(1, len(df_log)), PARITY_STEPS - 1, replace=False))
+        for end in list(cuts) + [len(df_log)]:
+            aggregates, applied = refresh_aggregates(df_pokemon, df_log.iloc[:end], path)
+            check_parity(aggregates, df_pokemon, df_log.iloc[:end])
+            print(f"  {end:>9,} combates ({applied:>7,} novos): agregados idênticos ao recálculo completo")
+
+        # Log reescrito (battle_id diferente): o snapshot é descartado e refeito
+        df_rewritten = df_log.iloc[:1000].assign(battle_id=lambda df: df['battle_id'] + 10**6)
+        aggregates, applied = refresh_aggregates(df_pokemon, df_rewritten, path)
+        check_parity(aggregates, df_pokemon, df_rewritten)
+        print(f"  log reescrito: recalculado do zero ({applied:,} combates)")
+
+        # 2. Tempo de um lote de DELTA_BATTLES combates contra o recálculo completo
+        print(f"\n{'combates':>12} {'recálculo (s)':>14} {'lote incremental (s)':>21}")
+        for n_battles in SIZES:
+            df_log = make_combats(df_pokemon, n_battles + DELTA_BATTLES, seed=SEED + n_battles)
+            os.remove(path)
+            refresh_aggregates(df_pokemon, df_log.iloc[:n_battles], path)
+
+            start = time.perf_counter()
+            compute_combat_stats.__wrapped__(df_log)
+            analyze_type_win_rate.__wrapped__(df_pokemon, df_log)
+            full_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            refresh_aggregates(df_pokemon, df_log, path)
+            delta_elapsed = time.perf_counter() - start
+
+            print(f"{n_battles:>12,} {full_elapsed:>14.4f} {delta_elapsed:>21.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Cache de figuras do app (`src/charts.py`): custo de construção × acerto de cache e reexecuções.
+
+1. Para cada figura, com os resultados das análises nos dados reais: o tempo de construção
+   (função original, sem cache), o tempo de um acerto de cache (inclui o hash dos argumentos)
+   e o tempo da conversão que o `st.plotly_chart` faz a cada exibição (figura → JSON).
+2. O app inteiro no `AppTest` do Streamlit: a primeira execução e reexecuções movendo o slider
+   do Top N, com o tempo de cada uma e os acertos de cache das figuras registrados pela
+   instrumentação (só a figura do Top N deve ser reconstruída, e apenas para valores novos).
+
+Uso:
+    python -m benchmarks.bench_chart_cache
+"""
+import time
+
+import plotly.io
+import plotly.tools
+from streamlit.testing.v1 import AppTest
+
+from src.analysis_types import analyze_type_matchups, analyze_type_win_rate
+from src.analysis_utils import analyze_average_attributes, analyze_top_winners, analyze_win_distribution
+from src.charts import figure_average_attributes, figure_ratings, figure_top_winners, figure_type_matchups, \
+    figure_type_win_rate, figure_win_distribution
+from src.confidence import wilson_columns
+from src.data_loader import load_data
+from src.instrumentation import get_records, record_count, summarize_records
+from src.ratings import analyze_ratings
+
+REPEAT = 5
+SLIDER_VALUES = [15, 10, 15, 20]
+
+
+def best_of(func, repeat=REPEAT):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed) * 1000
+
+
+def figure_cases():
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    return [
+        (figure_type_win_rate, wilson_columns(analyze_type_win_rate.__wrapped__(df_pokemon, df_combat))),
+        (figure_top_winners, wilson_columns(analyze_top_winners.__wrapped__(df_pokemon, df_combat).head(10))),
+        (figure_average_attributes, analyze_average_attributes.__wrapped__(df_pokemon)),
+        (figure_win_distribution, analyze_win_distribution.__wrapped__(df_combat)),
+        (figure_type_matchups, analyze_type_matchups.__wrapped__(df_pokemon, df_combat)),
+        (figure_ratings, analyze_ratings.__wrapped__(df_pokemon, df_combat).head(20)),
+    ]
+
+
+def main():
+    # 1. Construção × acerto de cache × conversão do Streamlit, por figura
+    print(f"{'figura':<28} {'construção':>12} {'acerto':>10} {'conversão':>11}")
+    for builder, data in figure_cases():
+        build_ms = best_of(lambda: builder.__wrapped__(data))
+        figure = builder(data)
+        hit_ms = best_of(lambda: builder(data))
+        convert_ms = best_of(lambda: plotly.io.to_json(
+            plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True), validate=False))
+        print(f"{builder.__name__:<28} {build_ms:>9.1f} ms {hit_ms:>7.1f} ms {convert_ms:>8.1f} ms")
+
+    # 2. App completo: primeira execução e reexecuções pelo slider do Top N
+    start = time.perf_counter()
+    app = AppTest.from_file("app.py", default_timeout=600).run()
+    print(f"\nPrimeira execução do app: {time.perf_counter() - start:.2f}s")
+    for value in SLIDER_VALUES:
+        mark = record_count()
+        start = time.perf_counter()
+        app.slider[0].set_value(value).run()
+        elapsed = time.perf_counter() - start
+
+        summary = summarize_records(get_records(since=mark))
+        figures = summary[summary['Etapa'].str.startswith('figure_')]
+        rebuilt = figures.loc[figures['Cache (faltas)'] > 0, 'Etapa'].tolist()
+        hit_rate = figures['Cache (acertos)'].sum() / figures['Chamadas'].sum() * 100
+        print(f"Top N = {value:>2}: reexecução {elapsed:.3f}s | acerto de cache das figuras {hit_rate:.0f}% | "
+              f"reconstruídas: {', '.join(rebuilt) or 'nenhuma'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Cobertura e tempo dos intervalos de confiança (`src/confidence.py`).
+
+* Cobertura: um conjunto sintético grande (`benchmarks/synthetic.py`) faz o papel da
+  população; de cada amostra são calculados os intervalos de Wilson e bootstrap por Pokémon e
+  por tipo, e conta-se quantas vezes a taxa da população cai dentro (o esperado é ~95%). As
+  amostras têm o tamanho dos dados reais e um tamanho maior, em que cada réplica sorteia só
+  parte dos combates (`BOOTSTRAP_MAX_DRAWS`) e os intervalos são reescalados.
+* Tempo: o kernel em lotes contra a reamostragem ingênua (`DataFrame.sample` + agregação por
+  réplica), e o tempo ao crescer o número de combates (limitado pelo teto de sorteios).
+
+Uso:
+    python -m benchmarks.bench_confidence
+    python -m benchmarks.bench_confidence --sizes 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_combats, make_pokemon
+from src.analysis_types import analyze_win_rate_intervals, build_type_index
+from src.analysis_utils import compute_combat_stats
+from src.confidence import BOOTSTRAP_MAX_DRAWS, BOOTSTRAP_REPLICATES, bootstrap_win_counts, encode_battles, \
+    wilson_interval
+from src.data_loader import load_data
+
+SIZES = [100_000, 1_000_000, 5_000_000]
+POPULATION_BATTLES = 5_000_000
+SAMPLE_SIZES = [50_000, 500_000]
+N_SAMPLES = 20
+NAIVE_REPLICATES = 10
+SEED = 42
+
+
+def population_rates(df_pokemon, df_combat):
+    """
+    Taxa de vitória por id e por tipo no conjunto que faz o papel da população.
+    """
+    stats = compute_combat_stats(df_combat)
+    wins, totals = stats['wins'].to_numpy(), stats['total'].to_numpy()
+    _, membership = build_type_index(df_pokemon)
+    n = min(len(wins), membership.shape[0])
+    return wins / np.maximum(totals, 1), (wins[:n] @ membership[:n]) / (totals[:n] @ membership[:n])
+
+
+def coverage(df_pokemon, population, sample_battles, rng):
+    """
+    Fração das amostras de `sample_battles` combates em que a taxa da população fica dentro de cada intervalo.
+    """
+    rates_per_id, rates_per_type = population_rates(df_pokemon, population)
+    hits = {'Wilson por Pokémon': [], 'bootstrap por Pokémon': [], 'bootstrap por tipo': []}
+    for _ in range(N_SAMPLES):
+        sample = population.iloc[rng.integers(0, len(population), sample_battles)]
+        df_type_intervals, df_pokemon_intervals = analyze_win_rate_intervals.__wrapped__(
+            df_pokemon, sample, seed=int(rng.integers(1 << 31)))
+
+        stats = compute_combat_stats(sample)
+        ids = df_pokemon_intervals['id'].to_numpy()
+        truth = rates_per_id[ids]
+        low, high = wilson_interval(stats['wins'].to_numpy()[ids], stats['total'].to_numpy()[ids])
+        hits['Wilson por Pokémon'].append(np.mean((low <= truth) & (truth <= high)))
+        hits['bootstrap por Pokémon'].append(np.mean(
+            (df_pokemon_intervals['IC Bootstrap Inferior (%)'] / 100 <= truth)
+            & (truth <= df_pokemon_intervals['IC Bootstrap Superior (%)'] / 100)))
+        hits['bootstrap por tipo'].append(np.mean(
+            (df_type_intervals['IC Bootstrap Inferior (%)'] / 100 <= rates_per_type)
+            & (rates_per_type <= df_type_intervals['IC Bootstrap Superior (%)'] / 100)))
+    return {label: np.mean(values) for label, values in hits.items()}
+
+
+def naive_bootstrap(df_combat, n_replicates, seed=SEED):
+    """
+    Referência: uma reamostragem do DataFrame e uma agregação por réplica.
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(n_replicates):
+        compute_combat_stats(df_combat.sample(frac=1, replace=True, random_state=rng))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos intervalos de confiança.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(SEED)
+    df_synthetic_pokemon = make_pokemon(seed=SEED)
+
+    # 1. Cobertura em amostras do tamanho dos dados reais e maiores (réplicas com subamostragem)
+    population = make_combats(df_synthetic_pokemon, POPULATION_BATTLES, seed=SEED)
+    for sample_battles in SAMPLE_SIZES:
+        n_draws = min(sample_battles, BOOTSTRAP_MAX_DRAWS // BOOTSTRAP_REPLICATES)
+        results = coverage(df_synthetic_pokemon, population, sample_battles, rng)
+        print(f"Cobertura de 95% em {N_SAMPLES} amostras de {sample_battles:,} combates "
+              f"({n_draws:,} sorteios por réplica): "
+              + " | ".join(f"{label} {value * 100:.1f}%" for label, value in results.items()))
+
+    # 2. Dados reais: kernel em lotes contra a reamostragem ingênua
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    start = time.perf_counter()
+    analyze_win_rate_intervals.__wrapped__(df_pokemon, df_combat)
+    kernel_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    naive_bootstrap(df_combat, NAIVE_REPLICATES)
+    naive_elapsed = (time.perf_counter() - start) / NAIVE_REPLICATES * BOOTSTRAP_REPLICATES
+    print(f"Dados reais, {BOOTSTRAP_REPLICATES} réplicas: kernel em lotes {kernel_elapsed:.2f}s | "
+          f"reamostragem ingênua ~{naive_elapsed:.2f}s (estimado de {NAIVE_REPLICATES} réplicas)")
+
+    # 3. Tempo ao crescer o número de combates: o teto de sorteios mantém o custo constante
+    for n_battles in args.sizes:
+        winners, losers, n_ids = encode_battles(make_combats(df_synthetic_pokemon, n_battles, seed=SEED))
+        start = time.perf_counter()
+        _, _, n_draws = bootstrap_win_counts(winners, losers, n_ids)
+        print(f"{n_battles:>11,} combates | {BOOTSTRAP_REPLICATES} réplicas de {n_draws:,} sorteios | "
+              f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
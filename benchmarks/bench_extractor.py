@@ -0,0 +1,97 @@
+"""
+Benchmark do extrator concorrente contra a coleta sequencial do notebook, usando o
+servidor local que imita a API (`benchmarks/mock_api_server.py`).
+
+A coleta sequencial reproduz o notebook: `requests.get` sem sessão e pausas fixas entre
+as requisições. Os dois modos precisam produzir os mesmos DataFrames.
+
+Uso:
+    python -m benchmarks.bench_extractor
+"""
+import math
+import time
+
+import pandas as pd
+import requests
+
+from benchmarks.mock_api_server import MOCK_TOKEN, default_dataset, start_mock_server
+from src.api_extractor import COMBATS_PER_PAGE, POKEMON_PER_PAGE, PokemonApiClient
+
+LATENCY = 0.02          # Latência simulada por requisição (s)
+N_COMBATS = 5_000
+RATE_LIMITS = [None, 150]
+DELAY_BETWEEN_DETAILS = 0.015
+DELAY_BETWEEN_PAGES = 0.015
+
+
+def sequential_extract(base_url):
+    """
+    Coleta no estilo do notebook: uma requisição por vez, sem reaproveitar conexões.
+    """
+    headers = {"Authorization": f"Bearer {MOCK_TOKEN}"}
+
+    def get(url):
+        while True:
+            response = requests.get(url, headers=headers)
+            if response.status_code != 429:
+                return response.json()
+            time.sleep(int(response.headers.get('Retry-After', 1)))
+
+    first = get(f"{base_url}/pokemon?page=1&per_page={POKEMON_PER_PAGE}")
+    base_info = list(first["pokemons"])
+    for page in range(2, math.ceil(first["total"] / POKEMON_PER_PAGE) + 1):
+        base_info.extend(get(f"{base_url}/pokemon?page={page}&per_page={POKEMON_PER_PAGE}")["pokemons"])
+        time.sleep(DELAY_BETWEEN_PAGES)
+
+    details = []
+    for info in base_info:
+        details.append(get(f"{base_url}/pokemon/{info['id']}"))
+        time.sleep(DELAY_BETWEEN_DETAILS)
+
+    first = get(f"{base_url}/combats?page=1&per_page={COMBATS_PER_PAGE}")
+    combats = list(first["combats"])
+    for page in range(2, math.ceil(first["total"] / COMBATS_PER_PAGE) + 1):
+        combats.extend(get(f"{base_url}/combats?page={page}&per_page={COMBATS_PER_PAGE}")["combats"])
+        time.sleep(DELAY_BETWEEN_PAGES)
+
+    df_combats = pd.DataFrame(combats)
+    df_combats.insert(0, 'battle_id', range(1, len(df_combats) + 1))
+    return pd.DataFrame(details), df_combats
+
+
+def concurrent_extract(base_url):
+    client = PokemonApiClient(base_url, verbose=False)
+    client.login("usuario", "senha")
+    return client.get_all_pokemon_details(), client.get_all_combats_to_dataframe(), client.limiter.rate
+
+
+def main():
+    pokemons, combats = default_dataset(n_combats=N_COMBATS)
+
+    print(f"{'limite (req/s)':>14} {'modo':>12} {'tempo (s)':>10} {'requisições':>12} {'429':>6}")
+    for rate_limit in RATE_LIMITS:
+        server, state, base_url = start_mock_server(pokemons, combats, latency=LATENCY, rate_limit=rate_limit)
+        try:
+            label = rate_limit or 'sem limite'
+
+            start = time.perf_counter()
+            seq_pokemon, seq_combats = sequential_extract(base_url)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>14} {'sequencial':>12} {elapsed:>10.2f} {state.request_count:>12} "
+                  f"{state.rate_limited_count:>6}")
+
+            state.request_count = state.rate_limited_count = 0
+            start = time.perf_counter()
+            con_pokemon, con_combats, final_rate = concurrent_extract(base_url)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>14} {'concorrente':>12} {elapsed:>10.2f} {state.request_count:>12} "
+                  f"{state.rate_limited_count:>6}  (taxa final {final_rate:.0f} req/s)")
+
+            pd.testing.assert_frame_equal(seq_pokemon, con_pokemon)
+            pd.testing.assert_frame_equal(seq_combats, con_combats)
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Equivalência e tempo das análises filtradas (`src/filter_index.py`).
+
+Para várias combinações de filtros, compara as consultas do índice com as análises completas
+recalculadas sobre os dados filtrados:
+
+* escopo 'battles': `analyze_*` sobre os combates em que os dois Pokémon atendem ao filtro;
+* escopo 'pokemon': `analyze_*` sobre todos os combates, mantendo apenas os Pokémon filtrados.
+
+Também mostra o tempo de construção do índice e de cada consulta, contra o recálculo.
+
+Uso:
+    python -m benchmarks.bench_filter_index
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_combats, make_pokemon
+from src.data_loader import load_data
+from src.analysis_utils import analyze_top_winners, analyze_win_distribution
+from src.analysis_types import analyze_type_win_rate
+from src.filter_index import CombatFilterIndex
+
+SYNTHETIC_BATTLES = 1_000_000
+SEED = 42
+
+FILTERS = [
+    {},
+    {'generations': [3], 'legendary': False},
+    {'generations': [1, 2], 'types': ['Fire', 'Water']},
+    {'legendary': True},
+    {'types': ['Dragon'], 'generations': [5]},
+]
+
+
+def _matches(df_pokemon, generations=None, legendary=None, types=None):
+    mask = pd.Series(True, index=df_pokemon.index)
+    if generations:
+        mask &= df_pokemon['generation'].isin(generations)
+    if legendary is not None:
+        mask &= df_pokemon['legendary'] == legendary
+    if types:
+        mask &= df_pokemon['type1'].isin(types) | df_pokemon['type2'].isin(types)
+    return df_pokemon.loc[mask, 'id'].to_numpy(dtype=np.int64)
+
+
+def reference(df_pokemon, df_combat, filters, scope):
+    """
+    Resultado esperado recalculando as análises completas sobre os dados filtrados.
+    """
+    ids = _matches(df_pokemon, **filters)
+    if scope == 'battles':
+        in_battle = df_combat['first_pokemon'].isin(ids) & df_combat['second_pokemon'].isin(ids)
+        combats = df_combat[in_battle]
+        return {
+            'type_win_rate': analyze_type_win_rate.__wrapped__(df_pokemon, combats),
+            'top_winners': analyze_top_winners.__wrapped__(df_pokemon, combats),
+            'win_distribution': analyze_win_distribution.__wrapped__(combats),
+        }
+
+    top_winners = analyze_top_winners.__wrapped__(df_pokemon, df_combat)
+    distribution = analyze_win_distribution.__wrapped__(df_combat)
+    return {
+        'type_win_rate': analyze_type_win_rate.__wrapped__(df_pokemon[df_pokemon['id'].isin(ids)], df_combat),
+        'top_winners': top_winners[top_winners['id'].isin(ids)],
+        'win_distribution': distribution[distribution['id'].isin(ids)],
+    }
+
+
+def check_parity(index, df_pokemon, df_combat, filters, scope):
+    """
+    Compara as três análises filtradas e retorna (tempo do índice, tempo do recálculo).
+    """
+    start = time.perf_counter()
+    results = {
+        'type_win_rate': index.type_win_rate(**filters, scope=scope),
+        'top_winners': index.top_winners(**filters, scope=scope),
+        'win_distribution': index.win_distribution(**filters, scope=scope),
+    }
+    index_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = reference(df_pokemon, df_combat, filters, scope)
+    reference_elapsed = time.perf_counter() - start
+
+    for name, result in results.items():
+        target = expected[name]
+        if name == 'type_win_rate':
+            # Empates na taxa podem ser ordenados de forma diferente; compara por tipo
+            result, target = result.sort_values('Tipo'), target.sort_values('Tipo')
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), target.reset_index(drop=True),
+                                      check_exact=False, check_dtype=False, obj=f"{name} {filters} {scope}")
+    return index_elapsed, reference_elapsed
+
+
+def main():
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    df_synthetic_pokemon = make_pokemon(seed=SEED)
+    datasets = [
+        ('dados reais', df_pokemon, df_combat),
+        (f'sintético ({SYNTHETIC_BATTLES:,} combates)', df_synthetic_pokemon,
+         make_combats(df_synthetic_pokemon, SYNTHETIC_BATTLES, seed=SEED, missing_ids=(801,))),
+    ]
+
+    for label, pokemon, combats in datasets:
+        start = time.perf_counter()
+        index = CombatFilterIndex(pokemon, combats)
+        print(f"{label}: índice construído em {time.perf_counter() - start:.3f}s")
+
+        for filters in FILTERS:
+            for scope in ('pokemon', 'battles'):
+                index_elapsed, reference_elapsed = check_parity(index, pokemon, combats, filters, scope)
+                print(f"  {str(filters):<55} {scope:>8}: índice {index_elapsed * 1000:7.1f} ms | "
+                      f"recálculo {reference_elapsed * 1000:7.1f} ms | resultados idênticos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Equivalência e tempo do índice de confrontos diretos (`src/head_to_head.py`).
+
+Compara `HeadToHeadIndex.lookup` e `HeadToHeadIndex.opponents` com a varredura booleana de
+`df_combat` para pares sorteados (incluindo pares que nunca se enfrentaram e o id 63, sem
+cadastro) e mede o tempo de construção do índice e de cada consulta contra a varredura.
+
+Uso:
+    python -m benchmarks.bench_head_to_head
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_combats, make_pokemon
+from src.data_loader import load_data
+from src.head_to_head import HeadToHeadIndex
+
+SYNTHETIC_BATTLES = 1_000_000
+N_PAIRS = 200
+SEED = 42
+
+
+def scan_lookup(df_combat, pokemon_id, opponent_id):
+    """
+    Referência: varredura booleana completa dos combates.
+    """
+    first, second = df_combat['first_pokemon'], df_combat['second_pokemon']
+    mask = (((first == pokemon_id) & (second == opponent_id))
+            | ((first == opponent_id) & (second == pokemon_id)))
+    pair = df_combat[mask].sort_values('battle_id')
+    wins = int((pair['winner'] == pokemon_id).sum())
+    return wins, len(pair) - wins, pair['battle_id'].to_numpy(dtype=np.int64), pair['winner'].to_numpy(dtype=np.int64)
+
+
+def scan_opponents(df_combat, pokemon_id):
+    first, second, winner = df_combat['first_pokemon'], df_combat['second_pokemon'], df_combat['winner']
+    as_first = df_combat[first == pokemon_id]
+    as_second = df_combat[(second == pokemon_id) & (first != pokemon_id)]
+    rows = pd.DataFrame({
+        'id': np.concatenate([as_first['second_pokemon'], as_second['first_pokemon']]).astype(np.int64),
+        'won': np.concatenate([as_first['winner'] == pokemon_id, as_second['winner'] == pokemon_id]),
+    })
+    grouped = rows.groupby('id')['won'].agg(['count', 'sum']).reset_index()
+    grouped.columns = ['id', 'Total de Combates', 'Vitórias']
+    grouped['Derrotas'] = grouped['Total de Combates'] - grouped['Vitórias']
+    return grouped
+
+
+def check_parity(index, df_combat, pairs):
+    """
+    Compara as consultas com as varreduras e retorna (tempo do índice, tempo da varredura) por par.
+    """
+    index_elapsed = scan_elapsed = 0.0
+    for pokemon_id, opponent_id in pairs:
+        start = time.perf_counter()
+        result = index.lookup(pokemon_id, opponent_id)
+        index_elapsed += time.perf_counter() - start
+
+        start = time.perf_counter()
+        wins, losses, battle_ids, winners = scan_lookup(df_combat, pokemon_id, opponent_id)
+        scan_elapsed += time.perf_counter() - start
+
+        assert (result.wins, result.losses) == (wins, losses), (pokemon_id, opponent_id)
+        assert np.array_equal(result.battle_ids, battle_ids) and np.array_equal(result.winners, winners)
+
+    for pokemon_id in {pokemon_id for pokemon_id, _ in pairs[:20]}:
+        result = index.opponents(pokemon_id).sort_values('id').reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, scan_opponents(df_combat, pokemon_id), check_dtype=False)
+
+    return index_elapsed / len(pairs), scan_elapsed / len(pairs)
+
+
+def sample_pairs(df_combat, rng):
+    """
+    Metade dos pares vem de combates reais, metade é sorteada (em geral pares sem combates).
+    """
+    rows = rng.integers(0, len(df_combat), N_PAIRS // 2)
+    fought = list(zip(df_combat['first_pokemon'].to_numpy()[rows].tolist(),
+                      df_combat['second_pokemon'].to_numpy()[rows].tolist()))
+    ids = np.unique(df_combat['first_pokemon'].to_numpy())
+    random = list(zip(rng.choice(ids, N_PAIRS // 2).tolist(), rng.choice(ids, N_PAIRS // 2).tolist()))
+    return fought + random + [(63, 1), (1, 63), (10**6, 1)]
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    df_synthetic_pokemon = make_pokemon(seed=SEED)
+    datasets = [
+        ('dados reais', df_combat),
+        (f'sintético ({SYNTHETIC_BATTLES:,} combates)',
+         make_combats(df_synthetic_pokemon, SYNTHETIC_BATTLES, seed=SEED, missing_ids=(801,))),
+    ]
+
+    for label, combats in datasets:
+        start = time.perf_counter()
+        index = HeadToHeadIndex(combats)
+        build_elapsed = time.perf_counter() - start
+        index_elapsed, scan_elapsed = check_parity(index, combats, sample_pairs(combats, rng))
+        print(f"{label}: índice construído em {build_elapsed:.3f}s ({len(index.pair_keys):,} pares) | "
+              f"consulta {index_elapsed * 1e6:.0f} µs | varredura {scan_elapsed * 1e3:.1f} ms | resultados idênticos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Ajuste, warm start e tempo dos ratings de Bradley-Terry (`src/ratings.py`).
+
+Os combates sintéticos (`benchmarks/synthetic.py`) são sorteados exatamente por um modelo de
+Bradley-Terry: P(P1 vence) = 1 / (1 + exp(-(s_1 - s_2))), com s = atributos · pesos. Por isso
+o log da força ajustada deve reproduzir s (a menos de uma constante). Para cada tamanho o
+script mostra:
+
+* o tempo e as iterações do ajuste completo (partindo de forças iguais);
+* a correlação entre o log da força ajustada e a força verdadeira, e o maior gradiente da
+  log-verossimilhança no ponto ajustado (≈ 0 na convergência);
+* o tempo e as iterações do warm start ao aplicar 1% de combates novos a um ajuste anterior,
+  e a diferença para o ajuste completo sobre todos os combates.
+
+Uso:
+    python -m benchmarks.bench_ratings
+    python -m benchmarks.bench_ratings --sizes 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import OUTCOME_WEIGHTS, make_combats, make_pokemon
+from src.data_loader import STAT_COLUMNS
+from src.ratings import BT_PRIOR, BradleyTerryRatings, pair_counts
+
+SIZES = [100_000, 1_000_000, 10_000_000]
+DELTA_SHARE = 0.01
+SEED = 42
+
+
+def true_strength(df_pokemon):
+    weights = np.array([OUTCOME_WEIGHTS[col] for col in STAT_COLUMNS])
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    strength = np.zeros(ids.max() + 1)
+    strength[ids] = df_pokemon[STAT_COLUMNS].to_numpy(dtype=np.float64) @ weights
+    return strength
+
+
+def max_gradient(model):
+    """
+    Maior |dL/d log p_i| da log-verossimilhança (com as vitórias virtuais) no ponto ajustado.
+    """
+    p, n_ids = model.strength, model.n_ids
+    expected_low = model.battles * p[model.low] / (p[model.low] + p[model.high])
+    wins = (np.bincount(model.low, weights=model.low_wins, minlength=n_ids)
+            + np.bincount(model.high, weights=model.battles - model.low_wins, minlength=n_ids) + BT_PRIOR)
+    expected = (np.bincount(model.low, weights=expected_low, minlength=n_ids)
+                + np.bincount(model.high, weights=model.battles - expected_low, minlength=n_ids)
+                + 2 * BT_PRIOR * p / (p + 1))
+    active = np.bincount(model.low, minlength=n_ids) + np.bincount(model.high, minlength=n_ids) > 0
+    return np.abs(wins - expected)[active].max()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos ratings de Bradley-Terry.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args(argv)
+
+    df_pokemon = make_pokemon(seed=SEED)
+    truth = true_strength(df_pokemon)
+
+    for n_battles in args.sizes:
+        combats = make_combats(df_pokemon, n_battles, seed=SEED)
+
+        # 1. Ajuste completo
+        start = time.perf_counter()
+        pair_counts(combats)
+        counts_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        full = BradleyTerryRatings().apply_delta(combats)
+        full_elapsed = time.perf_counter() - start
+
+        ids = df_pokemon['id'].to_numpy()
+        correlation = np.corrcoef(np.log(full.strength[ids]), truth[ids])[0, 1]
+        print(f"{n_battles:>11,} combates | ajuste completo {full_elapsed:.2f}s (contagem por par "
+              f"{counts_elapsed:.2f}s, {full.iterations} iterações) | correlação com a força verdadeira "
+              f"{correlation:.4f} | gradiente máx. {max_gradient(full):.1e}")
+
+        # 2. Warm start com os últimos 1% dos combates
+        n_base = int(n_battles * (1 - DELTA_SHARE))
+        model = BradleyTerryRatings().apply_delta(combats.iloc[:n_base])
+        start = time.perf_counter()
+        model.apply_delta(combats.iloc[n_base:])
+        warm_elapsed = time.perf_counter() - start
+        difference = np.max(np.abs(np.log(model.strength[ids]) - np.log(full.strength[ids])))
+        print(f"{'':>11}            | warm start com {n_battles - n_base:,} combates novos {warm_elapsed:.2f}s "
+              f"({model.iterations} iterações) | diferença máx. de log-força para o ajuste completo {difference:.1e}")
+
+
+if __name__ == '__main__':
+    main()
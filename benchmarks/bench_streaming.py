@@ -0,0 +1,96 @@
+"""
+Verificação do teto de memória do processamento em blocos (`src/streaming.py`).
+
+1. Equivalência: agrega `combat_pokemon.xlsx` e uma cópia parquet dele em blocos e compara
+   com o recálculo completo em memória.
+2. Memória: grava logs sintéticos em parquet de duas formas, com um único grupo de linhas (o
+   padrão do `fastparquet.write`) e com `write_parquet` (o gravador do cache colunar e da
+   sincronização), e mede com `tracemalloc`, em um processo separado para cada arquivo, o pico
+   de memória alocada durante a agregação. O pico deve ficar abaixo de `MEMORY_CEILING_MB` e
+   praticamente não variar com o número de combates.
+
+Uso:
+    python -m benchmarks.bench_streaming
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_aggregate_store import check_parity
+from benchmarks.synthetic import make_combats
+from src.columnar_cache import write_parquet
+from src.data_loader import load_data
+from src.streaming import stream_aggregates
+
+SIZES = [1_000_000, 4_000_000]
+CHUNK_SIZE = 100_000
+MEMORY_CEILING_MB = 64
+SEED = 42
+
+
+def write_synthetic_logs(tmp_dir, df_pokemon, n_battles):
+    """
+    Grava `n_battles` combates sintéticos em um arquivo de grupo único e em um de `write_parquet`.
+    """
+    import fastparquet
+
+    df = make_combats(df_pokemon, n_battles, seed=SEED)
+    single_path = os.path.join(tmp_dir, f"combats-{n_battles}-single.parquet")
+    fastparquet.write(single_path, df)
+    assert len(fastparquet.ParquetFile(single_path).row_groups) == 1
+    groups_path = os.path.join(tmp_dir, f"combats-{n_battles}-groups.parquet")
+    write_parquet(df, groups_path)
+    return {'grupo único': single_path, 'write_parquet': groups_path}
+
+
+def measure_peak(path, pokemon_path):
+    """
+    Executado no processo filho: agrega `path` em blocos e imprime (combates, pico em MB, segundos).
+    """
+    import tracemalloc
+
+    from src.data_loader import read_source_excel
+
+    df_pokemon = read_source_excel(pokemon_path, "pokemon.xlsx")
+    tracemalloc.start()
+    start = time.perf_counter()
+    aggregates, _ = stream_aggregates(df_pokemon, path, CHUNK_SIZE)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    print(aggregates.rows, peak / 2 ** 20, elapsed)
+
+
+def main():
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 1. Equivalência com o recálculo completo, nas duas origens
+        parquet_copy = os.path.join(tmp_dir, "combat_pokemon.parquet")
+        df_combat.to_parquet(parquet_copy, engine="fastparquet", index=False, row_group_offsets=7_000)
+        for source in ("combat_pokemon.xlsx", parquet_copy):
+            aggregates, _ = stream_aggregates(df_pokemon, source, chunk_size=9_000)
+            check_parity(aggregates, df_pokemon, df_combat)
+            print(f"  {os.path.basename(source)}: agregados em blocos idênticos ao recálculo completo")
+
+        # 2. Pico de memória por tamanho de log e forma de gravação
+        print(f"\n{'arquivo':<14} {'combates':>12} {'pico (MB)':>10} {'tempo (s)':>10} {'combates/s':>12}")
+        peaks = []
+        for n_battles in SIZES:
+            for label, path in write_synthetic_logs(tmp_dir, df_pokemon, n_battles).items():
+                output = subprocess.run(
+                    [sys.executable, "-c",
+                     f"from benchmarks.bench_streaming import measure_peak; measure_peak({path!r}, 'pokemon.xlsx')"],
+                    check=True, capture_output=True, text=True).stdout.split()
+                rows, peak_mb, elapsed = int(output[-3]), float(output[-2]), float(output[-1])
+                assert rows == n_battles, (rows, n_battles)
+                peaks.append(peak_mb)
+                print(f"{label:<14} {n_battles:>12,} {peak_mb:>10.1f} {elapsed:>10.2f} {n_battles / elapsed:>12,.0f}")
+                os.remove(path)
+
+        assert max(peaks) < MEMORY_CEILING_MB, f"pico de {max(peaks):.1f} MB acima de {MEMORY_CEILING_MB} MB"
+        print(f"\nPico abaixo de {MEMORY_CEILING_MB} MB em todos os tamanhos.")
+
+if __name__ == '__main__':
+    main()
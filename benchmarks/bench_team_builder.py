@@ -0,0 +1,63 @@
+"""
+Benchmark do tempo de busca da equipe ideal em função do tamanho do conjunto de candidatos.
+
+Usa os dados reais e a matriz de confrontos do modelo registrado (calculada pela etapa
+offline `build_matchup_artifact` se ainda não existir). Para cada tamanho de conjunto (candidatos por função) mede o tempo do beam
+search e mostra a pontuação da melhor equipe, para visualizar o ganho de qualidade
+de conjuntos maiores.
+
+Antes disso, verifica que a busca devolve `top_k` equipes quando a diversidade mínima de
+tipos é alta (`STRICT_DISTINCT_TYPES`): um feixe podado só pela pontuação se enche de equipes
+parciais concentradas em poucos tipos e termina sem nenhuma equipe válida.
+"""
+import time
+
+from src.data_loader import load_data
+from src.analysis_utils import compute_combat_stats
+from src.analysis_types import analyze_type_win_rate
+from src.prediction import build_matchup_artifact, load_matchup_matrix
+from src.team_builder import build_team_candidates, search_teams
+
+POOL_SIZES = [5, 10, 20, 30, 60, 120, 270]
+BEAM_WIDTH = 200
+TOP_K = 5
+STRICT_DISTINCT_TYPES = 10
+
+
+def check_type_diversity(candidates, matchup_matrix):
+    """
+    Confere que a busca devolve `TOP_K` equipes com pelo menos `STRICT_DISTINCT_TYPES` tipos.
+    """
+    teams = search_teams(candidates, matchup_matrix, top_k=TOP_K, beam_width=BEAM_WIDTH,
+                         min_distinct_types=STRICT_DISTINCT_TYPES)
+    assert len(teams) == TOP_K, f"a busca devolveu {len(teams)} de {TOP_K} equipes"
+    assert (teams['Tipos Distintos'] >= STRICT_DISTINCT_TYPES).all()
+    print(f"Diversidade mínima de {STRICT_DISTINCT_TYPES} tipos: {TOP_K} equipes válidas\n")
+
+
+def main():
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    build_matchup_artifact(df_pokemon, df_combat)
+    matchup_matrix = load_matchup_matrix.__wrapped__(df_pokemon, df_combat)
+    candidates = build_team_candidates(df_pokemon,
+                                       compute_combat_stats.__wrapped__(df_combat),
+                                       analyze_type_win_rate.__wrapped__(df_pokemon, df_combat),
+                                       matchup_matrix)
+    check_type_diversity(candidates, matchup_matrix)
+
+    print(f"{'por função':>10} {'candidatos':>11} {'tempo (s)':>10} {'pontuação':>10}  melhor equipe")
+    for pool_per_role in POOL_SIZES:
+        start = time.perf_counter()
+        teams = search_teams(candidates, matchup_matrix, pool_per_role=pool_per_role, beam_width=BEAM_WIDTH)
+        elapsed = time.perf_counter() - start
+
+        n_candidates = int(candidates.groupby('role').size().clip(upper=pool_per_role).sum())
+        if teams.empty:
+            print(f"{pool_per_role:>10} {n_candidates:>11} {elapsed:>10.3f} {'-':>10}  (nenhuma equipe válida)")
+            continue
+        best = teams.iloc[0]
+        print(f"{pool_per_role:>10} {n_candidates:>11} {elapsed:>10.3f} {best['Pontuação']:>10.4f}  {best['Equipe']}")
+
+
+if __name__ == '__main__':
+    main()
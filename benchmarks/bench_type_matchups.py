@@ -0,0 +1,78 @@
+"""
+Equivalência e escala da matriz de confrontos entre tipos (`analyze_type_matchups`).
+
+Compara o resultado com uma implementação direta em pandas (tipos de cada participante
+"explodidos" em linhas e agrupados por par) nos dados reais, para os dois níveis, e mede o
+tempo em dados sintéticos de tamanhos crescentes para mostrar o custo linear no número de
+combates.
+
+Uso:
+    python -m benchmarks.bench_type_matchups
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_combats, make_pokemon
+from src.data_loader import load_data
+from src.analysis_types import TYPE_MATCHUP_LEVELS, analyze_type_matchups
+
+SIZES = [100_000, 1_000_000, 4_000_000]
+SEED = 42
+
+
+def _pokemon_types(df_pokemon, level):
+    if level == 'combination':
+        type2 = df_pokemon['type2'].astype(object)
+        combination = df_pokemon['type1'].astype(object) + ('/' + type2).fillna('')
+        return df_pokemon[['id']].assign(type=combination)
+    types = pd.concat([df_pokemon[['id', 'type1']].rename(columns={'type1': 'type'}),
+                       df_pokemon[['id', 'type2']].rename(columns={'type2': 'type'})])
+    types['type'] = types['type'].astype(object)
+    return types.dropna().drop_duplicates()
+
+
+def pandas_matchups(df_pokemon, df_combat, level):
+    """
+    Referência: uma linha por participação e combinação de tipos, agrupada por par de tipos.
+    """
+    p1_won = df_combat['winner'] == df_combat['first_pokemon']
+    participations = pd.concat([
+        pd.DataFrame({'id': df_combat['first_pokemon'], 'opponent': df_combat['second_pokemon'], 'won': p1_won}),
+        pd.DataFrame({'id': df_combat['second_pokemon'], 'opponent': df_combat['first_pokemon'], 'won': ~p1_won}),
+    ]).astype({'id': np.int64, 'opponent': np.int64})
+
+    types = _pokemon_types(df_pokemon, level).astype({'id': np.int64})
+    merged = participations.merge(types, on='id').merge(
+        types.rename(columns={'id': 'opponent', 'type': 'opponent_type'}), on='opponent')
+    grouped = merged.groupby(['type', 'opponent_type'])['won'].agg(['sum', 'count']).reset_index()
+    grouped.columns = ['Tipo', 'Tipo do Oponente', 'Total de Vitórias', 'Total de Combates']
+    return grouped
+
+
+def main():
+    df_pokemon, df_combat = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+    for level in TYPE_MATCHUP_LEVELS:
+        result = analyze_type_matchups.__wrapped__(df_pokemon, df_combat, level)
+        expected = pandas_matchups(df_pokemon, df_combat, level)
+
+        columns = ['Tipo', 'Tipo do Oponente', 'Total de Vitórias', 'Total de Combates']
+        result = result[columns].sort_values(columns[:2]).reset_index(drop=True)
+        expected = expected[columns].sort_values(columns[:2]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, obj=level)
+        print(f"{level:>11}: {len(result)} pares, resultados idênticos à referência pandas")
+
+    df_synthetic_pokemon = make_pokemon(seed=SEED)
+    for n_battles in SIZES:
+        combats = make_combats(df_synthetic_pokemon, n_battles, seed=SEED, missing_ids=(801,))
+        for level in TYPE_MATCHUP_LEVELS:
+            start = time.perf_counter()
+            analyze_type_matchups.__wrapped__(df_synthetic_pokemon, combats, level)
+            elapsed = time.perf_counter() - start
+            print(f"{n_battles:>11,} combates | {level:>11}: {elapsed:.3f}s "
+                  f"({elapsed / n_battles * 1e9:.0f} ns por combate)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de escalabilidade de `analyze_type_win_rate` em função do número de combates.
+
+Gera combates sintéticos (`benchmarks/synthetic.py`) sobre os Pokémon de `pokemon.xlsx` e compara o motor vetorizado
+com a implementação original (varredura linha a linha), que só é executada nos tamanhos
+pequenos por ser O(combates × pokémon).
+
+Uso:
+    python -m benchmarks.bench_type_win_rate
+"""
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_combats
+from src.data_loader import load_data
+from src.analysis_types import analyze_type_win_rate
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+LEGACY_MAX_SIZE = 10_000
+SEED = 42
+
+
+def legacy_type_win_rate(df_pokemon, df_combat):
+    """
+    Implementação original (iterrows + filtro booleano por combate), mantida como referência.
+    """
+    type_splits = df_pokemon[['id', 'types']].copy()
+    type_splits['type1'] = type_splits['types'].apply(lambda x: x.split('/')[0].strip())
+    type_splits['type2'] = type_splits['types'].apply(
+        lambda x: x.split('/')[1].strip() if len(x.split('/')) > 1 else None)
+
+    df_types_melted = type_splits.melt(
+        id_vars=['id'],
+        value_vars=['type1', 'type2'],
+        value_name='Type'
+    ).dropna(subset=['Type'])
+    df_types_melted = df_types_melted[['id', 'Type']].drop_duplicates()
+
+    type_stats = {}
+    for _, row in df_combat.iterrows():
+        p1_id = row['first_pokemon']
+        p2_id = row['second_pokemon']
+        winner_id = row['winner']
+
+        p1_types = df_types_melted[df_types_melted['id'] == p1_id]['Type'].tolist()
+        p2_types = df_types_melted[df_types_melted['id'] == p2_id]['Type'].tolist()
+
+        is_p1_winner = (winner_id == p1_id)
+        for type_list, is_winner in ((p1_types, is_p1_winner), (p2_types, not is_p1_winner)):
+            for p_type in type_list:
+                stats = type_stats.setdefault(p_type, {'wins': 0, 'total': 0})
+                stats['total'] += 1
+                if is_winner:
+                    stats['wins'] += 1
+
+    df_win_rate = pd.DataFrame([
+        {'Tipo': p_type,
+         'Taxa de Vitória (%)': (stats['wins'] / stats['total']) * 100,
+         'Total de Combates': stats['total'],
+         'Total de Vitórias': stats['wins']}
+        for p_type, stats in type_stats.items()
+    ])
+    return df_win_rate.sort_values(by='Taxa de Vitória (%)', ascending=False).reset_index(drop=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    df_pokemon, _ = load_data.__wrapped__("pokemon.xlsx", "combat_pokemon.xlsx")
+
+    # Chama a função original (sem o cache do Streamlit) para medir o cálculo em si
+    vectorized = analyze_type_win_rate.__wrapped__
+
+    print(f"{'combates':>12} {'vetorizado (s)':>15} {'combates/s':>14} {'original (s)':>13}")
+    for n_battles in SIZES:
+        df_combat = make_combats(df_pokemon, n_battles, seed=SEED)
+        result, elapsed = timed(vectorized, df_pokemon, df_combat)
+
+        legacy_col = '-'
+        if n_battles <= LEGACY_MAX_SIZE:
+            expected, legacy_elapsed = timed(legacy_type_win_rate, df_pokemon, df_combat)
+            # Empates na taxa podem ser ordenados de forma diferente; compara por tipo
+            pd.testing.assert_frame_equal(result.sort_values('Tipo').reset_index(drop=True),
+                                          expected.sort_values('Tipo').reset_index(drop=True),
+                                          check_dtype=False)
+            legacy_col = f"{legacy_elapsed:.3f}"
+
+        print(f"{n_battles:>12,} {elapsed:>15.4f} {n_battles / elapsed:>14,.0f} {legacy_col:>13}")
+
+
+if __name__ == '__main__':
+    main()
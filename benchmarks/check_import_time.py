@@ -0,0 +1,111 @@
+"""
+Orçamento de tempo de importação dos módulos de `src/` usados pelo app.
+
+Importa, em um processo novo com `python -X importtime`, os mesmos módulos de `src/` que o
+`app.py` importa no topo (lidos do próprio `app.py`), depois das bibliotecas que o app usa
+de qualquer forma (streamlit, pandas, numpy, plotly). Falha (código 1) quando:
+
+* alguma dependência pesada que só deve carregar sob demanda (`LAZY_MODULES`, ex.: o
+  scikit-learn, usado apenas para treinar) é importada junto com os módulos do app; ou
+* o tempo de importação acumulado dos módulos de `src/` passa de `--budget-ms`.
+
+O tempo é o menor de `--repeat` processos, e os módulos mais lentos são listados.
+
+Uso:
+    python -m benchmarks.check_import_time
+    python -m benchmarks.check_import_time --budget-ms 100
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Bibliotecas carregadas pelo app independentemente de `src/` (fora do orçamento)
+BASE_MODULES = ['numpy', 'pandas', 'streamlit', 'plotly.express']
+
+# Dependências que os módulos do app só podem importar dentro das funções que as usam
+LAZY_MODULES = ['sklearn', 'joblib', 'duckdb', 'openpyxl', 'fastparquet', 'requests']
+
+DEFAULT_BUDGET_MS = 150
+
+
+def app_src_modules(app_path=APP_PATH):
+    """
+    Módulos de `src/` importados no nível superior do `app.py`.
+    """
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith('src.'):
+            modules.append(node.module)
+        elif isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names if alias.name.startswith('src.')]
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules):
+    """
+    Retorna {módulo: (próprio µs, acumulado µs, profundidade)} do `-X importtime` ao importar
+    `modules` depois de `BASE_MODULES`. Profundidade 0 são as importações feitas diretamente
+    pelo processo; as aninhadas aparecem uma única vez, sob o módulo que as importou primeiro.
+    """
+    code = "; ".join(f"import {name}" for name in BASE_MODULES + modules)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(APP_PATH)).stderr
+
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica o tempo de importação dos módulos do app.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    modules = app_src_modules()
+    runs = [measure(modules) for _ in range(args.repeat)]
+
+    # 1. Dependências pesadas importadas sem necessidade
+    eager = sorted({lazy for timings in runs for name in timings for lazy in LAZY_MODULES
+                    if name == lazy or name.startswith(f"{lazy}.")})
+
+    # 2. Tempo acumulado de `src/`: apenas os módulos importados diretamente (profundidade 0), cujo
+    #    acumulado já inclui os módulos de `src/` e as dependências que eles importam pela primeira vez
+    def src_total(timings):
+        return sum(cumulative for name, (_, cumulative, depth) in timings.items()
+                   if name.startswith('src.') and depth == 0) / 1000
+
+    best = min(runs, key=src_total)
+    total_ms = src_total(best)
+
+    print(f"Módulos do app: {', '.join(modules)}")
+    print(f"Tempo de importação de src/ (além de {', '.join(BASE_MODULES)}): {total_ms:.1f} ms "
+          f"(orçamento {args.budget_ms:.0f} ms)")
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    print("Maiores tempos próprios:")
+    for name, (self_us, cumulative_us, _) in slowest:
+        print(f"  {name:<45} {self_us / 1000:>8.1f} ms (acumulado {cumulative_us / 1000:.1f} ms)")
+
+    failed = False
+    if eager:
+        print(f"\nFALHA: dependências que deveriam carregar sob demanda foram importadas: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\nFALHA: importação de src/ levou {total_ms:.1f} ms, acima do orçamento de {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Servidor local que imita a API de Pokémon (login, lista/detalhes de Pokémon e combates).
+
+Serve os dados das planilhas do projeto (ou quaisquer listas informadas) no mesmo formato
+da API real: tipos separados por vírgula nos detalhes e ids em texto nos combates. Permite
+simular latência por requisição e limite de taxa (429 com Retry-After), para exercitar o
+extrator concorrente sem acessar a API real.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+MOCK_TOKEN = "mock-token"
+
+
+def default_dataset(file_pokemon="pokemon.xlsx", file_combat="combat_pokemon.xlsx", n_combats=None):
+    """
+    Converte as planilhas do projeto de volta para o formato de resposta da API.
+    """
+    df_pokemon = pd.read_excel(file_pokemon, dtype=str)
+    df_combat = pd.read_excel(file_combat, dtype=str)
+    if n_combats is not None:
+        df_combat = df_combat.head(n_combats)
+
+    pokemons = df_pokemon.to_dict(orient='records')
+    for pokemon in pokemons:
+        pokemon['id'] = int(pokemon['id'])
+        pokemon['types'] = pokemon['types'].replace('/', ',')
+        for stat in ('hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed'):
+            pokemon[stat] = int(pokemon[stat])
+
+    combats = df_combat[['first_pokemon', 'second_pokemon', 'winner']].to_dict(orient='records')
+    return pokemons, combats
+
+
+class MockApiState:
+    def __init__(self, pokemons, combats, latency=0.0, rate_limit=None, retry_after=1):
+        self.pokemons = pokemons
+        self.pokemons_by_id = {pokemon['id']: pokemon for pokemon in pokemons}
+        self.combats = combats
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def check_rate(self):
+        """
+        Janela deslizante de 1s: retorna False se o limite de requisições foi excedido.
+        """
+        with self._lock:
+            self.request_count += 1
+            if self.rate_limit is None:
+                return True
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.rate_limited_count += 1
+                return False
+            self._recent.append(now)
+            return True
+
+
+def _paginate(items, query):
+    page = int(query.get('page', ['1'])[0])
+    per_page = int(query.get('per_page', ['50'])[0])
+    start = (page - 1) * per_page
+    return items[start:start + per_page]
+
+
+def make_handler(state):
+    class MockApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Conexões keep-alive: evita o atraso do algoritmo de Nagle entre cabeçalho e corpo
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            if urlparse(self.path).path == "/login":
+                self._send(200, {"access_token": MOCK_TOKEN})
+            else:
+                self._send(404, {"detail": "Not Found"})
+
+        def do_GET(self):
+            if state.latency:
+                time.sleep(state.latency)
+            if not state.check_rate():
+                self._send(429, {"detail": "Too Many Requests"}, {"Retry-After": str(state.retry_after)})
+                return
+            if self.headers.get("Authorization") != f"Bearer {MOCK_TOKEN}":
+                self._send(401, {"detail": "Unauthorized"})
+                return
+
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = [part for part in url.path.split("/") if part]
+
+            if parts == ["pokemon"]:
+                page = _paginate(state.pokemons, query)
+                self._send(200, {"total": len(state.pokemons),
+                                 "pokemons": [{"id": p['id'], "name": p['name']} for p in page]})
+            elif len(parts) == 2 and parts[0] == "pokemon" and parts[1].isdigit():
+                pokemon = state.pokemons_by_id.get(int(parts[1]))
+                if pokemon is None:
+                    self._send(404, {"detail": "Not Found"})
+                else:
+                    self._send(200, pokemon)
+            elif parts == ["combats"]:
+                self._send(200, {"total": len(state.combats), "combats": _paginate(state.combats, query)})
+            else:
+                self._send(404, {"detail": "Not Found"})
+
+    return MockApiHandler
+
+
+def start_mock_server(pokemons, combats, latency=0.0, rate_limit=None, retry_after=1, port=0):
+    """
+    Sobe o servidor em uma thread. Retorna (server, state, base_url); encerre com server.shutdown().
+    """
+    state = MockApiState(pokemons, combats, latency, rate_limit, retry_after)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,337 @@
+"""
+Suíte de benchmarks reprodutível das funções de `src/` sobre dados sintéticos.
+
+Para cada tamanho (10^4 a 10^7 combates) um processo separado gera os dados com semente fixa
+(`benchmarks/synthetic.py`), mede cada função (melhor de `--repeat` execuções) e o pico de RSS
+durante a função (VmHWM do Linux, zerado antes de cada medida). Os caches do Streamlit são
+esvaziados antes de cada execução: as funções em cache chamadas por dentro (ex.:
+`compute_combat_stats` em `analyze_top_winners`) são recalculadas e os resultados guardados
+não somam ao RSS das medidas seguintes. As entradas que não são o objeto da medida (modelo,
+matriz de confrontos, índices já construídos) são montadas antes, fora da medida.
+O resultado é comparado com a linha de base salva em `benchmarks/baseline.json`: uma função
+mais lenta que a base além da tolerância é reportada como regressão e o processo termina
+com código 1.
+
+Uso:
+    python -m benchmarks.run_suite                      # compara com a linha de base
+    python -m benchmarks.run_suite --sizes 10000 100000 # apenas alguns tamanhos
+    python -m benchmarks.run_suite --save-baseline      # grava uma nova linha de base
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+N_POKEMON = 800
+MISSING_IDS = (N_POKEMON + 1,)
+SEED = 42
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Regressão: mais lento que a base em mais de TIME_TOLERANCE (fração) e MIN_TIME_DELTA segundos,
+# ou pico de RSS maior que a base em mais de RSS_TOLERANCE (fração) e MIN_RSS_DELTA_MB
+TIME_TOLERANCE = 0.30
+MIN_TIME_DELTA = 0.005
+RSS_TOLERANCE = 0.30
+MIN_RSS_DELTA_MB = 16
+
+# Combates usados para treinar o modelo da matriz de confrontos e pares consultados no índice de confrontos diretos
+FIXTURE_TRAIN_BATTLES = 50_000
+LOOKUP_PAIRS = 1_000
+
+
+def _fixture_builders(workdir):
+    """
+    Entradas das funções medidas que não fazem parte da medida (nome → função que recebe `data`).
+    Cada uma pode usar as anteriores, já guardadas em `data`.
+    """
+    import numpy as np
+
+    from src.analysis_types import analyze_type_win_rate
+    from src.analysis_utils import build_stat_matrix, compute_combat_stats, compute_feature_matrix
+    from src.confidence import encode_battles
+    from src.filter_index import CombatFilterIndex
+    from src.head_to_head import HeadToHeadIndex
+    from src.prediction import build_matchup_matrix
+    from src.team_builder import build_team_candidates
+    from src.training import TRAINING_PROFILES, fit_importance_model
+
+    def matchup_inputs(data):
+        # Modelo rápido, treinado em uma amostra fixa dos combates
+        X, y, feature_cols = compute_feature_matrix.__wrapped__(data['pokemon'],
+                                                                data['combat'].head(FIXTURE_TRAIN_BATTLES))
+        model, scaler, _ = fit_importance_model(X, y, feature_cols, TRAINING_PROFILES['hist_gb'])
+        return (model, scaler) + build_stat_matrix(data['pokemon'])
+
+    def matchup_matrix(data):
+        path = os.path.join(workdir, "matchups.npy")
+        build_matchup_matrix.__wrapped__(*data['matchup_inputs'], path)
+        return np.load(path, mmap_mode='r')
+
+    def lookup_pairs(data):
+        rng = np.random.default_rng(SEED)
+        return rng.integers(1, N_POKEMON + 1, size=(LOOKUP_PAIRS, 2)).tolist()
+
+    return {
+        'matchup_inputs': matchup_inputs,
+        'matchup_matrix': matchup_matrix,
+        'matchup_path': lambda data: os.path.join(workdir, "matchups-bench.npy"),
+        'combat_stats': lambda data: compute_combat_stats.__wrapped__(data['combat']),
+        'type_win_rate': lambda data: analyze_type_win_rate.__wrapped__(data['pokemon'], data['combat']),
+        'team_candidates': lambda data: build_team_candidates(data['pokemon'], data['combat_stats'],
+                                                              data['type_win_rate'], data['matchup_matrix']),
+        'team_ids': lambda data: data['team_candidates']['id'].head(6).to_numpy(),
+        'filter_index': lambda data: CombatFilterIndex(data['pokemon'], data['combat']),
+        'head_to_head': lambda data: HeadToHeadIndex(data['combat']),
+        'lookup_pairs': lookup_pairs,
+        'encoded_battles': lambda data: encode_battles(data['combat']),
+    }
+
+
+def _benchmark_cases():
+    """
+    Funções medidas: (nome, função que recebe os dados gerados, maior tamanho medido, entradas
+    de `_fixture_builders` usadas, na ordem em que são montadas).
+    As funções em cache são chamadas por `__wrapped__`, sem o cache e sem a instrumentação.
+    As que não dependem do número de combates (matriz de confrontos, busca de equipes) são
+    medidas só no menor tamanho.
+    """
+    from src.aggregate_store import CombatAggregates
+    from src.analysis_types import (analyze_type_matchups, analyze_type_win_rate, analyze_win_rate_intervals,
+                                    build_type_index)
+    from src.analysis_utils import (analyze_average_attributes, analyze_top_winners, analyze_win_distribution,
+                                    build_stat_matrix, compute_combat_stats, compute_feature_matrix,
+                                    difference_features, prepare_data)
+    from src.confidence import bootstrap_win_counts, wilson_interval
+    from src.data_loader import apply_combat_schema
+    from src.filter_index import CombatFilterIndex
+    from src.head_to_head import HeadToHeadIndex
+    from src.prediction import build_matchup_matrix, score_team
+    from src.ratings import BradleyTerryRatings, analyze_ratings
+    from src.streaming import DifferenceMoments
+    from src.team_builder import build_team_candidates, search_teams
+    from src.training import TRAINING_PROFILES, fit_importance_model
+
+    def fit_profile(profile):
+        def fit(data):
+            X, y, feature_cols = compute_feature_matrix.__wrapped__(data['pokemon'], data['combat'])
+            return fit_importance_model(X, y, feature_cols, TRAINING_PROFILES[profile])
+        return fit
+
+    def lookup_pairs(data):
+        for pokemon_id, opponent_id in data['lookup_pairs']:
+            data['head_to_head'].lookup(pokemon_id, opponent_id)
+
+    team_inputs = ('matchup_inputs', 'matchup_matrix', 'combat_stats', 'type_win_rate')
+    return [
+        ('apply_combat_schema', lambda data: apply_combat_schema(data['combat'].astype('int64')), None, ()),
+        ('build_stat_matrix', lambda data: build_stat_matrix(data['pokemon']), None, ()),
+        ('build_type_index', lambda data: build_type_index(data['pokemon']), None, ()),
+        ('compute_combat_stats', lambda data: compute_combat_stats.__wrapped__(data['combat']), None, ()),
+        ('difference_features', lambda data: difference_features.__wrapped__(data['pokemon'], data['combat']),
+         None, ()),
+        ('prepare_data', lambda data: prepare_data.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('compute_feature_matrix',
+         lambda data: compute_feature_matrix.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('analyze_type_win_rate',
+         lambda data: analyze_type_win_rate.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('analyze_type_matchups',
+         lambda data: analyze_type_matchups.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('analyze_top_winners', lambda data: analyze_top_winners.__wrapped__(data['pokemon'], data['combat']),
+         None, ()),
+        ('analyze_win_distribution', lambda data: analyze_win_distribution.__wrapped__(data['combat']), None, ()),
+        ('analyze_average_attributes', lambda data: analyze_average_attributes.__wrapped__(data['pokemon']),
+         None, ()),
+        ('analyze_ratings', lambda data: analyze_ratings.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('wilson_interval', lambda data: wilson_interval(data['combat_stats']['wins'].to_numpy(),
+                                                         data['combat_stats']['total'].to_numpy()),
+         None, ('combat_stats',)),
+        ('bootstrap_win_counts', lambda data: bootstrap_win_counts(*data['encoded_battles']), None,
+         ('encoded_battles',)),
+        ('analyze_win_rate_intervals',
+         lambda data: analyze_win_rate_intervals.__wrapped__(data['pokemon'], data['combat']), None, ()),
+        ('CombatFilterIndex', lambda data: CombatFilterIndex(data['pokemon'], data['combat']), None, ()),
+        ('CombatFilterIndex.filtered_stats',
+         lambda data: data['filter_index'].filtered_stats(generations=[1, 2], legendary=False, scope='battles'),
+         None, ('filter_index',)),
+        ('HeadToHeadIndex', lambda data: HeadToHeadIndex(data['combat']), None, ()),
+        (f'HeadToHeadIndex.lookup[x{LOOKUP_PAIRS}]', lookup_pairs, None, ('head_to_head', 'lookup_pairs')),
+        ('build_matchup_matrix',
+         lambda data: build_matchup_matrix.__wrapped__(*data['matchup_inputs'], data['matchup_path']), 10_000,
+         ('matchup_inputs', 'matchup_path')),
+        ('build_team_candidates',
+         lambda data: build_team_candidates(data['pokemon'], data['combat_stats'], data['type_win_rate'],
+                                            data['matchup_matrix']), 10_000, team_inputs),
+        ('search_teams', lambda data: search_teams.__wrapped__(data['team_candidates'], data['matchup_matrix']),
+         10_000, team_inputs + ('team_candidates',)),
+        ('score_team', lambda data: score_team(data['matchup_matrix'], data['team_ids']), 10_000,
+         team_inputs + ('team_candidates', 'team_ids')),
+        ('CombatAggregates.apply_delta',
+         lambda data: CombatAggregates(build_type_index(data['pokemon'])).apply_delta(data['combat']), None, ()),
+        ('BradleyTerryRatings.apply_delta', lambda data: BradleyTerryRatings().apply_delta(data['combat']), None,
+         ()),
+        ('DifferenceMoments.apply_delta',
+         lambda data: DifferenceMoments().apply_delta(data['pokemon'], data['combat']), None, ()),
+        ('fit_importance_model[subsample]', fit_profile('subsample'), 1_000_000, ()),
+        ('fit_importance_model[full]', fit_profile('full'), 100_000, ()),
+    ]
+
+
+def _reset_peak_rss():
+    """
+    Zera o pico de RSS do processo (Linux). Retorna False se não for possível.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(can_reset):
+    if can_reset:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    # Sem reset o valor é o pico do processo inteiro (limite superior)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(n_battles, repeat):
+    """
+    Executado no processo filho: gera os dados de um tamanho e imprime um JSON por função medida.
+    """
+    import streamlit as st
+
+    from benchmarks.synthetic import make_combats, make_pokemon
+
+    df_pokemon = make_pokemon(N_POKEMON, seed=SEED)
+    data = {'pokemon': df_pokemon,
+            'combat': make_combats(df_pokemon, n_battles, seed=SEED, missing_ids=MISSING_IDS)}
+    workdir = tempfile.TemporaryDirectory()
+    builders = _fixture_builders(workdir.name)
+
+    cases = [case for case in _benchmark_cases() if case[2] is None or n_battles <= case[2]]
+    for position, (name, func, _, fixtures) in enumerate(cases):
+        # Entradas montadas fora da medida; as que nenhuma função seguinte usa são liberadas
+        for fixture in fixtures:
+            if fixture not in data:
+                data[fixture] = builders[fixture](data)
+        needed = {fixture for case in cases[position + 1:] for fixture in case[3]}
+        timings = []
+        peak_rss = 0.0
+        for _ in range(repeat):
+            # Sem resultados em cache: as chamadas internas são recalculadas a cada execução
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            can_reset = _reset_peak_rss()
+            start = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+            peak_rss = max(peak_rss, _peak_rss_mb(can_reset))
+        print(json.dumps({'function': name, 'size': n_battles, 'seconds': min(timings),
+                          'peak_rss_mb': round(peak_rss, 1)}), flush=True)
+        for fixture in set(builders) - needed:
+            data.pop(fixture, None)
+    workdir.cleanup()
+
+
+def run_suite(sizes, repeat):
+    results = []
+    for n_battles in sizes:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run_suite", "--worker", str(n_battles), "--repeat", str(repeat)],
+            check=True, capture_output=True, text=True).stdout
+        results += [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+    return results
+
+
+def _key(result):
+    return f"{result['function']}@{result['size']}"
+
+
+def compare_with_baseline(results, baseline):
+    """
+    Retorna as linhas da comparação e a lista de regressões (função@tamanho).
+    """
+    base_results = baseline.get('results', {})
+    rows, regressions = [], []
+    for result in results:
+        base = base_results.get(_key(result))
+        status = 'novo'
+        if base is not None:
+            slower = (result['seconds'] > base['seconds'] * (1 + TIME_TOLERANCE)
+                      and result['seconds'] - base['seconds'] > MIN_TIME_DELTA)
+            heavier = (result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + RSS_TOLERANCE)
+                       and result['peak_rss_mb'] - base['peak_rss_mb'] > MIN_RSS_DELTA_MB)
+            status = 'REGRESSÃO' if slower or heavier else 'ok'
+            if slower or heavier:
+                regressions.append(_key(result))
+        rows.append((result, base, status))
+    return rows, regressions
+
+
+def _environment():
+    import numpy as np
+    import pandas as pd
+    import sklearn
+
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'scikit-learn': sklearn.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks das funções de src/ com dados sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        run_worker(args.worker, args.repeat)
+        return 0
+
+    results = run_suite(args.sizes, args.repeat)
+
+    if args.save_baseline:
+        baseline = {'environment': _environment(), 'seed': SEED,
+                    'results': {_key(result): {'seconds': result['seconds'], 'peak_rss_mb': result['peak_rss_mb']}
+                                for result in results}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows, regressions = compare_with_baseline(results, baseline)
+
+    print(f"{'função':<34} {'combates':>11} {'tempo (s)':>10} {'base (s)':>9} {'combates/s':>13} "
+          f"{'pico RSS (MB)':>14} {'base (MB)':>10}  status")
+    for result, base, status in rows:
+        base_seconds = f"{base['seconds']:.4f}" if base else '-'
+        base_rss = f"{base['peak_rss_mb']:.1f}" if base else '-'
+        throughput = result['size'] / result['seconds'] if result['seconds'] > 0 else float('inf')
+        print(f"{result['function']:<34} {result['size']:>11,} {result['seconds']:>10.4f} {base_seconds:>9} "
+              f"{throughput:>13,.0f} {result['peak_rss_mb']:>14.1f} {base_rss:>10}  {status}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regressão(ões) em relação à linha de base: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Geradores sintéticos (com semente) de tabelas de Pokémon e de combates.
+
+As tabelas saem no mesmo esquema compacto que `load_data` produz (`apply_pokemon_schema`
+e `apply_combat_schema`), então podem ser passadas diretamente às funções de `src/`. O
+vencedor de cada combate é sorteado com probabilidade crescente na diferença de atributos
+(principalmente Speed e ataques), como nos dados reais, para que o modelo de importância
+tenha o que aprender.
+"""
+import numpy as np
+import pandas as pd
+
+from src.data_loader import POKEMON_COLUMNS, STAT_COLUMNS, apply_combat_schema, apply_pokemon_schema
+
+TYPES = ['Bug', 'Dark', 'Dragon', 'Electric', 'Fairy', 'Fighting', 'Fire', 'Flying', 'Ghost', 'Grass',
+         'Ground', 'Ice', 'Normal', 'Poison', 'Psychic', 'Rock', 'Steel', 'Water']
+
+# Peso de cada diferença de atributo (P1 - P2) no logit da vitória do P1
+OUTCOME_WEIGHTS = {'hp': 0.01, 'attack': 0.02, 'defense': 0.005, 'sp_attack': 0.02, 'sp_defense': 0.01,
+                   'speed': 0.06}
+
+
+def make_pokemon(n_pokemon=800, seed=0, legendary_share=0.08):
+    """
+    Gera `n_pokemon` Pokémon com ids 1..n_pokemon, um ou dois tipos e atributos inteiros.
+    """
+    rng = np.random.default_rng(seed)
+    legendary = rng.random(n_pokemon) < legendary_share
+
+    # Lendários têm atributos ~30% maiores, como nos dados reais
+    base = rng.normal(70, 25, size=(n_pokemon, len(STAT_COLUMNS)))
+    base[legendary] *= 1.3
+    stats = np.clip(np.rint(base), 5, 255).astype(np.int64)
+
+    type1 = rng.choice(TYPES, n_pokemon)
+    type2 = rng.choice(TYPES, n_pokemon)
+    has_type2 = (rng.random(n_pokemon) < 0.5) & (type2 != type1)
+    types = np.where(has_type2, np.char.add(np.char.add(type1, '/'), type2), type1)
+
+    df = pd.DataFrame(stats, columns=STAT_COLUMNS)
+    df.insert(0, 'id', np.arange(1, n_pokemon + 1))
+    df.insert(1, 'name', [f'Pokémon {i}' for i in range(1, n_pokemon + 1)])
+    df['generation'] = rng.integers(1, 7, n_pokemon)
+    df['legendary'] = np.where(legendary, 'true', 'false')
+    df['types'] = types
+    return apply_pokemon_schema(df[POKEMON_COLUMNS])
+
+
+def make_combats(df_pokemon, n_battles, seed=0, missing_ids=()):
+    """
+    Gera `n_battles` combates entre os Pokémon de `df_pokemon`.
+
+    `missing_ids` são ids que aparecem nos combates sem existir na tabela de Pokémon (como o
+    id 63 dos dados reais); cada um entra em cerca de 0,1% dos combates.
+    """
+    rng = np.random.default_rng(seed)
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    first = rng.choice(ids, n_battles)
+    second = rng.choice(ids, n_battles)
+
+    # 1. Probabilidade de vitória do P1 pela diferença de atributos
+    stat_matrix = np.zeros((ids.max() + 1, len(STAT_COLUMNS)))
+    stat_matrix[ids] = df_pokemon[STAT_COLUMNS].to_numpy(dtype=np.float64)
+    weights = np.array([OUTCOME_WEIGHTS[col] for col in STAT_COLUMNS])
+    logit = (stat_matrix[first] - stat_matrix[second]) @ weights
+    winner = np.where(rng.random(n_battles) < 1 / (1 + np.exp(-logit)), first, second)
+
+    # 2. Ids inexistentes substituem o P2 em uma pequena fração dos combates
+    for missing_id in missing_ids:
+        rows = rng.random(n_battles) < 0.001
+        winner = np.where(rows & (winner == second), missing_id, winner)
+        second = np.where(rows, missing_id, second)
+
+    return apply_combat_schema(pd.DataFrame({
+        'battle_id': np.arange(1, n_battles + 1),
+        'first_pokemon': first,
+        'second_pokemon': second,
+        'winner': winner,
+    }))
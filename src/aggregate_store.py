@@ -0,0 +1,198 @@
+"""
+Agregados de combate mantidos de forma incremental.
+
+As funções de `src/analysis_utils.py` e `src/analysis_types.py` recalculam tudo a partir do
+`df_combat` completo. Aqui os mesmos agregados (vitórias/combates/primeiros ataques por
+Pokémon, vitórias/combates por tipo e o histograma de vitórias) são atualizados apenas com
+os combates novos: o custo de `apply_delta` depende do tamanho do lote, não do histórico.
+
+O estado é salvo em um snapshot `.npz` junto com o número de combates já aplicados e o
+último `battle_id`, de modo que `refresh_aggregates` só aplica a cauda de um log de combates
+que apenas cresce (como o de `src/combat_sync.py`). A equivalência com o recálculo completo
+é verificada em `benchmarks/bench_aggregate_store.py`.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.analysis_utils import combat_stats_frame
+from src.analysis_types import build_type_index, type_win_counts, type_win_rate_table
+
+AGGREGATES_FILE = "aggregates.npz"
+AGGREGATES_FORMAT_VERSION = 1
+
+
+def _type_index_hash(type_index):
+    type_names, membership = type_index
+    digest = hashlib.sha256()
+    digest.update("\0".join(type_names).encode("utf-8"))
+    digest.update(np.ascontiguousarray(membership).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _grow(array, size):
+    if len(array) >= size:
+        return array
+    return np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)])
+
+
+class CombatAggregates:
+    """
+    Estado agregado dos combates já aplicados.
+
+    Vetores por id: `wins`, `total` e `first_moves`. Por tipo: `type_wins` e `type_totals`
+    (ids fora do índice de tipos são ignorados, como em `analyze_type_win_rate`).
+    `win_histogram[k]` é o número de Pokémon com exatamente `k` vitórias, entre os que
+    participaram de algum combate.
+    """
+
+    def __init__(self, type_index):
+        self.type_index = type_index
+        n_types = len(type_index[0])
+        self.wins = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0, dtype=np.int64)
+        self.first_moves = np.zeros(0, dtype=np.int64)
+        self.type_wins = np.zeros(n_types, dtype=np.int64)
+        self.type_totals = np.zeros(n_types, dtype=np.int64)
+        self.win_histogram = np.zeros(1, dtype=np.int64)
+        self.rows = 0
+        self.last_battle_id = 0
+
+    def apply_delta(self, df_delta):
+        """
+        Soma um lote de combates novos aos agregados.
+        """
+        if df_delta.empty:
+            return self
+
+        first = df_delta['first_pokemon'].to_numpy(dtype=np.int64)
+        second = df_delta['second_pokemon'].to_numpy(dtype=np.int64)
+        winner = df_delta['winner'].to_numpy(dtype=np.int64)
+        is_p1_winner = winner == first
+
+        # 1. Contagens do lote, apenas para os ids que aparecem nele
+        participants = np.concatenate([first, second])
+        touched, inverse = np.unique(participants, return_inverse=True)
+        delta_total = np.bincount(inverse, minlength=len(touched))
+        delta_first = np.bincount(inverse[:len(first)], minlength=len(touched))
+        won = np.concatenate([is_p1_winner, ~is_p1_winner])
+        delta_wins = np.bincount(inverse[won], minlength=len(touched))
+
+        n_ids = int(touched[-1]) + 1
+        self.wins = _grow(self.wins, n_ids)
+        self.total = _grow(self.total, n_ids)
+        self.first_moves = _grow(self.first_moves, n_ids)
+
+        # 2. Histograma: remove a contagem antiga dos ids tocados e soma a nova
+        old_wins = self.wins[touched]
+        old_seen = self.total[touched] > 0
+        np.subtract.at(self.win_histogram, old_wins[old_seen], 1)
+
+        self.wins[touched] += delta_wins
+        self.total[touched] += delta_total
+        self.first_moves[touched] += delta_first
+
+        new_wins = self.wins[touched]
+        self.win_histogram = _grow(self.win_histogram, int(new_wins.max()) + 1)
+        np.add.at(self.win_histogram, new_wins, 1)
+
+        # 3. Tipos: apenas as linhas dos ids tocados na matriz de pertinência
+        _, membership = self.type_index
+        in_index = touched < membership.shape[0]
+        rows = membership[touched[in_index]]
+        self.type_wins += delta_wins[in_index] @ rows
+        self.type_totals += delta_total[in_index] @ rows
+
+        self.rows += len(df_delta)
+        if 'battle_id' in df_delta:
+            self.last_battle_id = int(df_delta['battle_id'].iloc[-1])
+        return self
+
+    def combat_stats(self):
+        """
+        Mesmo resultado de `compute_combat_stats` para os combates aplicados.
+        """
+        return combat_stats_frame(self.wins.copy(), self.total.copy(), self.first_moves.copy())
+
+    def type_win_rate(self):
+        """
+        Mesmo resultado de `analyze_type_win_rate` para os combates aplicados.
+        """
+        type_names, _ = self.type_index
+        return type_win_rate_table(pd.DataFrame({
+            'Tipo': type_names,
+            'Total de Combates': self.type_totals.copy(),
+            'Total de Vitórias': self.type_wins.copy()
+        }))
+
+    def save(self, path):
+        """
+        Grava o snapshot de forma atômica.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, format_version=AGGREGATES_FORMAT_VERSION,
+                 type_index_hash=_type_index_hash(self.type_index),
+                 rows=self.rows, last_battle_id=self.last_battle_id,
+                 wins=self.wins, total=self.total, first_moves=self.first_moves,
+                 type_wins=self.type_wins, type_totals=self.type_totals, win_histogram=self.win_histogram)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, type_index):
+        """
+        Lê um snapshot. Se o índice de tipos mudou (outro DataFrame de Pokémon), os agregados
+        por tipo são refeitos a partir dos vetores por id. Retorna None se o arquivo não existe
+        ou é de outra versão.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as snapshot:
+            if int(snapshot['format_version']) != AGGREGATES_FORMAT_VERSION:
+                return None
+            aggregates = cls(type_index)
+            for name in ('wins', 'total', 'first_moves', 'win_histogram'):
+                setattr(aggregates, name, snapshot[name])
+            aggregates.rows = int(snapshot['rows'])
+            aggregates.last_battle_id = int(snapshot['last_battle_id'])
+
+            if str(snapshot['type_index_hash']) == _type_index_hash(type_index):
+                aggregates.type_wins = snapshot['type_wins']
+                aggregates.type_totals = snapshot['type_totals']
+            else:
+                df_counts = type_win_counts(type_index, aggregates.wins, aggregates.total)
+                aggregates.type_wins = df_counts['Total de Vitórias'].to_numpy()
+                aggregates.type_totals = df_counts['Total de Combates'].to_numpy()
+        return aggregates
+
+
+def refresh_aggregates(df_pokemon, df_combat, path):
+    """
+    Atualiza o snapshot em `path` com os combates de `df_combat` ainda não aplicados.
+
+    `df_combat` é tratado como um log que só cresce: se o snapshot não corresponde ao início
+    do log (menos linhas que o snapshot ou `battle_id` diferente na última linha aplicada),
+    os agregados são recalculados do zero. Retorna (aggregates, linhas_aplicadas).
+    """
+    type_index = build_type_index(df_pokemon)
+    aggregates = CombatAggregates.load(path, type_index)
+
+    if aggregates is not None and aggregates.rows > 0:
+        consistent = aggregates.rows <= len(df_combat)
+        if consistent and 'battle_id' in df_combat:
+            consistent = int(df_combat['battle_id'].iloc[aggregates.rows - 1]) == aggregates.last_battle_id
+        if not consistent:
+            aggregates = None
+
+    if aggregates is None:
+        aggregates = CombatAggregates(type_index)
+
+    delta = df_combat.iloc[aggregates.rows:]
+    aggregates.apply_delta(delta)
+    if len(delta) or not os.path.exists(path):
+        aggregates.save(path)
+    return aggregates, len(delta)
@@ -1,63 +1,246 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-@st.cache_data
+from src.analysis_utils import compute_combat_stats
+from src.confidence import BOOTSTRAP_REPLICATES, BOOTSTRAP_SEED, bootstrap_interval, bootstrap_win_counts, \
+    encode_battles, percentile_interval, rescale_interval, wilson_interval
+from src.instrumentation import instrumented
+
+
+def build_type_index(df_pokemon):
+    """
+    Constrói o índice id → códigos de tipo, calculado uma única vez por DataFrame de Pokémon.
+
+    Retorna a lista de nomes de tipos (o código de cada tipo é a sua posição na lista)
+    e uma matriz de pertinência `membership` de formato (maior_id + 1, n_tipos), onde
+    membership[id, código] = 1 se o Pokémon possui aquele tipo (primário ou secundário).
+    """
+
+    # 1. Os tipos já chegam codificados nas colunas categóricas 'type1' e 'type2'
+    type_names = df_pokemon['type1'].cat.categories.tolist()
+
+    # 2. Montar a matriz id × tipo (tipos repetidos no mesmo Pokémon contam uma vez)
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    membership = np.zeros((ids.max() + 1 if len(ids) else 0, len(type_names)), dtype=np.int64)
+    for type_col in ('type1', 'type2'):
+        codes = df_pokemon[type_col].cat.codes.to_numpy(dtype=np.int64)
+        mask = codes >= 0
+        membership[ids[mask], codes[mask]] = 1
+
+    return type_names, membership
+
+
+def type_win_counts(type_index, wins_per_id, totals_per_id):
+    """
+    Agrega vitórias e combates por id em vitórias e combates por tipo.
+
+    `wins_per_id` e `totals_per_id` são vetores indexados pelo id do Pokémon. Ids sem
+    entrada no índice de tipos (ausentes no DataFrame de Pokémon) são ignorados, assim
+    como no cálculo original.
+    """
+    type_names, membership = type_index
+
+    # Alinha os vetores por id com o número de linhas da matriz de pertinência
+    n_ids = membership.shape[0]
+    wins = np.zeros(n_ids, dtype=np.int64)
+    totals = np.zeros(n_ids, dtype=np.int64)
+    n = min(n_ids, len(wins_per_id))
+    wins[:n] = wins_per_id[:n]
+    totals[:n] = totals_per_id[:n]
+
+    # Cada combate de um Pokémon conta para todos os seus tipos
+    type_wins = wins @ membership
+    type_totals = totals @ membership
+
+    return pd.DataFrame({
+        'Tipo': type_names,
+        'Total de Combates': type_totals,
+        'Total de Vitórias': type_wins
+    })
+
+
+@instrumented(cache=st.cache_data)
 def analyze_type_win_rate(df_pokemon, df_combat):
     """
     Calcula a taxa de vitória de cada tipo de Pokémon em todos os combates.
     """
 
-    # 1. Desmembrar Tipos (Primary e Secondary)
-    type_splits = df_pokemon[['id', 'types']].copy()
-    type_splits['type1'] = type_splits['types'].apply(lambda x: x.split('/')[0].strip())
-    type_splits['type2'] = type_splits['types'].apply(
-        lambda x: x.split('/')[1].strip() if len(x.split('/')) > 1 else None)
-
-    df_types_melted = type_splits.melt(
-        id_vars=['id'],
-        value_vars=['type1', 'type2'],
-        value_name='Type'
-    ).dropna(subset=['Type'])
-    df_types_melted = df_types_melted[['id', 'Type']].drop_duplicates()
-
-    # 2. Contar Vitórias e Derrotas
-    type_stats = {}
-
-    for _, row in df_combat.iterrows():
-        p1_id = row['first_pokemon']
-        p2_id = row['second_pokemon']
-        winner_id = row['winner']
-
-        p1_types = df_types_melted[df_types_melted['id'] == p1_id]['Type'].tolist()
-        p2_types = df_types_melted[df_types_melted['id'] == p2_id]['Type'].tolist()
-
-        # Função auxiliar para atualizar as estatísticas
-        def update_stats(type_list, is_winner):
-            for p_type in type_list:
-                if p_type not in type_stats:
-                    type_stats[p_type] = {'wins': 0, 'total': 0}
-
-                type_stats[p_type]['total'] += 1
-                if is_winner:
-                    type_stats[p_type]['wins'] += 1
-
-        # Atualizar estatísticas
-        is_p1_winner = (winner_id == p1_id)
-        update_stats(p1_types, is_p1_winner)
-        update_stats(p2_types, not is_p1_winner)
-
-    # 3. Calcular a Taxa de Vitória
-    type_win_rates = []
-    for p_type, stats in type_stats.items():
-        win_rate = (stats['wins'] / stats['total']) * 100 if stats['total'] > 0 else 0
-        type_win_rates.append({
-            'Tipo': p_type,
-            'Taxa de Vitória (%)': win_rate,
-            'Total de Combates': stats['total'],
-            'Total de Vitórias': stats['wins']
-        })
-
-    df_win_rate = pd.DataFrame(type_win_rates)
+    # 1. Índice id → tipos
+    type_index = build_type_index(df_pokemon)
+
+    # 2. Vitórias e Combates por id vêm do agregado compartilhado por Pokémon
+    combat_stats = compute_combat_stats(df_combat)
+    df_counts = type_win_counts(type_index, combat_stats['wins'].to_numpy(), combat_stats['total'].to_numpy())
+
+    return type_win_rate_table(df_counts)
+
+
+def type_win_rate_table(df_counts):
+    """
+    Calcula a tabela final de `analyze_type_win_rate` a partir das vitórias e combates por tipo.
+    """
+
+    # 3. Calcular a Taxa de Vitória (apenas tipos que participaram de algum combate)
+    df_win_rate = df_counts[df_counts['Total de Combates'] > 0].copy()
+    df_win_rate.insert(1, 'Taxa de Vitória (%)',
+                       (df_win_rate['Total de Vitórias'] / df_win_rate['Total de Combates']) * 100)
     df_win_rate = df_win_rate.sort_values(by='Taxa de Vitória (%)', ascending=False)
 
-    return df_win_rate
+    return df_win_rate.reset_index(drop=True)
+
+
+@instrumented(cache=st.cache_data)
+def analyze_win_rate_intervals(df_pokemon, df_combat, n_replicates=BOOTSTRAP_REPLICATES, seed=BOOTSTRAP_SEED):
+    """
+    Intervalos bootstrap de 95% das taxas de vitória por tipo e por Pokémon.
+
+    As mesmas réplicas dos combates (`bootstrap_win_counts`) são agregadas por id e, pela
+    matriz de pertinência, por tipo, exatamente como no cálculo pontual. Com muitos combates,
+    cada réplica sorteia só parte deles e os intervalos são reescalados (ver `src/confidence.py`),
+    de modo que o custo não cresce com o número de combates. Retorna (por tipo, por Pokémon):
+    'Tipo' ou 'id' com 'IC Bootstrap Inferior (%)' e 'IC Bootstrap Superior (%)'; por Pokémon
+    também o intervalo do número de vitórias ('Vitórias IC Inferior' e 'Vitórias IC Superior').
+    """
+
+    # 1. Réplicas de vitórias e combates por id, e as contagens pontuais sobre todos os combates
+    winners, losers, n_ids = encode_battles(df_combat)
+    wins, totals, n_draws = bootstrap_win_counts(winners, losers, n_ids, n_replicates, seed)
+    point_wins = np.bincount(winners, minlength=n_ids)
+    point_totals = point_wins + np.bincount(losers, minlength=n_ids)
+    shrink = np.sqrt(n_draws / len(winners)) if len(winners) else 1.0
+
+    # 2. Por Pokémon, apenas quem participou de algum combate (vitórias reescaladas para n combates)
+    ids = np.flatnonzero(point_totals)
+    low, high = bootstrap_interval(wins[:, ids], totals[:, ids], point_wins[ids] / point_totals[ids], shrink)
+    scaled_wins = wins[:, ids] * (len(winners) / n_draws) if n_draws else wins[:, ids]
+    wins_low, wins_high = rescale_interval(*percentile_interval(scaled_wins), point_wins[ids], shrink)
+    df_pokemon_intervals = pd.DataFrame({
+        'id': ids,
+        'IC Bootstrap Inferior (%)': low * 100,
+        'IC Bootstrap Superior (%)': high * 100,
+        'Vitórias IC Inferior': np.maximum(wins_low, 0),
+        'Vitórias IC Superior': wins_high,
+    })
+
+    # 3. Por tipo: cada réplica passa pela matriz de pertinência (ids sem cadastro são ignorados)
+    type_names, membership = build_type_index(df_pokemon)
+    n = min(n_ids, membership.shape[0])
+    type_wins, type_totals = point_wins[:n] @ membership[:n], point_totals[:n] @ membership[:n]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        type_rate = type_wins / type_totals
+    low, high = bootstrap_interval(wins[:, :n] @ membership[:n], totals[:, :n] @ membership[:n], type_rate, shrink)
+    df_type_intervals = pd.DataFrame({
+        'Tipo': type_names,
+        'IC Bootstrap Inferior (%)': low * 100,
+        'IC Bootstrap Superior (%)': high * 100,
+    })
+
+    return df_type_intervals, df_pokemon_intervals
+
+
+# Níveis da matriz de confrontos: tipos individuais ou combinações de tipos (ex.: 'Fire/Flying')
+TYPE_MATCHUP_LEVELS = ('type', 'combination')
+
+
+def type_code_table(df_pokemon, level='type'):
+    """
+    Codifica os tipos de cada Pokémon como inteiros indexados pelo id.
+
+    Retorna (nomes, codes): `codes` tem formato (maior_id + 1, k) com o código do tipo
+    (posição em `nomes`) ou -1 quando ausente. Com level='type', k = 2 (tipo primário e
+    secundário); com level='combination', k = 1 (a combinação de tipos do Pokémon).
+    """
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    n_ids = ids.max() + 1 if len(ids) else 0
+    code1 = df_pokemon['type1'].cat.codes.to_numpy(dtype=np.int64)
+    code2 = df_pokemon['type2'].cat.codes.to_numpy(dtype=np.int64)
+
+    if level == 'type':
+        names = df_pokemon['type1'].cat.categories.tolist()
+        codes = np.full((n_ids, 2), -1, dtype=np.int64)
+        codes[ids, 0] = code1
+        # Um tipo repetido no mesmo Pokémon conta uma vez
+        codes[ids, 1] = np.where(code2 == code1, -1, code2)
+        return names, codes
+
+    if level == 'combination':
+        type_names = np.array(df_pokemon['type1'].cat.categories.tolist() + [''], dtype=object)
+        labels = np.where(code2 >= 0, type_names[code1] + '/' + type_names[code2], type_names[code1])
+        combination_codes, names = pd.factorize(labels, sort=True)
+        codes = np.full((n_ids, 1), -1, dtype=np.int64)
+        codes[ids, 0] = combination_codes
+        return names.tolist(), codes
+
+    raise ValueError(f"Nível desconhecido: {level}. Use um de {TYPE_MATCHUP_LEVELS}.")
+
+
+def type_matchup_counts(codes, n_types, df_combat):
+    """
+    Acumula vitórias e combates de cada par (tipo, tipo do oponente) em uma passada pelos combates.
+
+    Cada combate conta uma vez do ponto de vista de cada participante, para cada combinação
+    dos seus códigos de tipo. Os pares são codificados como `tipo * n_types + oponente` e
+    acumulados com `np.bincount`, então o custo é linear no número de combates.
+    Retorna as matrizes (wins, totals) de formato (n_types, n_types).
+    """
+    first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+    second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+    p1_won = df_combat['winner'].to_numpy(dtype=np.int64) == first
+
+    # Ids sem cadastro (ou além do maior id conhecido) não têm tipo
+    n_ids = int(max(first.max(initial=0), second.max(initial=0))) + 1
+    if n_ids > codes.shape[0]:
+        codes = np.vstack([codes, np.full((n_ids - codes.shape[0], codes.shape[1]), -1, dtype=np.int64)])
+
+    n_cells = n_types * n_types
+    wins = np.zeros(n_cells, dtype=np.int64)
+    totals = np.zeros(n_cells, dtype=np.int64)
+    for i in range(codes.shape[1]):
+        for j in range(codes.shape[1]):
+            first_type = codes[first, i]
+            second_type = codes[second, j]
+            valid = (first_type >= 0) & (second_type >= 0)
+            first_type, second_type, won = first_type[valid], second_type[valid], p1_won[valid]
+
+            # Ponto de vista do P1 (tipo × oponente) e do P2 (oponente × tipo)
+            p1_cells = first_type * n_types + second_type
+            p2_cells = second_type * n_types + first_type
+            totals += np.bincount(p1_cells, minlength=n_cells) + np.bincount(p2_cells, minlength=n_cells)
+            wins += np.bincount(p1_cells[won], minlength=n_cells) + np.bincount(p2_cells[~won], minlength=n_cells)
+
+    return wins.reshape(n_types, n_types), totals.reshape(n_types, n_types)
+
+
+@instrumented(cache=st.cache_data)
+def analyze_type_matchups(df_pokemon, df_combat, level='type'):
+    """
+    Calcula a taxa de vitória de cada tipo contra cada tipo de oponente.
+
+    Retorna uma linha por par com combates: 'Tipo', 'Tipo do Oponente', 'Total de Combates',
+    'Total de Vitórias', 'Taxa de Vitória (%)' e o intervalo de Wilson de 95%
+    ('IC Inferior (%)' e 'IC Superior (%)'). `level` escolhe tipos individuais ('type') ou
+    combinações de tipos ('combination').
+    """
+
+    # 1. Tipos codificados por id
+    names, codes = type_code_table(df_pokemon, level)
+
+    # 2. Vitórias e combates por par de tipos
+    wins, totals = type_matchup_counts(codes, len(names), df_combat)
+
+    # 3. Formato longo, apenas pares que se enfrentaram
+    rows, cols = np.nonzero(totals)
+    pair_wins, pair_totals = wins[rows, cols], totals[rows, cols]
+    low, high = wilson_interval(pair_wins, pair_totals)
+    names = np.array(names, dtype=object)
+
+    return pd.DataFrame({
+        'Tipo': names[rows],
+        'Tipo do Oponente': names[cols],
+        'Total de Combates': pair_totals,
+        'Total de Vitórias': pair_wins,
+        'Taxa de Vitória (%)': pair_wins / pair_totals * 100,
+        'IC Inferior (%)': low * 100,
+        'IC Superior (%)': high * 100,
+    })
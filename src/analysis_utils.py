@@ -1,134 +1,193 @@
 import streamlit as st
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from collections import defaultdict
 import numpy as np
 
-@st.cache_data
+from src.instrumentation import instrumented
+from src.model_registry import load_or_train
+from src.training import TRAINING_PROFILES, DEFAULT_PROFILE, fit_importance_model
+
+# Atributos numéricos usados nas features de diferença
+STAT_ATTRIBUTES = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+
+
+def build_stat_matrix(df_pokemon, attributes=STAT_ATTRIBUTES):
+    """
+    Monta a matriz densa de atributos indexada pelo id do Pokémon.
+
+    Retorna (stat_matrix, known): stat_matrix[id] contém os atributos do Pokémon `id`
+    (linhas de ids inexistentes ficam zeradas) e known[id] indica se o id existe no
+    DataFrame de Pokémon.
+    """
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    n_ids = ids.max() + 1 if len(ids) else 0
+
+    stat_matrix = np.zeros((n_ids, len(attributes)), dtype=np.int16)
+    stat_matrix[ids] = df_pokemon[attributes].to_numpy(dtype=np.int16)
+
+    known = np.zeros(n_ids, dtype=bool)
+    known[ids] = True
+
+    return stat_matrix, known
+
+
+@instrumented
+def difference_features(df_pokemon, df_combat, attributes=STAT_ATTRIBUTES):
+    """
+    Calcula as diferenças de atributos (P1 - P2) de cada combate sem nenhum merge.
+
+    Retorna (valid, diffs, p1_won): `valid` marca os combates em que os dois Pokémon existem
+    no DataFrame de Pokémon (equivalente ao merge interno), `diffs` é a matriz
+    (combates válidos × atributos) e `p1_won` indica se o P1 venceu.
+    """
+    stat_matrix, known = build_stat_matrix(df_pokemon, attributes)
+
+    first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+    second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+    winner = df_combat['winner'].to_numpy(dtype=np.int64)
+
+    # Ids além do maior id conhecido são tratados como inexistentes
+    n_ids = int(max(first.max(initial=0), second.max(initial=0))) + 1
+    if n_ids > len(known):
+        known = np.concatenate([known, np.zeros(n_ids - len(known), dtype=bool)])
+    valid = known[first] & known[second]
+    first, second, winner = first[valid], second[valid], winner[valid]
+
+    # Duas leituras indexadas na matriz de atributos e uma única subtração
+    diffs = stat_matrix[first] - stat_matrix[second]
+    p1_won = (first == winner).astype(np.int8)
+
+    return valid, diffs, p1_won
+
+
+@instrumented(cache=st.cache_data)
 def prepare_data(df_pokemon, df_combat):
     """
     Combina os DataFrames e cria features de diferença de atributos.
     A feature 'Vantagem Lendária' foi removida.
     """
-    # Removendo 'legendary' dos atributos que serão usados para calcular a diferença
-    attributes_and_status = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'legendary']
-    attributes = attributes_and_status[:-1]  # Atributos numéricos
-
-    # 1. Preparar dados do Primeiro Pokémon (P1)
-    p1_data = df_combat.merge(df_pokemon[['id'] + attributes_and_status],
-                              left_on='first_pokemon',
-                              right_on='id',
-                              suffixes=('', '_p1'))
-
-    # 2. Preparar dados do Segundo Pokémon (P2)
-    final_df = p1_data.merge(df_pokemon[['id'] + attributes_and_status],
-                             left_on='second_pokemon',
-                             right_on='id',
-                             suffixes=('_p1', '_p2'))
-
-    # --- Passo de Conversão ---
-    # Conversão de bool/string para 0/1, usada no passado, mas mantida por segurança caso seja necessária:
-    bool_map = {True: 1, False: 0, 'True': 1, 'False': 0, 'true': 1, 'false': 0}
-    final_df['legendary_p1'] = final_df['legendary_p1'].astype(str).map(bool_map).fillna(0)
-    final_df['legendary_p2'] = final_df['legendary_p2'].astype(str).map(bool_map).fillna(0)
-
-    # --- Criação das Features de Diferença ---
-    feature_cols = []
-    for attr in attributes:
-        diff_col = f'diff_{attr}'
-        final_df[diff_col] = final_df[f'{attr}_p1'] - final_df[f'{attr}_p2']
-        feature_cols.append(diff_col)
-
-    # --- REMOÇÃO DA VANTAGEM LENDÁRIA ---
-    # A feature 'legendary_advantage' não será criada/adicionada a feature_cols.
-
-    # 4. Criar a variável alvo: p1_won (1 se p1 ganhou, 0 se p2 ganhou)
-    final_df['p1_won'] = np.where(final_df['first_pokemon'] == final_df['winner'], 1, 0)
+    feature_cols = [f'diff_{attr}' for attr in STAT_ATTRIBUTES]
+
+    # 1. Diferenças de atributos (P1 - P2) a partir da matriz de atributos por id
+    valid, diffs, p1_won = difference_features(df_pokemon, df_combat)
+
+    # 2. Apenas combates em que os dois Pokémon são conhecidos entram no modelo
+    final_df = df_combat[valid].reset_index(drop=True)
+    final_df = pd.concat([final_df, pd.DataFrame(diffs, columns=feature_cols)], axis=1)
+
+    # 3. Criar a variável alvo: p1_won (1 se p1 ganhou, 0 se p2 ganhou)
+    final_df['p1_won'] = p1_won
 
     return final_df, feature_cols
 
 
-@st.cache_data
-def train_model(df_model, feature_cols):
+@instrumented(cache=st.cache_data)
+def compute_feature_matrix(df_pokemon, df_combat):
+    """
+    Retorna as features de diferença prontas para treino, sem passar por DataFrame.
+
+    Retorna (X, y, feature_cols): X é um array float32 contíguo (combates × atributos),
+    y é o vetor int8 com 1 quando o P1 venceu.
+    """
+    _, diffs, p1_won = difference_features(df_pokemon, df_combat)
+    X = np.ascontiguousarray(diffs, dtype=np.float32)
+    feature_cols = [f'diff_{attr}' for attr in STAT_ATTRIBUTES]
+
+    return X, p1_won, feature_cols
+
+
+@instrumented(cache=st.cache_data)
+def train_model(df_model, feature_cols, force_retrain=False, profile=DEFAULT_PROFILE):
     """
     Treina um modelo RandomForest e calcula a importância dos atributos/status,
     expressando o resultado em porcentagem.
+
+    `profile` escolhe o perfil de treino (ver `src/training.py`): 'full' (padrão),
+    'parallel', 'subsample' ou 'hist_gb'.
+
+    O modelo treinado fica salvo no registro de modelos (ver `src/model_registry.py`),
+    identificado pelos dados de treino e hiperparâmetros; com os mesmos dados, a tabela
+    de importâncias é lida do disco em vez de retreinar.
     """
     # Verifica se há features para treinar.
     if not feature_cols:
         return pd.DataFrame({'Atributo': [], 'Importância': []})
 
-    X = df_model[feature_cols]
-    y = df_model['p1_won']
+    X = df_model[feature_cols].to_numpy()
+    y = df_model['p1_won'].to_numpy()
 
-    # Padronizar os dados
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    return load_or_train(X, y, feature_cols, fit_importance_model, TRAINING_PROFILES[profile], force=force_retrain)
 
-    # Modelo: Random Forest para Feature Importance
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_scaled, y)
 
-    # Obter a importância dos atributos
-    feature_importances = pd.Series(model.feature_importances_, index=feature_cols)
-    feature_importances = feature_importances.sort_values(ascending=False)
+@instrumented(cache=st.cache_data)
+def compute_combat_stats(df_combat):
+    """
+    Agrega as estatísticas de combate de cada Pokémon em uma única passada vetorizada.
 
-    # Preparar para o gráfico
-    importance_df = pd.DataFrame({
-        'Atributo': feature_importances.index,
-        'Importância': feature_importances.values
-    })
+    Retorna um DataFrame indexado pelo id do Pokémon (de 0 até o maior id presente nos
+    combates) com as colunas 'wins', 'losses', 'total', 'first_moves' (combates em que o
+    Pokémon foi o primeiro a atacar) e 'win_rate' (fração de vitórias, NaN sem combates).
+    É a base compartilhada por `analyze_top_winners`, `analyze_win_distribution` e
+    `analyze_type_win_rate`.
+    """
+    first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+    second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+    winner = df_combat['winner'].to_numpy(dtype=np.int64)
 
-    # Multiplica por 100 para transformar em porcentagem
-    importance_df['Importância'] = importance_df['Importância'] * 100
+    n_ids = int(max(first.max(initial=0), second.max(initial=0))) + 1
 
-    # Limpar nomes dos atributos para exibição
-    importance_df['Atributo'] = (
-        importance_df['Atributo']
-        .str.replace('diff_', '')
-        .str.replace('hp', 'HP')
-        .str.replace('sp_', 'Sp. ')
-        # REMOVENDO A LIMPEZA DE 'Vantagem Lendária'
-        .str.capitalize()
-    )
+    # O P2 vence sempre que o P1 não é o vencedor
+    is_p1_winner = winner == first
 
-    return importance_df
+    first_moves = np.bincount(first, minlength=n_ids)
+    total = first_moves + np.bincount(second, minlength=n_ids)
+    wins = (np.bincount(first[is_p1_winner], minlength=n_ids)
+            + np.bincount(second[~is_p1_winner], minlength=n_ids))
 
+    return combat_stats_frame(wins, total, first_moves)
 
-@st.cache_data
-def analyze_top_winners(df_pokemon, df_combat):
+
+def combat_stats_frame(wins, total, first_moves):
     """
-    Calcula o total de vitórias e a taxa de vitória para cada Pokémon individual.
+    Monta o DataFrame de `compute_combat_stats` a partir dos vetores por id
+    (também usado pelo agregado incremental de `src/aggregate_store.py`).
     """
+    df_stats = pd.DataFrame({
+        'wins': wins,
+        'losses': total - wins,
+        'total': total,
+        'first_moves': first_moves
+    })
+    df_stats.index.name = 'id'
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df_stats['win_rate'] = np.where(total > 0, wins / total, np.nan)
 
-    # Dicionário para armazenar o total de vitórias e combates por Pokémon ID
-    pokemon_stats = {}
+    return df_stats
 
-    for _, row in df_combat.iterrows():
-        p1_id = row['first_pokemon']
-        p2_id = row['second_pokemon']
-        winner_id = row['winner']
 
-        # Função auxiliar para registrar a batalha
-        def update_stats(pokemon_id, is_winner):
-            if pokemon_id not in pokemon_stats:
-                pokemon_stats[pokemon_id] = {'wins': 0, 'total': 0}
+@instrumented(cache=st.cache_data)
+def analyze_top_winners(df_pokemon, df_combat):
+    """
+    Calcula o total de vitórias e a taxa de vitória para cada Pokémon individual.
+    """
 
-            pokemon_stats[pokemon_id]['total'] += 1
-            if is_winner:
-                pokemon_stats[pokemon_id]['wins'] += 1
+    return top_winners_table(compute_combat_stats(df_combat), df_pokemon)
 
-        # Atualiza estatísticas de P1
-        is_p1_winner = (winner_id == p1_id)
-        update_stats(p1_id, is_p1_winner)
 
-        # Atualiza estatísticas de P2
-        update_stats(p2_id, not is_p1_winner)
+def top_winners_table(combat_stats, df_pokemon):
+    """
+    Monta a tabela de `analyze_top_winners` a partir do agregado por Pokémon
+    (também usada pelas análises filtradas de `src/filter_index.py`).
+    """
 
-    # Converte o dicionário para DataFrame
-    df_stats = pd.DataFrame.from_dict(pokemon_stats, orient='index').reset_index()
-    df_stats.columns = ['id', 'Total de Vitórias', 'Total de Combates']
+    # Estatísticas por Pokémon ID, apenas para quem participou de algum combate
+    combat_stats = combat_stats[combat_stats['total'] > 0]
+
+    df_stats = pd.DataFrame({
+        'id': combat_stats.index,
+        'Total de Vitórias': combat_stats['wins'].to_numpy(),
+        'Total de Combates': combat_stats['total'].to_numpy()
+    })
 
     # Calcula a taxa de vitória
     df_stats['Taxa de Vitória (%)'] = (df_stats['Total de Vitórias'] / df_stats['Total de Combates']) * 100
@@ -139,12 +198,12 @@ def analyze_top_winners(df_pokemon, df_combat):
 
     # Ordena pelo número de vitórias (o que o usuário pediu) e pega o Top 10
     # Opcionalmente, pode-se ordenar pela Taxa de Vitória, mas o Total é mais direto.
-    df_top_winners = df_stats.sort_values(by='Total de Vitórias', ascending=False)
+    df_top_winners = df_stats.sort_values(by='Total de Vitórias', ascending=False, kind='mergesort')
 
     return df_top_winners
 
 
-@st.cache_data
+@instrumented(cache=st.cache_data)
 def analyze_average_attributes(df_pokemon):
     """
     Calcula os atributos médios (HP, Attack, Defense, etc.)
@@ -155,18 +214,11 @@ def analyze_average_attributes(df_pokemon):
     attributes = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
 
     # 1. Agrupar por status lendário e calcular a média
-    # É necessário primeiro garantir que a coluna 'legendary' seja numérica (0/1) ou booleana.
-    # Como já corrigimos para lidar com strings ('true'/'false') em 'analysis_utils.py',
-    # faremos uma conversão segura aqui também, assumindo que a coluna original possa ser string.
-
-    # Mapeamento seguro para booleano
-    legendary_map = {True: 'Lendário', False: 'Não Lendário', 'True': 'Lendário', 'False': 'Não Lendário',
-                     'true': 'Lendário', 'false': 'Não Lendário'}
-
-    df_analysis = df_pokemon.copy()
+    # A coluna 'legendary' já é booleana (normalizada na carga dos dados).
+    df_analysis = df_pokemon[attributes].copy()
 
     # Cria uma coluna de status legível
-    df_analysis['Status'] = df_analysis['legendary'].astype(str).str.lower().map(legendary_map)
+    df_analysis['Status'] = np.where(df_pokemon['legendary'], 'Lendário', 'Não Lendário')
 
     # Agrupa e calcula a média para os atributos
     df_avg_stats = df_analysis.groupby('Status')[attributes].mean().reset_index()
@@ -181,8 +233,17 @@ def analyze_average_attributes(df_pokemon):
     )
 
     # Formatação dos nomes dos atributos
-    df_melted['Atributo'] = (
-        df_melted['Atributo']
+    df_melted['Atributo'] = format_attribute_names(df_melted['Atributo'])
+
+    return df_melted
+
+
+def format_attribute_names(attributes):
+    """
+    Nomes de exibição dos atributos no gráfico de perfil médio (também usado pelo backend SQL).
+    """
+    return (
+        attributes
         .str.replace('hp', 'HP')
         .str.replace('attack', 'Attack')
         .str.replace('defense', 'Defense')
@@ -191,20 +252,25 @@ def analyze_average_attributes(df_pokemon):
         .str.replace('speed', 'Speed')
     )
 
-    return df_melted
-
-@st.cache_data
+@instrumented(cache=st.cache_data)
 def analyze_win_distribution(df_combat):
     """
     Calcula o número total de vitórias para cada Pokémon e retorna
     o DataFrame pronto para análise de distribuição.
     """
 
-    # 1. Contar as vitórias para cada Pokémon ID
-    # A coluna 'winner' do df_combat já tem o ID do Pokémon vencedor em cada batalha.
-    # Contar as ocorrências é o mesmo que contar as vitórias.
+    return win_distribution_table(compute_combat_stats(df_combat))
+
 
-    df_wins = df_combat['winner'].value_counts().reset_index()
+def win_distribution_table(combat_stats):
+    """
+    Monta a tabela de `analyze_win_distribution` a partir do agregado por Pokémon.
+    """
+
+    # 1. Contar as vitórias para cada Pokémon ID
+    # Reaproveita o agregado por Pokémon; apenas quem venceu ao menos uma vez entra na distribuição.
+    df_wins = combat_stats.loc[combat_stats['wins'] > 0, ['wins']]
+    df_wins = df_wins.sort_values(by='wins', ascending=False, kind='mergesort').reset_index()
     df_wins.columns = ['id', 'Total de Vitórias']
 
     # NOTA: Esta função considera apenas as vitórias, pois para a distribuição (histograma),
@@ -0,0 +1,315 @@
+"""
+Extração concorrente dos dados da API de Pokémon (versão importável do notebook
+`data_extract_api.ipynb`).
+
+As requisições de detalhes e as páginas de combates são feitas em paralelo por um pool de
+threads que compartilha uma única `requests.Session` (conexões keep-alive reaproveitadas).
+Em vez de pausas fixas entre requisições, um limitador de taxa adaptativo controla o ritmo:
+a taxa sobe aos poucos enquanto a API responde bem e cai pela metade a cada 429, respeitando
+o `Retry-After` para todas as threads.
+
+Uso pela linha de comando (gera `pokemon.xlsx` e `combat_pokemon.xlsx`):
+
+    POKEMON_API_USER=... POKEMON_API_PASSWORD=... python -m src.api_extractor
+"""
+import argparse
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# URL base da API
+BASE_URL = "http://ec2-52-67-119-247.sa-east-1.compute.amazonaws.com:8000"
+
+POKEMON_PER_PAGE = 50   # Máximo de itens por página na lista de Pokémon
+COMBATS_PER_PAGE = 100  # Itens por página na lista de combates
+
+# --- Configurações de Controle de Requisições ---
+MAX_WORKERS = 16
+MAX_RETRIES = 5
+REQUEST_TIMEOUT = 30
+
+
+class AdaptiveRateLimiter:
+    """
+    Limitador de taxa compartilhado entre threads, no estilo do controle de congestionamento do TCP.
+
+    Cada `acquire()` reserva o próximo horário livre conforme a taxa atual. Até o primeiro 429
+    a taxa cresce `slow_start_growth` (fração) a cada resposta bem sucedida; depois disso,
+    cresce cerca de `increase` req/s por segundo. Um 429 reduz a taxa pela metade (até
+    `min_rate`) e bloqueia todas as threads até o fim do `Retry-After`.
+    """
+
+    def __init__(self, initial_rate=20.0, min_rate=1.0, max_rate=500.0, slow_start_growth=0.05, increase=5.0):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_start_growth = slow_start_growth
+        self.increase = increase
+        self._slow_start = True
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            if self._slow_start:
+                self.rate *= 1 + self.slow_start_growth
+            else:
+                # ~`rate` respostas por segundo: soma `increase` req/s a cada segundo
+                self.rate += self.increase / self.rate
+            self.rate = min(self.max_rate, self.rate)
+
+    def on_rate_limited(self, retry_after: float):
+        with self._lock:
+            now = time.monotonic()
+            # Vários 429 de requisições já em andamento contam como um único evento
+            if self._blocked_until <= now:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._slow_start = False
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+
+def parse_retry_after(value: Optional[str], attempt: int) -> float:
+    """
+    Interpreta o cabeçalho Retry-After (em segundos); sem ele, usa backoff exponencial.
+    """
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+    return float(2 ** attempt)
+
+
+class PokemonApiClient:
+    """
+    Cliente da API com sessão HTTP compartilhada, pool de conexões e limitador adaptativo.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, max_workers: int = MAX_WORKERS,
+                 limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = MAX_RETRIES,
+                 timeout: float = REQUEST_TIMEOUT, verbose: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.verbose = verbose
+
+        # Uma conexão keep-alive por thread de trabalho
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def login(self, username: str, password: str) -> Optional[str]:
+        """
+        Faz o login e guarda a token JWT no cabeçalho da sessão. Retorna a token ou None.
+        """
+        try:
+            response = self.session.post(f"{self.base_url}/login",
+                                         json={"username": username, "password": password},
+                                         timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self._log(f"ERRO DE REQUISIÇÃO: {e}")
+            return None
+
+        if response.status_code != 200:
+            self._log(f"Falha no login. Status HTTP: {response.status_code}")
+            return None
+
+        token = response.json().get("access_token")
+        if not token:
+            self._log("ERRO: 'access_token' não encontrado na resposta.")
+            return None
+
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        return token
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        GET com tratamento de 429 (Retry-After + redução da taxa) e novas tentativas em erros de conexão.
+        Retorna o JSON da resposta ou None em caso de falha.
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                self._log(f"ERRO DE CONEXÃO ao acessar {url}: {e}.")
+                time.sleep(min(2 ** attempt * 0.1, 5))
+                continue
+
+            if response.status_code == 200:
+                self.limiter.on_success()
+                return response.json()
+
+            if response.status_code == 429:
+                wait_time = parse_retry_after(response.headers.get("Retry-After"), attempt)
+                self.limiter.on_rate_limited(wait_time)
+                continue
+
+            if response.status_code == 401:
+                self._log(f"ERRO 401: Não autorizado ao acessar {url}. Verifique o token.")
+            else:
+                self._log(f"ERRO: Falha ao acessar {url}. Status HTTP: {response.status_code}.")
+            return None
+
+        self._log(f"FALHA CRÍTICA: Não foi possível acessar {url} após {self.max_retries} tentativas.")
+        return None
+
+    def _map(self, func, items):
+        """
+        Aplica `func` em paralelo, preservando a ordem dos itens.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, items))
+
+    def fetch_pages(self, path: str, items_key: str, per_page: int, first_page: Optional[Dict] = None,
+                    start_page: int = 1, total_pages: Optional[int] = None) -> List[Optional[List[Dict]]]:
+        """
+        Busca as páginas de um endpoint paginado em paralelo.
+
+        Retorna uma lista com os itens de cada página, na ordem (None para páginas que falharam),
+        de `start_page` até `total_pages`. `first_page` é a resposta já obtida da página
+        `start_page`; sem `total_pages`, o total vem da chave 'total' dessa resposta.
+        """
+        if total_pages is None:
+            if first_page is None:
+                first_page = self.get_json(path, {"page": start_page, "per_page": per_page})
+                if first_page is None or first_page.get("total") is None:
+                    return []
+            total_pages = math.ceil(first_page["total"] / per_page)
+
+        def fetch(page_num):
+            if page_num == start_page and first_page is not None:
+                return first_page.get(items_key, [])
+            data = self.get_json(path, {"page": page_num, "per_page": per_page})
+            return None if data is None else data.get(items_key, [])
+
+        return self._map(fetch, range(start_page, total_pages + 1))
+
+    def get_all_pokemon_base_info(self) -> List[Dict]:
+        """
+        Coleta a lista básica de {id, name} de todos os pokemons usando paginação.
+        """
+        pages = self.fetch_pages("/pokemon", "pokemons", POKEMON_PER_PAGE)
+        if not pages or any(page is None for page in pages):
+            return []
+        return [info for page in pages for info in page]
+
+    def get_all_pokemon_details(self) -> pd.DataFrame:
+        """
+        Coleta os IDs dos pokemons e busca os detalhes de cada um em paralelo.
+        """
+        base_info = self.get_all_pokemon_base_info()
+        ids = [info.get("id") for info in base_info if info.get("id") is not None]
+        if not ids:
+            return pd.DataFrame()
+
+        self._log(f"Coletando detalhes de {len(ids)} Pokémon...")
+        details = self._map(lambda pokemon_id: self.get_json(f"/pokemon/{pokemon_id}"), ids)
+        details = [detail for detail in details if detail is not None]
+        self._log(f"Coleta de detalhes concluída. {len(details)} registros detalhados coletados.")
+
+        return pd.DataFrame(details) if details else pd.DataFrame()
+
+    def get_all_combats_to_dataframe(self) -> pd.DataFrame:
+        """
+        Coleta todos os combates do endpoint /combats e cria um DataFrame com 'battle_id' sequencial.
+
+        Se uma página falhar, apenas as páginas anteriores a ela são mantidas, para que o
+        'battle_id' continue correspondendo à posição do combate na API.
+        """
+        pages = self.fetch_pages("/combats", "combats", COMBATS_PER_PAGE)
+
+        combats: List[Dict] = []
+        for page in pages:
+            if page is None:
+                break
+            combats.extend(page)
+        self._log(f"Coleta de dados de combate concluída. Total de registros: {len(combats)}.")
+
+        if not combats:
+            return pd.DataFrame()
+
+        df_combats = pd.DataFrame(combats)
+        df_combats.insert(0, 'battle_id', range(1, len(df_combats) + 1))
+        return df_combats
+
+
+def remove_duplicate_types(types_string):
+    """Removes duplicate types from a slash-separated string."""
+    if isinstance(types_string, str):
+        unique_types = []
+        for t in (t.strip() for t in types_string.split('/')):
+            if t not in unique_types:
+                unique_types.append(t)
+        return '/'.join(unique_types)
+    return types_string
+
+
+def clean_pokemon_details(df_pokemon: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tratamento aplicado no notebook: tipos separados por '/' e sem duplicatas (ex.: 'Bug/Flying/Flying').
+    """
+    df_pokemon = df_pokemon.copy()
+    df_pokemon['types'] = df_pokemon['types'].str.replace(',', '/').apply(remove_duplicate_types)
+    return df_pokemon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extrai Pokémon e combates da API para as planilhas do app.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--user", default=os.environ.get("POKEMON_API_USER"))
+    parser.add_argument("--password", default=os.environ.get("POKEMON_API_PASSWORD"))
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    if not args.user or not args.password:
+        parser.error("informe --user/--password ou POKEMON_API_USER/POKEMON_API_PASSWORD")
+
+    client = PokemonApiClient(args.base_url, max_workers=args.workers)
+    if client.login(args.user, args.password) is None:
+        print("Não foi possível obter o token. A coleta foi abortada.")
+        return 1
+
+    start = time.perf_counter()
+    df_pokemon = client.get_all_pokemon_details()
+    df_combats = client.get_all_combats_to_dataframe()
+    print(f"Extração concluída em {time.perf_counter() - start:.1f}s.")
+
+    if df_pokemon.empty or df_combats.empty:
+        print("Falha na coleta: DataFrame vazio.")
+        return 1
+
+    clean_pokemon_details(df_pokemon).to_excel(os.path.join(args.output_dir, "pokemon.xlsx"), index=False)
+    df_combats.to_excel(os.path.join(args.output_dir, "combat_pokemon.xlsx"), index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
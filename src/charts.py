@@ -0,0 +1,199 @@
+"""
+Figuras Plotly do app, construídas uma vez por resultado de análise.
+
+Cada interação com um widget (ex.: o slider do Top N) reexecuta o `app.py` inteiro. Para não
+reconstruir todas as figuras a cada execução, cada gráfico é montado por uma função
+decorada com `@instrumented(cache=st.cache_resource)`, cuja chave é a tabela exibida mais os
+parâmetros do gráfico: só a figura cujos dados mudaram (no slider, apenas a do Top N) é
+reconstruída, e o painel de depuração mostra os acertos de cache de cada uma.
+
+`st.cache_resource` (e não `st.cache_data`) porque a mesma figura pronta é compartilhada
+entre execuções e sessões, sem cópia: o Streamlit só converte o objeto para o JSON enviado ao
+navegador. Um dicionário com o JSON seria validado de novo pelo Streamlit a cada exibição, o
+que custa mais do que essa conversão. As figuras devolvidas não devem ser modificadas.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from src.instrumentation import instrumented
+
+# Ordem e cores dos perfis do gráfico de radar
+STATUS_ORDER = ["Não Lendário", "Média Geral", "Lendário"]
+STATUS_COLORS = {
+    "Não Lendário": "#3336DE",
+    "Média Geral": "#33a02c",
+    "Lendário": "#e31a1c"
+}
+
+
+def interval_bounds(df):
+    """
+    Colunas do intervalo exibido nas barras de erro: o bootstrap quando calculado, senão o de Wilson.
+    """
+    if 'IC Bootstrap Inferior (%)' in df.columns:
+        return 'IC Bootstrap Inferior (%)', 'IC Bootstrap Superior (%)'
+    return 'IC Wilson Inferior (%)', 'IC Wilson Superior (%)'
+
+
+@instrumented(cache=st.cache_resource)
+def figure_importance(importance_df):
+    fig_attr = px.bar(
+        importance_df,
+        x='Atributo',
+        y='Importância',
+        color='Importância',
+        color_continuous_scale=px.colors.sequential.Teal,
+        title='Importância da Diferença de Atributos e Status Lendário (Random Forest)',
+        labels={'Importância': 'Importância Relativa (%)', 'Atributo': 'Atributo Pokémon'}
+    )
+    fig_attr.update_layout(xaxis={'categoryorder': 'total descending'}, height=500)
+    return fig_attr
+
+
+@instrumented(cache=st.cache_resource)
+def figure_type_win_rate(df_win_rate):
+    """
+    Taxa de vitória por tipo com o intervalo de 95% nas barras de erro (`df_win_rate` já traz
+    as colunas de Wilson e, sem filtros, as do bootstrap).
+    """
+    low_col, high_col = interval_bounds(df_win_rate)
+    rate = df_win_rate['Taxa de Vitória (%)']
+
+    fig_type = px.bar(
+        df_win_rate,
+        x='Tipo',
+        y='Taxa de Vitória (%)',
+        color='Taxa de Vitória (%)',
+        color_continuous_scale=px.colors.sequential.Viridis,
+        title='Taxa de Vitória Média por Tipo de Pokémon',
+        error_y=df_win_rate[high_col] - rate,
+        error_y_minus=rate - df_win_rate[low_col],
+        hover_data={'Total de Combates': True, 'Total de Vitórias': True, low_col: ':.1f', high_col: ':.1f'}
+    )
+    fig_type.update_layout(xaxis={'categoryorder': 'total descending'},
+                           height=550, yaxis_range=[min(30, df_win_rate[low_col].min() * 0.9),
+                                                   df_win_rate[high_col].max() * 1.05])
+    return fig_type
+
+
+@instrumented(cache=st.cache_resource)
+def figure_top_winners(df_top_winners):
+    """
+    Barras horizontais dos `len(df_top_winners)` maiores vencedores (com as colunas de
+    `wilson_columns`), com o intervalo bootstrap do número de vitórias nas barras de erro quando
+    calculado (o intervalo de Wilson é da taxa, não da contagem).
+    """
+    top_n = len(df_top_winners)
+    low_col, high_col = interval_bounds(df_top_winners)
+
+    wins = df_top_winners['Total de Vitórias']
+    error_x = {}
+    if 'Vitórias IC Inferior' in df_top_winners.columns:
+        error_x = {'error_x': df_top_winners['Vitórias IC Superior'] - wins,
+                   'error_x_minus': wins - df_top_winners['Vitórias IC Inferior']}
+
+    fig_winners = px.bar(
+        df_top_winners,
+        x='Total de Vitórias',  # X agora é o valor (vitórias)
+        y='name',  # Y agora são os nomes dos Pokémon
+        orientation='h',  # Define como horizontal
+        color='Total de Vitórias',
+        color_continuous_scale=px.colors.sequential.Sunset,
+        title=f'Top {top_n} Pokémon pelo Número Absoluto de Vitórias',
+        labels={'name': 'Pokémon', 'Total de Vitórias': 'Total de Vitórias'},
+        hover_data={'Taxa de Vitória (%)': ':.1f', 'Total de Combates': True, low_col: ':.1f', high_col: ':.1f'},
+        **error_x
+    )
+
+    # Inverte o eixo Y para ter o Pokémon #1 no topo
+    fig_winners.update_layout(yaxis={'categoryorder': 'total ascending'},
+                              height=550, xaxis_range=[min(110, (wins - error_x.get('error_x_minus', 0)).min() * 0.9),
+                                                        (wins + error_x.get('error_x', 0)).max() * 1.01])
+    return fig_winners
+
+
+@instrumented(cache=st.cache_resource)
+def figure_average_attributes(df_avg_attr):
+    # Ordena o DataFrame (IMPORTANTE para o Plotly)
+    df_avg_attr = df_avg_attr.assign(Status=pd.Categorical(df_avg_attr['Status'], categories=STATUS_ORDER,
+                                                           ordered=True))
+    df_avg_attr = df_avg_attr.sort_values(['Atributo', 'Status'])
+
+    # === GRÁFICO DE TEIA (RADAR CHART) ===
+    fig_avg = px.line_polar(
+        df_avg_attr,
+        r='Média do Atributo',  # O raio (distância do centro)
+        theta='Atributo',  # O ângulo (os atributos: HP, Attack, etc.)
+        color='Status',  # As diferentes linhas/polígonos
+        line_close=True,  # Fecha o polígono
+        color_discrete_map=STATUS_COLORS,
+        title='Perfil dos Atributos de Pokémon: Lendários, Não Lendários e Média Geral'
+    )
+
+    fig_avg.update_traces(fill='toself')  # Preenche a área do polígono
+    fig_avg.update_layout(height=650)  # Altura maior é melhor para Radar Chart
+    return fig_avg
+
+
+@instrumented(cache=st.cache_resource)
+def figure_win_distribution(df_win_dist, n_bins=30):
+    fig_dist = px.histogram(
+        df_win_dist,
+        x='Total de Vitórias',
+        nbins=n_bins,
+        title='Distribuição da Contagem de Vitórias entre todos os Pokémon',
+        labels={'Total de Vitórias': 'Número de Vitórias por Pokémon', 'count': 'Número de Pokémon nessa Faixa'},
+        color_discrete_sequence=['#4c78a8']  # Cor simples
+    )
+
+    fig_dist.update_layout(bargap=0.05, height=550)  # Espaçamento entre as barras
+    return fig_dist
+
+
+@instrumented(cache=st.cache_resource)
+def figure_type_matchups(df_matchups):
+    """
+    Mapa de calor tipo × tipo do oponente a partir do formato longo de `analyze_type_matchups`.
+    """
+    matrix = df_matchups.pivot(index='Tipo', columns='Tipo do Oponente', values='Taxa de Vitória (%)')
+    hover = df_matchups.pivot(index='Tipo', columns='Tipo do Oponente',
+                              values=['IC Inferior (%)', 'IC Superior (%)', 'Total de Combates'])
+
+    fig_matchups = px.imshow(
+        matrix,
+        color_continuous_scale=px.colors.diverging.RdBu,
+        color_continuous_midpoint=50,
+        labels={'x': 'Tipo do Oponente', 'y': 'Tipo', 'color': 'Taxa de Vitória (%)'},
+        title='Taxa de Vitória (%) do Tipo (linha) contra o Tipo do Oponente (coluna)',
+        aspect='auto'
+    )
+    # IC de 95% (Wilson) e número de combates no hover de cada célula
+    customdata = np.dstack([hover[col].reindex(index=matrix.index, columns=matrix.columns).to_numpy()
+                            for col in ['IC Inferior (%)', 'IC Superior (%)', 'Total de Combates']])
+    fig_matchups.update_traces(
+        customdata=customdata,
+        hovertemplate="%{y} x %{x}<br>Taxa de Vitória: %{z:.1f}%<br>IC 95%: %{customdata[0]:.1f}% a "
+                      "%{customdata[1]:.1f}%<br>Combates: %{customdata[2]:.0f}<extra></extra>"
+    )
+    fig_matchups.update_layout(height=700)
+    return fig_matchups
+
+
+@instrumented(cache=st.cache_resource)
+def figure_ratings(df_top):
+    fig_ratings = px.bar(
+        df_top,
+        x='Rating',
+        y='name',
+        orientation='h',
+        color='Rating',
+        color_continuous_scale=px.colors.sequential.Plasma,
+        title=f'Top {len(df_top)} Pokémon pelo Rating de Bradley-Terry',
+        labels={'name': 'Pokémon'},
+        hover_data=['Total de Vitórias', 'Total de Combates', 'Posição por Vitórias']
+    )
+    fig_ratings.update_layout(yaxis={'categoryorder': 'total ascending'}, height=600,
+                              xaxis_range=[df_top['Rating'].min() * 0.95, df_top['Rating'].max() * 1.01])
+    return fig_ratings
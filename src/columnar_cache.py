@@ -0,0 +1,220 @@
+import hashlib
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+# Pasta (ao lado dos arquivos de origem) onde ficam as cópias colunares
+CACHE_DIR_NAME = ".pokemon_cache"
+# Incrementar quando o formato do cache ou as transformações aplicadas mudarem
+CACHE_FORMAT_VERSION = 2
+PARQUET_ENGINE = "fastparquet"
+# Linhas por grupo de linhas nos arquivos gravados (a leitura em blocos carrega no máximo um grupo por vez)
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Tipos físicos INT32/INT64 do parquet e os tipos convertidos sem sinal (UINT_8 a UINT_64)
+_PLAIN_INT_TYPES = {1: 'i4', 2: 'i8'}
+_UNSIGNED_CONVERTED_TYPES = {11, 12, 13, 14}
+
+
+def cache_paths(source_path):
+    """
+    Retorna os caminhos (arquivo parquet, arquivo de metadados) do cache de um arquivo de origem.
+    """
+    source_dir, source_name = os.path.split(os.path.abspath(source_path))
+    cache_dir = os.path.join(source_dir, CACHE_DIR_NAME)
+    base_name = os.path.splitext(source_name)[0]
+    return os.path.join(cache_dir, f"{base_name}.parquet"), os.path.join(cache_dir, f"{base_name}.meta.json")
+
+
+def file_sha256(filepath, chunk_size=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo do arquivo, lendo em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def mmap_open(path, mode="rb"):
+    """
+    Abre o arquivo como memória mapeada (somente leitura), no formato esperado pelo fastparquet.
+    """
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_parquet_mmap(parquet_path):
+    """
+    Abre um arquivo parquet (`fastparquet.ParquetFile`) cujos dados são lidos por memória mapeada.
+    """
+    import fastparquet
+
+    return fastparquet.ParquetFile(parquet_path, open_with=mmap_open)
+
+
+def plain_column_views(parquet_file, buffer, row_group, columns):
+    """
+    Vetores sobre `buffer` (o arquivo em memória mapeada, como uint8) com os valores das colunas
+    de um grupo de linhas, sem ler nem copiar o grupo.
+
+    Só é possível para colunas inteiras sem compressão, em codificação PLAIN, sem nulos e em uma
+    única página de dados (o padrão do `fastparquet.write`). Retorna None se alguma coluna não
+    atende: o grupo precisa então ser decodificado inteiro.
+    """
+    from fastparquet import parquet_thrift
+    from fastparquet.cencoding import NumpyIO, ThriftObject
+
+    chunks = {chunk.meta_data.path_in_schema[-1]: chunk.meta_data for chunk in row_group.columns}
+    views = {}
+    for name in columns:
+        meta = chunks.get(name)
+        if meta is None or meta.codec != parquet_thrift.CompressionCodec.UNCOMPRESSED \
+                or meta.dictionary_page_offset is not None:
+            return None
+        element = parquet_file.schema.schema_element(meta.path_in_schema)
+        kind = _PLAIN_INT_TYPES.get(element.type)
+        optional = element.repetition_type == parquet_thrift.FieldRepetitionType.OPTIONAL
+        if kind is None or element.repetition_type == parquet_thrift.FieldRepetitionType.REPEATED \
+                or (optional and getattr(meta.statistics, 'null_count', None) != 0):
+            return None
+
+        # 1. Cabeçalho da página: uma única página PLAIN com todos os valores do grupo
+        stream = NumpyIO(buffer[meta.data_page_offset:])
+        header = ThriftObject.from_buffer(stream, "PageHeader")
+        if header.type != parquet_thrift.PageType.DATA_PAGE \
+                or header.data_page_header.encoding != parquet_thrift.Encoding.PLAIN \
+                or header.data_page_header.num_values != meta.num_values:
+            return None
+        offset = meta.data_page_offset + stream.tell()
+
+        # 2. Colunas opcionais trazem os níveis de definição (com o tamanho em 4 bytes) antes dos valores
+        if optional:
+            offset += 4 + int(buffer[offset:offset + 4].view('<u4')[0])
+        if element.converted_type in _UNSIGNED_CONVERTED_TYPES:
+            kind = kind.replace('i', 'u')
+        views[name] = np.frombuffer(buffer, dtype=f'<{kind}', count=meta.num_values, offset=offset)
+    return views
+
+
+def write_parquet(df, parquet_path):
+    """
+    Grava o DataFrame em parquet, em grupos de até `PARQUET_ROW_GROUP_SIZE` linhas, trocando o
+    arquivo só no final (nunca fica um arquivo pela metade).
+    """
+    tmp_path = f"{parquet_path}.tmp"
+    df.to_parquet(tmp_path, engine=PARQUET_ENGINE, index=False, row_group_offsets=PARQUET_ROW_GROUP_SIZE)
+    os.replace(tmp_path, parquet_path)
+
+
+def read_parquet_mmap(parquet_path, columns=None):
+    """
+    Lê um arquivo parquet usando memória mapeada, sem copiar o arquivo inteiro para um buffer.
+    """
+    parquet_file = open_parquet_mmap(parquet_path)
+    df = parquet_file.to_pandas(columns=columns)
+
+    # O fastparquet preenche as categorias depois de criar o dtype; recriamos as colunas
+    # categóricas para que o dtype exposto pelo DataFrame traga as categorias reais.
+    for col in df.select_dtypes('category').columns:
+        values = df[col].cat
+        df[col] = pd.Categorical.from_codes(values.codes, dtype=pd.CategoricalDtype(values.categories,
+                                                                                     values.ordered))
+
+    return df
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def _source_meta(source_path, content_hash, variant):
+    stat = os.stat(source_path)
+    return {
+        "format_version": CACHE_FORMAT_VERSION,
+        "variant": variant,
+        "source": os.path.basename(source_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": content_hash,
+    }
+
+
+def is_cache_valid(source_path, variant=""):
+    """
+    Verifica se o cache de `source_path` ainda corresponde ao arquivo de origem.
+
+    Tamanho e data de modificação iguais validam o cache sem ler a origem. Se apenas a data
+    mudou (ex.: arquivo copiado ou "tocado"), o hash do conteúdo decide e os metadados são
+    atualizados para que a próxima verificação volte a ser barata.
+    """
+    parquet_path, meta_path = cache_paths(source_path)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(parquet_path):
+        return False
+    if meta.get("format_version") != CACHE_FORMAT_VERSION or meta.get("variant") != variant:
+        return False
+
+    stat = os.stat(source_path)
+    if stat.st_size != meta.get("size"):
+        return False
+    if stat.st_mtime_ns == meta.get("mtime_ns"):
+        return True
+
+    content_hash = file_sha256(source_path)
+    if content_hash != meta.get("sha256"):
+        return False
+
+    _write_meta(meta_path, _source_meta(source_path, content_hash, variant))
+    return True
+
+
+def write_cache(source_path, df, variant=""):
+    """
+    Grava o DataFrame como parquet ao lado da origem, junto com a assinatura do arquivo de origem.
+    """
+    parquet_path, meta_path = cache_paths(source_path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    write_parquet(df, parquet_path)
+
+    _write_meta(meta_path, _source_meta(source_path, file_sha256(source_path), variant))
+
+
+def read_with_cache(source_path, reader, variant=""):
+    """
+    Lê `source_path` a partir do cache colunar, reconstruindo-o com `reader` quando necessário.
+
+    `reader` recebe o caminho de origem e retorna o DataFrame já tratado. `variant` identifica
+    as transformações aplicadas pelo `reader`, invalidando o cache quando elas mudam.
+    Retorna a tupla (DataFrame, veio_do_cache).
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+
+    if is_cache_valid(source_path, variant):
+        parquet_path, _ = cache_paths(source_path)
+        return read_parquet_mmap(parquet_path), True
+
+    df = reader(source_path)
+    try:
+        write_cache(source_path, df, variant)
+    except (OSError, ImportError, ValueError, TypeError):
+        # Sem permissão de escrita ou sem fastparquet: segue apenas com a leitura da origem
+        pass
+
+    return df, False
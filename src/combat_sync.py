@@ -0,0 +1,184 @@
+"""
+Sincronização incremental dos combates da API em um armazenamento colunar.
+
+Os combates ficam em uma pasta com arquivos parquet numerados (`part-00000.parquet`, ...),
+um por lote sincronizado, e um `checkpoint.json` com o número de combates já gravados, as
+partes confirmadas e o último total informado pela API. Cada sincronização busca apenas as
+páginas a partir do último combate gravado (re-lendo a última página se ela estava
+incompleta), grava um novo arquivo por lote de páginas e só então atualiza o checkpoint.
+Partes gravadas sem checkpoint (execução interrompida) são descartadas na execução seguinte,
+que recomeça do último lote confirmado.
+
+O `battle_id` é a posição do combate na API (a partir de 1) e nunca muda entre execuções.
+
+    POKEMON_API_USER=... POKEMON_API_PASSWORD=... python -m src.combat_sync [--store combat_store]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.columnar_cache import read_parquet_mmap, write_parquet
+
+STORE_DIR = "combat_store"
+CHECKPOINT_FILE = "checkpoint.json"
+SYNC_BATCH_PAGES = 20
+COMBAT_COLUMNS = ['battle_id', 'first_pokemon', 'second_pokemon', 'winner']
+
+
+def empty_checkpoint():
+    return {'rows': 0, 'parts': [], 'total': None, 'last_page': 0, 'updated_at': None}
+
+
+def read_checkpoint(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return empty_checkpoint()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(store_dir, checkpoint):
+    checkpoint = dict(checkpoint, updated_at=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+    path = os.path.join(store_dir, CHECKPOINT_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def discard_uncommitted_parts(store_dir, checkpoint):
+    """
+    Remove partes (e temporários) que não constam no checkpoint, sobras de uma execução interrompida.
+    """
+    committed = set(checkpoint['parts'])
+    for name in os.listdir(store_dir):
+        if name.startswith("part-") and name not in committed:
+            os.remove(os.path.join(store_dir, name))
+
+
+def _write_part(store_dir, part_index, df):
+    name = f"part-{part_index:05d}.parquet"
+    write_parquet(df, os.path.join(store_dir, name))
+    return name
+
+
+def _combats_frame(items, first_battle_id):
+    df = pd.DataFrame(items, columns=COMBAT_COLUMNS[1:])
+    # A API devolve os ids como texto
+    df = df.apply(pd.to_numeric).astype('int64')
+    df.insert(0, 'battle_id', range(first_battle_id, first_battle_id + len(df)))
+    return df
+
+
+def sync_combats(client, store_dir=STORE_DIR, per_page=100, batch_pages=SYNC_BATCH_PAGES, verbose=True):
+    """
+    Busca apenas os combates novos e os acrescenta ao armazenamento. Retorna quantos foram gravados.
+
+    `client` é um `src.api_extractor.PokemonApiClient` já autenticado. A próxima página é
+    derivada do número de combates gravados, então `per_page` pode mudar entre execuções.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    checkpoint = read_checkpoint(store_dir)
+    discard_uncommitted_parts(store_dir, checkpoint)
+
+    rows = checkpoint['rows']
+    start_page = rows // per_page + 1
+    # Combates da primeira página que já estão gravados (página incompleta na execução anterior)
+    skip = rows % per_page
+
+    first_page = client.get_json("/combats", {"page": start_page, "per_page": per_page})
+    if first_page is None or first_page.get("total") is None:
+        raise RuntimeError("Não foi possível obter o total de combates da API.")
+
+    total = first_page["total"]
+    total_pages = math.ceil(total / per_page)
+    if total <= rows:
+        write_checkpoint(store_dir, dict(checkpoint, total=total))
+        return 0
+
+    new_rows = 0
+    for batch_start in range(start_page, total_pages + 1, batch_pages):
+        batch_end = min(batch_start + batch_pages - 1, total_pages)
+        pages = client.fetch_pages("/combats", "combats", per_page,
+                                   first_page=first_page if batch_start == start_page else None,
+                                   start_page=batch_start, total_pages=batch_end)
+
+        # Apenas o prefixo contíguo de páginas bem sucedidas é gravado
+        items = []
+        failed_page = None
+        for page_num, page in zip(range(batch_start, batch_end + 1), pages):
+            if page is None:
+                failed_page = page_num
+                break
+            items.extend(page[skip:] if page_num == start_page else page)
+
+        if items:
+            df_batch = _combats_frame(items, rows + 1)
+            part_name = _write_part(store_dir, len(checkpoint['parts']), df_batch)
+            rows += len(df_batch)
+            new_rows += len(df_batch)
+            checkpoint = dict(checkpoint, rows=rows, parts=checkpoint['parts'] + [part_name],
+                              total=total, last_page=rows // per_page + (1 if rows % per_page else 0))
+            write_checkpoint(store_dir, checkpoint)
+            if verbose:
+                print(f"  -> {rows}/{total} combates gravados.", end="\r")
+
+        if failed_page is not None:
+            if verbose:
+                print(f"\nSincronização interrompida na página {failed_page}; "
+                      f"a próxima execução continua a partir do combate {rows + 1}.")
+            break
+
+    if verbose:
+        print(f"\nSincronização concluída. {new_rows} combates novos ({rows} no total).")
+    return new_rows
+
+
+def combat_store_parts(store_dir=STORE_DIR):
+    """
+    Caminhos das partes confirmadas no checkpoint, em ordem de battle_id.
+    """
+    checkpoint = read_checkpoint(store_dir)
+    return [os.path.join(store_dir, name) for name in checkpoint['parts']]
+
+
+def read_combat_store(store_dir=STORE_DIR, columns=None):
+    """
+    Lê todos os combates confirmados do armazenamento como um único DataFrame.
+    """
+    parts = combat_store_parts(store_dir)
+    if not parts:
+        return pd.DataFrame(columns=COMBAT_COLUMNS if columns is None else columns)
+    return pd.concat([read_parquet_mmap(path, columns) for path in parts], ignore_index=True)
+
+
+def main(argv=None):
+    from src.api_extractor import BASE_URL, COMBATS_PER_PAGE, PokemonApiClient
+
+    parser = argparse.ArgumentParser(description="Sincroniza incrementalmente os combates da API.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--user", default=os.environ.get("POKEMON_API_USER"))
+    parser.add_argument("--password", default=os.environ.get("POKEMON_API_PASSWORD"))
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--per-page", type=int, default=COMBATS_PER_PAGE)
+    args = parser.parse_args(argv)
+
+    if not args.user or not args.password:
+        parser.error("informe --user/--password ou POKEMON_API_USER/POKEMON_API_PASSWORD")
+
+    client = PokemonApiClient(args.base_url)
+    if client.login(args.user, args.password) is None:
+        print("Não foi possível obter o token. A sincronização foi abortada.")
+        return 1
+
+    sync_combats(client, args.store, per_page=args.per_page)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
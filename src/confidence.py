@@ -0,0 +1,150 @@
+"""
+Intervalos de confiança para as taxas de vitória.
+
+* `wilson_interval`: fórmula fechada a partir de vitórias e combates, usada em qualquer
+  recorte (filtros, backend SQL, confrontos diretos).
+* `bootstrap_win_counts` + `bootstrap_interval`: bootstrap não paramétrico dos combates. Os
+  combates são reamostrados com reposição e cada réplica é agregada por id com um único
+  `np.bincount` sobre chaves planas réplica × id, em lotes de réplicas (memória limitada por
+  `BOOTSTRAP_BATCH_DRAWS`).
+
+O custo é limitado por `BOOTSTRAP_MAX_DRAWS` (réplicas × combates sorteados por réplica), para
+não crescer com o número de combates: acima do limite, cada réplica sorteia m < n combates
+(bootstrap "m de n") e os desvios das réplicas em relação à estimativa pontual são reescalados
+por sqrt(m / n), o fator entre os erros-padrão de amostras de tamanho m e n. Com m = n, o
+intervalo é o percentil usual.
+"""
+import warnings
+
+import numpy as np
+
+# Nível de confiança dos intervalos e o quantil da normal correspondente
+CONFIDENCE_LEVEL = 0.95
+CONFIDENCE_Z = 1.96
+
+# Réplicas do bootstrap e semente padrão (intervalos reprodutíveis entre execuções)
+BOOTSTRAP_REPLICATES = 200
+BOOTSTRAP_SEED = 42
+
+# Máximo de sorteios no total (réplicas × combates por réplica) e por lote
+BOOTSTRAP_MAX_DRAWS = 1 << 23
+BOOTSTRAP_BATCH_DRAWS = 1 << 22
+
+
+def wilson_interval(wins, total, z=CONFIDENCE_Z):
+    """
+    Intervalo de Wilson para a proporção `wins / total`, vetorizado.
+
+    Retorna (inferior, superior) como frações entre 0 e 1; posições com `total == 0` ficam NaN.
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = wins / total
+        z2 = z * z
+        denominator = 1 + z2 / total
+        center = (p + z2 / (2 * total)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / total + z2 / (4 * total * total)) / denominator
+
+    low = np.where(total > 0, np.clip(center - half_width, 0.0, 1.0), np.nan)
+    high = np.where(total > 0, np.clip(center + half_width, 0.0, 1.0), np.nan)
+    return low, high
+
+
+def wilson_columns(df_counts):
+    """
+    Cópia da tabela com o intervalo de Wilson (em %) calculado de 'Total de Vitórias' e
+    'Total de Combates': colunas 'IC Wilson Inferior (%)' e 'IC Wilson Superior (%)'.
+    """
+    low, high = wilson_interval(df_counts['Total de Vitórias'], df_counts['Total de Combates'])
+    df_counts = df_counts.copy()
+    df_counts['IC Wilson Inferior (%)'] = low * 100
+    df_counts['IC Wilson Superior (%)'] = high * 100
+    return df_counts
+
+
+def encode_battles(df_combat):
+    """
+    Vencedor e perdedor de cada combate como vetores de ids, e o número de ids (maior id + 1).
+
+    Segue `compute_combat_stats`: o P2 vence sempre que o P1 não é o vencedor.
+    """
+    first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+    second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+    winner = df_combat['winner'].to_numpy(dtype=np.int64)
+
+    n_ids = int(max(first.max(initial=0), second.max(initial=0))) + 1
+    p1_won = winner == first
+    return np.where(p1_won, first, second), np.where(p1_won, second, first), n_ids
+
+
+def _bootstrap_batch(winners, losers, n_ids, n_replicates, n_draws, rng):
+    """
+    Vitórias e combates por id em `n_replicates` reamostragens de `n_draws` combates com reposição.
+    """
+    draws = rng.integers(0, len(winners), size=(n_replicates, n_draws))
+
+    # Chave plana réplica × id: um único bincount acumula todas as réplicas do lote
+    offsets = (np.arange(n_replicates, dtype=np.int64) * n_ids)[:, None]
+    size = n_replicates * n_ids
+    wins = np.bincount((winners[draws] + offsets).ravel(), minlength=size)
+    losses = np.bincount((losers[draws] + offsets).ravel(), minlength=size)
+    return wins.reshape(n_replicates, n_ids), (wins + losses).reshape(n_replicates, n_ids)
+
+
+def bootstrap_win_counts(winners, losers, n_ids, n_replicates=BOOTSTRAP_REPLICATES, seed=BOOTSTRAP_SEED,
+                         max_draws=BOOTSTRAP_MAX_DRAWS):
+    """
+    Vitórias e combates por id em cada réplica do bootstrap (ver o docstring do módulo).
+
+    `winners` e `losers` vêm de `encode_battles`. Retorna (wins, totals, n_draws): matrizes de
+    formato (n_replicates, n_ids) e o número de combates sorteados por réplica (no máximo
+    `max_draws // n_replicates`).
+    """
+    n_battles = len(winners)
+    n_draws = min(n_battles, max(1, max_draws // n_replicates))
+    if n_battles == 0:
+        empty = np.zeros((n_replicates, n_ids), dtype=np.int64)
+        return empty, empty.copy(), 0
+
+    # Lotes de réplicas com um único gerador
+    rng = np.random.default_rng(seed)
+    per_batch = max(1, BOOTSTRAP_BATCH_DRAWS // n_draws)
+    results = [_bootstrap_batch(winners, losers, n_ids, min(per_batch, n_replicates - start), n_draws, rng)
+               for start in range(0, n_replicates, per_batch)]
+
+    return np.vstack([wins for wins, _ in results]), np.vstack([totals for _, totals in results]), n_draws
+
+
+def percentile_interval(replicates, level=CONFIDENCE_LEVEL):
+    """
+    Percentis (inferior, superior) de `level` sobre o eixo das réplicas, ignorando NaN.
+    """
+    tail = (1 - level) / 2 * 100
+    with warnings.catch_warnings():
+        # Colunas só com NaN (sem combates em nenhuma réplica) ficam NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low, high = np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def rescale_interval(low, high, point, shrink):
+    """
+    Reescala os desvios de (low, high) em relação a `point` por `shrink` (bootstrap "m de n").
+    """
+    return point + shrink * (low - point), point + shrink * (high - point)
+
+
+def bootstrap_interval(wins, totals, point, shrink=1.0, level=CONFIDENCE_LEVEL):
+    """
+    Intervalo percentil da taxa `wins / totals` sobre as réplicas (eixo 0), centrado na taxa
+    pontual `point` e reescalado por `shrink` (sqrt(m / n); 1 quando cada réplica sorteia
+    todos os combates).
+
+    Retorna (inferior, superior) como frações entre 0 e 1, como `wilson_interval`.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = np.where(totals > 0, wins / totals, np.nan)
+    low, high = rescale_interval(*percentile_interval(rates, level), point, shrink)
+    return np.clip(low, 0.0, 1.0), np.clip(high, 0.0, 1.0)
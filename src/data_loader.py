@@ -1,23 +1,97 @@
+import os
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from src.columnar_cache import read_with_cache
+from src.combat_sync import read_combat_store
+from src.instrumentation import instrumented
+
+POKEMON_COLUMNS = ['id', 'name', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'generation',
+                   'legendary', 'types']
+
+# Esquema declarado das tabelas, aplicado uma única vez na carga
+STAT_COLUMNS = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+POKEMON_SCHEMA = {'id': np.uint16, 'generation': np.int8, **{col: np.int16 for col in STAT_COLUMNS}}
+COMBAT_SCHEMA = {'battle_id': np.uint32, 'first_pokemon': np.uint16, 'second_pokemon': np.uint16,
+                 'winner': np.uint16}
+SCHEMA_VERSION = 1
+
+LEGENDARY_TRUE_VALUES = {'true', '1', 'yes', 'sim'}
+
+
+def apply_pokemon_schema(df):
+    """
+    Converte o DataFrame de Pokémon para o esquema compacto.
+
+    Ids e atributos viram inteiros de 16 bits, 'legendary' vira booleano (valores como
+    'true'/'false'/'No' são normalizados) e os tipos são separados nas colunas
+    categóricas 'type1' e 'type2', que compartilham as mesmas categorias.
+    """
+    df = df.copy()
+
+    # 'generation' pode vir como texto (ex.: 'Gen2'); mantemos apenas o número
+    df['generation'] = pd.to_numeric(df['generation'].astype(str).str.extract(r'(\d+)', expand=False))
+    df = df.astype(POKEMON_SCHEMA)
+
+    df['legendary'] = df['legendary'].astype(str).str.strip().str.lower().isin(LEGENDARY_TRUE_VALUES)
+
+    # Desmembrar Tipos (Primary e Secondary) com categorias comuns às duas colunas
+    df['types'] = df['types'].astype(str)
+    type_parts = df['types'].str.split('/')
+    type1 = type_parts.str[0].str.strip()
+    type2 = type_parts.str[1].str.strip()
+    type_names = sorted(pd.concat([type1, type2]).dropna().unique().tolist())
+    df['type1'] = pd.Categorical(type1, categories=type_names)
+    df['type2'] = pd.Categorical(type2, categories=type_names)
+
+    return df
 
-@st.cache_data
+
+def apply_combat_schema(df):
+    """
+    Converte o DataFrame de combates para o esquema compacto (ids de 16 bits).
+    """
+    return df.astype(COMBAT_SCHEMA)
+
+
+def read_source_excel(filepath, filename_ref):
+    """
+    Lê a planilha de origem com pd.read_excel() e aplica o tratamento de colunas.
+    """
+    # A planilha 'Sheet1' é o padrão se não for especificado
+    df = pd.read_excel(filepath)
+
+    # Renomear colunas do DataFrame Pokemon por segurança (cabeçalho da primeira linha)
+    if filename_ref == "pokemon.xlsx":
+        df.columns = POKEMON_COLUMNS
+        return apply_pokemon_schema(df)
+
+    return apply_combat_schema(df)
+
+
+@instrumented(cache=st.cache_data)
 def load_data(file_pokemon_excel, file_combat_excel):
     """
-    Carrega os dados dos arquivos Excel (.xlsx) usando pd.read_excel().
+    Carrega os dados dos arquivos Excel (.xlsx) usando pd.read_excel() e aplica o esquema
+    compacto de tipos (ver `apply_pokemon_schema` e `apply_combat_schema`).
+
+    Cada planilha é convertida uma única vez para um cache colunar (parquet) ao lado do
+    arquivo de origem; nas execuções seguintes o cache é lido diretamente, e é refeito
+    automaticamente quando o arquivo .xlsx muda.
+
+    `file_combat_excel` também pode ser a pasta de combates mantida por `src.combat_sync`;
+    nesse caso as partes sincronizadas são lidas diretamente.
     """
 
     def safe_read_excel(filepath, filename_ref):
         try:
-            # Tenta ler o arquivo Excel
-            # A planilha 'Sheet1' é o padrão se não for especificado
-            df = pd.read_excel(filepath)
-            st.success(f"Arquivo '{filename_ref}' carregado com sucesso.")
-
-            # Renomear colunas do DataFrame Pokemon por segurança (cabeçalho da primeira linha)
-            if filename_ref == "pokemon.xlsx":
-                df.columns = ['id', 'name', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'generation',
-                              'legendary', 'types']
+            # Tenta ler do cache colunar; se inválido, lê o arquivo Excel e refaz o cache
+            df, from_cache = read_with_cache(filepath, lambda path: read_source_excel(path, filename_ref),
+                                             variant=f"{filename_ref}:schema-v{SCHEMA_VERSION}")
+            origem = " (cache colunar)" if from_cache else ""
+            st.success(f"Arquivo '{filename_ref}' carregado com sucesso{origem}.")
 
             return df
 
@@ -31,6 +105,10 @@ def load_data(file_pokemon_excel, file_combat_excel):
             raise Exception(f"Erro de leitura de Excel: {e}")
 
     df_pokemon = safe_read_excel(file_pokemon_excel, "pokemon.xlsx")
-    df_combat = safe_read_excel(file_combat_excel, "combat_pokemon.xlsx")
+    if os.path.isdir(file_combat_excel):
+        df_combat = apply_combat_schema(read_combat_store(file_combat_excel))
+        st.success(f"Combates sincronizados carregados de '{file_combat_excel}'.")
+    else:
+        df_combat = safe_read_excel(file_combat_excel, "combat_pokemon.xlsx")
 
-    return df_pokemon, df_combat
\ No newline at end of file
+    return df_pokemon, df_combat
@@ -0,0 +1,161 @@
+"""
+Índices pré-calculados para as análises filtradas por geração, status lendário e tipo.
+
+`CombatFilterIndex` guarda, uma única vez por par de DataFrames:
+
+* os ids (ordenados) dos Pokémon de cada geração, de cada status lendário e de cada tipo;
+* o agregado completo por Pokémon (`compute_combat_stats`);
+* os combates ordenados pelo id do P1, com o deslocamento de cada id (formato CSR), de modo
+  que os combates de um conjunto de Pokémon são lidos como fatias contíguas.
+
+Uma consulta combina os ids dos filtros (união dentro de um mesmo filtro, interseção entre
+filtros) e, conforme o escopo, soma apenas os agregados desses Pokémon ('pokemon': todos os
+combates dos Pokémon filtrados) ou percorre só as fatias dos seus combates ('battles': apenas
+combates entre dois Pokémon filtrados). As tabelas têm as mesmas colunas das análises
+completas; Pokémon ausentes da tabela de Pokémon (ex.: id 63) nunca entram em um filtro.
+
+A equivalência com as análises completas sobre os dados filtrados é verificada em
+`benchmarks/bench_filter_index.py`.
+"""
+import numpy as np
+import streamlit as st
+
+from src.instrumentation import instrumented
+from src.analysis_utils import combat_stats_frame, compute_combat_stats, top_winners_table, win_distribution_table
+from src.analysis_types import build_type_index, type_win_counts, type_win_rate_table
+
+FILTER_SCOPES = ('pokemon', 'battles')
+
+
+def _grow(array, size):
+    if len(array) >= size:
+        return array
+    return np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)])
+
+
+class CombatFilterIndex:
+    """
+    Índices por geração, status lendário e tipo sobre a tabela de combates.
+
+    Os filtros de `type_win_rate`, `top_winners` e `win_distribution` são:
+    `generations` (lista de gerações), `legendary` (True, False ou None para ambos),
+    `types` (lista de tipos; o Pokémon entra se tiver qualquer um deles) e `scope`
+    ('pokemon' ou 'battles'). Filtros vazios ou None não restringem nada.
+    """
+
+    def __init__(self, df_pokemon, df_combat):
+        # 1. Ids ordenados de cada categoria
+        ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        generation = df_pokemon['generation'].to_numpy()[order]
+        legendary = df_pokemon['legendary'].to_numpy(dtype=bool)[order]
+
+        self.known_ids = sorted_ids
+        self.generations = {int(g): sorted_ids[generation == g] for g in np.unique(generation)}
+        self.legendary = {True: sorted_ids[legendary], False: sorted_ids[~legendary]}
+
+        self.type_index = build_type_index(df_pokemon)
+        type_names, membership = self.type_index
+        self.types = {name: np.flatnonzero(membership[:, code]) for code, name in enumerate(type_names)}
+
+        # 2. Agregado completo por Pokémon, alinhado com o maior id de Pokémon ou de combate
+        combat_stats = compute_combat_stats(df_combat)
+        self.n_ids = max(len(combat_stats), int(sorted_ids[-1]) + 1 if len(sorted_ids) else 0)
+        self.wins = _grow(combat_stats['wins'].to_numpy(dtype=np.int64), self.n_ids)
+        self.total = _grow(combat_stats['total'].to_numpy(dtype=np.int64), self.n_ids)
+        self.first_moves = _grow(combat_stats['first_moves'].to_numpy(dtype=np.int64), self.n_ids)
+
+        # 3. Combates ordenados pelo P1 (CSR): os do id `i` ficam em offsets[i]:offsets[i + 1]
+        first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+        battle_order = np.argsort(first, kind='stable')
+        self._second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)[battle_order]
+        self._p1_won = (df_combat['winner'].to_numpy(dtype=np.int64) == first)[battle_order]
+        self._offsets = np.zeros(self.n_ids + 1, dtype=np.int64)
+        np.cumsum(np.bincount(first, minlength=self.n_ids), out=self._offsets[1:])
+
+        self._names = df_pokemon[['id', 'name']]
+
+    def select_ids(self, generations=None, legendary=None, types=None):
+        """
+        Ids ordenados dos Pokémon que atendem a todos os filtros.
+        """
+        selected = self.known_ids
+        groups = [
+            [self.generations.get(int(g), self.known_ids[:0]) for g in generations or ()],
+            [self.legendary[bool(legendary)]] if legendary is not None else [],
+            [self.types.get(t, self.known_ids[:0]) for t in types or ()],
+        ]
+        for arrays in groups:
+            if arrays:
+                selected = np.intersect1d(selected, np.unique(np.concatenate(arrays)), assume_unique=True)
+        return selected
+
+    def _battle_counts(self, ids):
+        """
+        Vitórias, combates e primeiros ataques por id apenas nos combates entre dois ids de `ids`.
+        """
+        # 1. Fatias CSR dos combates em que o P1 está em `ids`
+        starts = self._offsets[ids]
+        lengths = self._offsets[ids + 1] - starts
+        n_rows = int(lengths.sum())
+        rows = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(n_rows)
+        first = np.repeat(ids, lengths)
+
+        # 2. Mantém apenas os combates em que o P2 também está em `ids`
+        selected = np.zeros(self.n_ids, dtype=bool)
+        selected[ids] = True
+        second = self._second[rows]
+        keep = selected[second]
+        first, second, p1_won = first[keep], second[keep], self._p1_won[rows[keep]]
+
+        # 3. Mesma contagem de `compute_combat_stats`
+        first_moves = np.bincount(first, minlength=self.n_ids)
+        total = first_moves + np.bincount(second, minlength=self.n_ids)
+        wins = (np.bincount(first[p1_won], minlength=self.n_ids)
+                + np.bincount(second[~p1_won], minlength=self.n_ids))
+        return wins, total, first_moves
+
+    def filtered_stats(self, generations=None, legendary=None, types=None, scope='pokemon'):
+        """
+        DataFrame no formato de `compute_combat_stats` restrito aos Pokémon filtrados.
+        """
+        if scope not in FILTER_SCOPES:
+            raise ValueError(f"Escopo de filtro desconhecido: {scope}. Use um de {FILTER_SCOPES}.")
+        ids = self.select_ids(generations, legendary, types)
+
+        if scope == 'battles':
+            wins, total, first_moves = self._battle_counts(ids)
+        else:
+            wins, total, first_moves = (np.zeros(self.n_ids, dtype=np.int64) for _ in range(3))
+            wins[ids], total[ids], first_moves[ids] = self.wins[ids], self.total[ids], self.first_moves[ids]
+
+        return combat_stats_frame(wins, total, first_moves)
+
+    def type_win_rate(self, **filters):
+        """
+        Versão filtrada de `analyze_type_win_rate`.
+        """
+        combat_stats = self.filtered_stats(**filters)
+        df_counts = type_win_counts(self.type_index, combat_stats['wins'].to_numpy(), combat_stats['total'].to_numpy())
+        return type_win_rate_table(df_counts)
+
+    def top_winners(self, **filters):
+        """
+        Versão filtrada de `analyze_top_winners`.
+        """
+        return top_winners_table(self.filtered_stats(**filters), self._names)
+
+    def win_distribution(self, **filters):
+        """
+        Versão filtrada de `analyze_win_distribution`.
+        """
+        return win_distribution_table(self.filtered_stats(**filters))
+
+
+@instrumented(cache=st.cache_resource)
+def get_filter_index(df_pokemon, df_combat):
+    """
+    Índice de filtros compartilhado entre as execuções do app (construído uma vez por conjunto de dados).
+    """
+    return CombatFilterIndex(df_pokemon, df_combat)
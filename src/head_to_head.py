@@ -0,0 +1,120 @@
+"""
+Índice de confrontos diretos (head-to-head) entre pares de Pokémon.
+
+Os combates são ordenados pela chave do par não ordenado `menor_id * n_ids + maior_id`, de
+modo que os combates de um par ficam contíguos. Para cada par distinto o índice guarda o
+deslocamento do primeiro combate, o número de combates e as vitórias do menor id; a
+consulta de um par é uma busca binária (`np.searchsorted`) sobre as chaves ordenadas, sem
+varrer `df_combat`. Um segundo índice (pares ordenados por participante) lista os oponentes
+de um Pokémon.
+
+No app, `get_head_to_head_index` fica em `st.cache_resource`, então o índice só é
+reconstruído quando os dados de combate mudam.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.instrumentation import instrumented
+
+# Resultado de uma consulta: vitórias de cada lado e os combates do par em ordem de battle_id
+HeadToHead = namedtuple('HeadToHead', ['pokemon_id', 'opponent_id', 'wins', 'losses', 'battle_ids', 'winners'])
+
+
+class HeadToHeadIndex:
+    """
+    Combates agrupados por par não ordenado (id_menor, id_maior) com vetores de deslocamento.
+    """
+
+    def __init__(self, df_combat):
+        first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+        second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+        winner = df_combat['winner'].to_numpy(dtype=np.int64)
+        battle_id = df_combat['battle_id'].to_numpy(dtype=np.int64)
+
+        # 1. Chave do par não ordenado e ordenação estável (combates de um par em ordem de battle_id)
+        self.n_ids = int(max(first.max(initial=0), second.max(initial=0))) + 1
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        keys = low * self.n_ids + high
+        order = np.lexsort((battle_id, keys))
+        sorted_keys = keys[order]
+        self.battle_ids = battle_id[order]
+        self.winners = winner[order]
+
+        # 2. Um registro por par distinto: chave, deslocamento, combates e vitórias do menor id
+        self.pair_keys, self.offsets, self.pair_battles = np.unique(sorted_keys, return_index=True,
+                                                                    return_counts=True)
+        low_won = (self.winners == low[order]).astype(np.int64)
+        self.pair_low_wins = np.add.reduceat(low_won, self.offsets) if len(low_won) else low_won
+
+        # 3. Pares de cada participante (CSR por id), para listar os oponentes de um Pokémon
+        pair_low, pair_high = np.divmod(self.pair_keys, self.n_ids)
+        participant = np.concatenate([pair_low, pair_high])
+        pair_index = np.tile(np.arange(len(self.pair_keys)), 2)
+        # Pares de um Pokémon com ele mesmo aparecem uma única vez
+        single = np.concatenate([np.ones(len(pair_low), dtype=bool), pair_low != pair_high])
+        participant, pair_index = participant[single], pair_index[single]
+        participant_order = np.argsort(participant, kind='stable')
+        self._participant_pairs = pair_index[participant_order]
+        self._participant_offsets = np.zeros(self.n_ids + 1, dtype=np.int64)
+        np.cumsum(np.bincount(participant, minlength=self.n_ids), out=self._participant_offsets[1:])
+
+    def _find(self, pokemon_id, opponent_id):
+        """
+        Posição do par em `pair_keys` ou -1 se os dois nunca se enfrentaram.
+        """
+        if not (0 <= pokemon_id < self.n_ids and 0 <= opponent_id < self.n_ids):
+            return -1
+        key = min(pokemon_id, opponent_id) * self.n_ids + max(pokemon_id, opponent_id)
+        position = int(np.searchsorted(self.pair_keys, key))
+        if position < len(self.pair_keys) and self.pair_keys[position] == key:
+            return position
+        return -1
+
+    def lookup(self, pokemon_id, opponent_id):
+        """
+        Histórico de `pokemon_id` contra `opponent_id` (vitórias e derrotas do ponto de vista do primeiro).
+        """
+        position = self._find(pokemon_id, opponent_id)
+        if position < 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return HeadToHead(pokemon_id, opponent_id, 0, 0, empty, empty)
+
+        start = self.offsets[position]
+        battles = int(self.pair_battles[position])
+        low_wins = int(self.pair_low_wins[position])
+        wins = low_wins if pokemon_id <= opponent_id else battles - low_wins
+        return HeadToHead(pokemon_id, opponent_id, wins, battles - wins,
+                          self.battle_ids[start:start + battles], self.winners[start:start + battles])
+
+    def opponents(self, pokemon_id):
+        """
+        Todos os oponentes de `pokemon_id`, com combates, vitórias e derrotas contra cada um.
+        """
+        if not 0 <= pokemon_id < self.n_ids:
+            pairs = np.zeros(0, dtype=np.int64)
+        else:
+            start, end = self._participant_offsets[pokemon_id], self._participant_offsets[pokemon_id + 1]
+            pairs = self._participant_pairs[start:end]
+
+        pair_low, pair_high = np.divmod(self.pair_keys[pairs], self.n_ids)
+        battles = self.pair_battles[pairs]
+        is_low = pair_low == pokemon_id
+        wins = np.where(is_low, self.pair_low_wins[pairs], battles - self.pair_low_wins[pairs])
+
+        return pd.DataFrame({
+            'id': np.where(is_low, pair_high, pair_low),
+            'Total de Combates': battles,
+            'Vitórias': wins,
+            'Derrotas': battles - wins,
+        })
+
+
+@instrumented(cache=st.cache_resource)
+def get_head_to_head_index(df_combat):
+    """
+    Índice de confrontos diretos compartilhado entre as execuções do app (reconstruído quando os combates mudam).
+    """
+    return HeadToHeadIndex(df_combat)
@@ -0,0 +1,292 @@
+"""
+Instrumentação das etapas de análise: tempo, memória, linhas de entrada e acerto de cache.
+
+Uso nas funções de `src/`:
+
+    @instrumented(cache=st.cache_data)
+    def analyze_type_win_rate(df_pokemon, df_combat): ...
+
+O decorador aplica o cache do Streamlit por dentro (`cache=st.cache_data` ou
+`st.cache_resource`), o que permite distinguir um acerto de cache (a função original não
+roda) de uma falta. `func.__wrapped__` continua apontando para a função original, sem cache
+e sem instrumentação. Sem `cache`, apenas mede a função.
+
+Cada chamada gera um registro com a etapa, a duração, o pico de memória alocada durante a
+chamada (apenas com `enable_memory_tracking()`, via tracemalloc; com etapas em paralelo o
+pico inclui as alocações das outras threads), o total de linhas dos DataFrames/arrays de
+entrada e o resultado do cache ('hit', 'miss' ou None). Os registros podem ser exportados
+em JSON (`export_json`) ou no formato de texto do Prometheus (`export_prometheus`).
+
+Os registros vão para o histórico do processo (`get_records`) e para o coletor da execução
+atual (`collect_records`), guardado em uma `contextvars.ContextVar`: cada sessão do app lê
+apenas os registros da sua execução, inclusive os das etapas em threads (o `run_stages`
+executa cada etapa em uma cópia do contexto de quem o chamou).
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+MAX_RECORDS = 5000
+
+_records = deque(maxlen=MAX_RECORDS)
+_records_lock = threading.Lock()
+_record_count = 0
+
+# Chamadas em andamento (para repartir o pico de memória entre chamadas aninhadas/paralelas)
+_active_frames = []
+_memory_lock = threading.Lock()
+_memory_users = 0
+_local = threading.local()
+
+# Lista de registros da execução atual (None fora de `collect_records`)
+_collector = contextvars.ContextVar('instrumentation_collector', default=None)
+
+
+def enable_memory_tracking():
+    """
+    Liga o rastreamento de memória (tracemalloc) para as próximas chamadas instrumentadas.
+
+    O tracemalloc vale para o processo inteiro, então as chamadas são contadas: o rastreamento
+    só é desligado quando cada `enable_memory_tracking()` tiver o seu `disable_memory_tracking()`
+    (ex.: várias sessões do app com o painel de depuração ligado ao mesmo tempo).
+    """
+    global _memory_users
+    with _memory_lock:
+        _memory_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def disable_memory_tracking():
+    global _memory_users
+    with _memory_lock:
+        if _memory_users == 0:
+            return
+        _memory_users -= 1
+        if _memory_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _count_rows(args, kwargs):
+    rows = 0
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+            rows += len(value)
+    return rows
+
+
+class _CallFrame:
+    def __init__(self):
+        self.cache_miss = False
+        self.start_memory = None
+        self.peak_memory = None
+
+
+def _fold_peak():
+    """
+    Atualiza o pico de todas as chamadas ativas com o pico global atual. Deve ser chamada com `_memory_lock`.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    for frame in _active_frames:
+        frame.peak_memory = max(frame.peak_memory, peak)
+    return current
+
+
+def _enter_memory(frame):
+    if not tracemalloc.is_tracing():
+        return
+    with _memory_lock:
+        current = _fold_peak()
+        tracemalloc.reset_peak()
+        frame.start_memory = frame.peak_memory = current
+        _active_frames.append(frame)
+
+
+def _exit_memory(frame):
+    if frame.start_memory is None:
+        return None
+    with _memory_lock:
+        if tracemalloc.is_tracing():
+            _fold_peak()
+        _active_frames.remove(frame)
+    return frame.peak_memory - frame.start_memory
+
+
+def _add_record(record):
+    global _record_count
+    collector = _collector.get()
+    with _records_lock:
+        _records.append(record)
+        _record_count += 1
+        if collector is not None:
+            collector.append(record)
+
+
+@contextlib.contextmanager
+def collect_records():
+    """
+    Reúne na lista devolvida os registros gerados dentro do bloco, nesta thread e nas threads
+    que herdam o contexto (etapas do `run_stages`). Execuções simultâneas não se misturam.
+    """
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def instrumented(func=None, *, stage=None, cache=None):
+    """
+    Decorador que registra cada chamada da função (ver o docstring do módulo).
+
+    `stage` é o nome da etapa nos registros (padrão: nome da função); `cache` é o decorador de
+    cache do Streamlit a aplicar por dentro da instrumentação.
+    """
+    if func is None:
+        return functools.partial(instrumented, stage=stage, cache=cache)
+
+    stage_name = stage or func.__name__
+
+    @functools.wraps(func)
+    def computation(*args, **kwargs):
+        # Só roda em uma falta de cache: marca a chamada instrumentada em andamento nesta thread
+        stack = getattr(_local, 'stack', None)
+        if stack:
+            stack[-1].cache_miss = True
+        return func(*args, **kwargs)
+
+    target = cache(computation) if cache is not None else func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        frame = _CallFrame()
+        stack = _local.__dict__.setdefault('stack', [])
+        stack.append(frame)
+        _enter_memory(frame)
+        start = time.perf_counter()
+        try:
+            return target(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = _exit_memory(frame)
+            stack.pop()
+            _add_record({
+                'stage': stage_name,
+                'seconds': elapsed,
+                'peak_memory_bytes': peak,
+                'input_rows': _count_rows(args, kwargs),
+                'cache': None if cache is None else ('miss' if frame.cache_miss else 'hit'),
+                'thread': threading.current_thread().name,
+                'timestamp': time.time(),
+            })
+
+    if cache is not None:
+        wrapper.clear = target.clear
+    return wrapper
+
+
+def record_count():
+    """
+    Número total de registros já gerados (use como marcador para `get_records(since=...)`).
+    """
+    with _records_lock:
+        return _record_count
+
+
+def get_records(since=0):
+    """
+    Registros gerados a partir do marcador `since` (os mais antigos que `MAX_RECORDS` são descartados).
+    """
+    with _records_lock:
+        first_kept = _record_count - len(_records)
+        return list(_records)[max(0, since - first_kept):]
+
+
+def clear_records():
+    global _record_count
+    with _records_lock:
+        _records.clear()
+        _record_count = 0
+
+
+def summarize_records(records):
+    """
+    Resumo por etapa: chamadas, acertos/faltas de cache e taxa de acerto (%, NaN sem cache),
+    tempo total e máximo, maior pico de memória (MB) e linhas de entrada da última chamada.
+    """
+    columns = ['Etapa', 'Chamadas', 'Cache (acertos)', 'Cache (faltas)', 'Taxa de Acerto (%)', 'Tempo Total (s)',
+               'Tempo Máximo (s)', 'Pico de Memória (MB)', 'Linhas de Entrada']
+    if not records:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.DataFrame(records)
+    summary = df.groupby('stage', sort=False).agg(
+        calls=('seconds', 'size'),
+        hits=('cache', lambda values: int((values == 'hit').sum())),
+        misses=('cache', lambda values: int((values == 'miss').sum())),
+        total=('seconds', 'sum'),
+        max=('seconds', 'max'),
+        peak=('peak_memory_bytes', 'max'),
+        rows=('input_rows', 'last'),
+    ).reset_index()
+    summary['peak'] = summary['peak'] / 2 ** 20
+    cached = summary['hits'] + summary['misses']
+    summary.insert(4, 'hit_rate', (summary['hits'] / cached.where(cached > 0)) * 100)
+    summary.columns = columns
+    return summary.sort_values('Tempo Total (s)', ascending=False).reset_index(drop=True)
+
+
+def export_json(records=None, path=None):
+    """
+    Exporta os registros em JSON. Retorna o texto e, se `path` for informado, grava o arquivo.
+    """
+    text = json.dumps(get_records() if records is None else records, indent=2, ensure_ascii=False)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def export_prometheus(records=None, prefix="pokemon_stage"):
+    """
+    Exporta os registros no formato de texto do Prometheus (contadores por etapa e resultado
+    do cache, tempo acumulado, maior pico de memória e linhas da última chamada).
+    """
+    records = get_records() if records is None else records
+    calls, seconds, peaks, rows = {}, {}, {}, {}
+    for record in records:
+        stage = record['stage']
+        key = (stage, record['cache'] or 'none')
+        calls[key] = calls.get(key, 0) + 1
+        seconds[stage] = seconds.get(stage, 0.0) + record['seconds']
+        if record['peak_memory_bytes'] is not None:
+            peaks[stage] = max(peaks.get(stage, 0), record['peak_memory_bytes'])
+        rows[stage] = record['input_rows']
+
+    lines = [f"# HELP {prefix}_calls_total Chamadas instrumentadas por etapa e resultado do cache.",
+             f"# TYPE {prefix}_calls_total counter"]
+    lines += [f'{prefix}_calls_total{{stage="{_label(stage)}",cache="{cache}"}} {count}'
+              for (stage, cache), count in calls.items()]
+    lines += [f"# HELP {prefix}_seconds_total Tempo acumulado por etapa.",
+              f"# TYPE {prefix}_seconds_total counter"]
+    lines += [f'{prefix}_seconds_total{{stage="{_label(stage)}"}} {value:.6f}' for stage, value in seconds.items()]
+    lines += [f"# HELP {prefix}_peak_memory_bytes Maior pico de memória alocada em uma chamada da etapa.",
+              f"# TYPE {prefix}_peak_memory_bytes gauge"]
+    lines += [f'{prefix}_peak_memory_bytes{{stage="{_label(stage)}"}} {value}' for stage, value in peaks.items()]
+    lines += [f"# HELP {prefix}_input_rows Linhas de entrada na última chamada da etapa.",
+              f"# TYPE {prefix}_input_rows gauge"]
+    lines += [f'{prefix}_input_rows{{stage="{_label(stage)}"}} {value}' for stage, value in rows.items()]
+    return "\n".join(lines) + "\n"
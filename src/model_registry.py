@@ -0,0 +1,250 @@
+"""
+Registro de modelos treinados para a análise de importância de atributos.
+
+Cada artefato é salvo em `models/<fingerprint>/`, onde o fingerprint combina o conteúdo
+dos dados de treino, os hiperparâmetros e a versão do scikit-learn. Assim, execuções
+seguintes com os mesmos dados apenas leem a tabela de importâncias do disco, e o
+treino pode ser feito offline pela linha de comando:
+
+    python -m src.model_registry train [--force] [--profile full]
+    python -m src.model_registry matchups [--force] [--profile full]
+    python -m src.model_registry list
+
+`train` também calcula a matriz de confrontos do modelo (`src/prediction.py`), que o app só lê
+do disco; `matchups` calcula apenas a matriz.
+"""
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Pasta padrão dos artefatos (na raiz do projeto, ao lado do app.py)
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+# Incrementar quando o formato dos artefatos mudar
+REGISTRY_VERSION = 1
+
+MODEL_FILE = "model.joblib"
+IMPORTANCE_FILE = "importance.json"
+METADATA_FILE = "metadata.json"
+
+
+def sklearn_version():
+    """
+    Versão instalada do scikit-learn, lida dos metadados do pacote sem importá-lo.
+    """
+    try:
+        return importlib.metadata.version("scikit-learn")
+    except importlib.metadata.PackageNotFoundError:
+        import sklearn
+
+        return sklearn.__version__
+
+
+def compute_fingerprint(X, y, feature_cols, params):
+    """
+    Calcula o fingerprint dos dados de treino e dos hiperparâmetros.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(json.dumps({
+        'registry_version': REGISTRY_VERSION,
+        'sklearn': sklearn_version(),
+        'shape': list(np.shape(X)),
+        'dtype': str(np.asarray(X).dtype),
+        'features': list(feature_cols),
+        'params': params,
+    }, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def artifact_dir(fingerprint, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, fingerprint)
+
+
+def save_artifact(fingerprint, model, scaler, importance_df, metadata, registry_dir=REGISTRY_DIR):
+    """
+    Salva modelo, scaler, tabela de importâncias e metadados do artefato.
+    """
+    import joblib
+
+    final_dir = artifact_dir(fingerprint, registry_dir)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    joblib.dump({'model': model, 'scaler': scaler}, os.path.join(tmp_dir, MODEL_FILE), compress=3)
+    importance_df.to_json(os.path.join(tmp_dir, IMPORTANCE_FILE), orient='records', force_ascii=False)
+    with open(os.path.join(tmp_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    # Publica o artefato de uma vez para que leitores nunca vejam uma pasta incompleta
+    if os.path.exists(final_dir):
+        import shutil
+        shutil.rmtree(final_dir)
+    os.replace(tmp_dir, final_dir)
+
+
+def load_importance(fingerprint, registry_dir=REGISTRY_DIR):
+    """
+    Lê apenas a tabela de importâncias do artefato (sem desserializar o modelo).
+    Retorna None se o artefato não existir.
+    """
+    path = os.path.join(artifact_dir(fingerprint, registry_dir), IMPORTANCE_FILE)
+    if not os.path.exists(path):
+        return None
+    return pd.read_json(path, orient='records')
+
+
+def load_model(fingerprint, registry_dir=REGISTRY_DIR):
+    """
+    Carrega o modelo e o scaler do artefato. Retorna (model, scaler) ou None.
+    """
+    import joblib
+
+    path = os.path.join(artifact_dir(fingerprint, registry_dir), MODEL_FILE)
+    if not os.path.exists(path):
+        return None
+    artifact = joblib.load(path)
+    return artifact['model'], artifact['scaler']
+
+
+def list_artifacts(registry_dir=REGISTRY_DIR):
+    """
+    Lista os metadados de todos os artefatos salvos, do mais recente para o mais antigo.
+    """
+    if not os.path.isdir(registry_dir):
+        return []
+
+    artifacts = []
+    for name in os.listdir(registry_dir):
+        meta_path = os.path.join(registry_dir, name, METADATA_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                artifacts.append(json.load(f))
+    return sorted(artifacts, key=lambda meta: meta.get('created_at', ''), reverse=True)
+
+
+def build_metadata(fingerprint, X, feature_cols, params, train_seconds):
+    return {
+        'fingerprint': fingerprint,
+        'registry_version': REGISTRY_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sklearn_version': sklearn_version(),
+        'n_rows': int(np.shape(X)[0]),
+        'features': list(feature_cols),
+        'params': params,
+        'train_seconds': round(train_seconds, 3),
+    }
+
+
+def load_or_train(X, y, feature_cols, fit, params, force=False, registry_dir=REGISTRY_DIR):
+    """
+    Retorna a tabela de importâncias do artefato correspondente aos dados, treinando-o se necessário.
+
+    `fit(X, y, feature_cols, params)` deve retornar (model, scaler, importance_df).
+    Falhas ao gravar o artefato (ex.: disco somente leitura) não interrompem a análise.
+    """
+    params = dict(params)
+    fingerprint = compute_fingerprint(X, y, feature_cols, params)
+
+    if not force:
+        importance_df = load_importance(fingerprint, registry_dir)
+        if importance_df is not None:
+            return importance_df
+
+    _, _, importance_df = _train_and_save(X, y, feature_cols, fit, params, fingerprint, registry_dir)
+    return importance_df
+
+
+def load_or_train_model(X, y, feature_cols, fit, params, registry_dir=REGISTRY_DIR):
+    """
+    Retorna (model, scaler, fingerprint) do artefato correspondente aos dados, treinando-o se necessário.
+    """
+    params = dict(params)
+    fingerprint = compute_fingerprint(X, y, feature_cols, params)
+
+    loaded = load_model(fingerprint, registry_dir)
+    if loaded is not None:
+        model, scaler = loaded
+    else:
+        model, scaler, _ = _train_and_save(X, y, feature_cols, fit, params, fingerprint, registry_dir)
+
+    return model, scaler, fingerprint
+
+
+def _train_and_save(X, y, feature_cols, fit, params, fingerprint, registry_dir):
+    start = time.perf_counter()
+    model, scaler, importance_df = fit(X, y, feature_cols, params)
+    metadata = build_metadata(fingerprint, X, feature_cols, params, time.perf_counter() - start)
+
+    try:
+        save_artifact(fingerprint, model, scaler, importance_df, metadata, registry_dir)
+    except OSError:
+        pass
+
+    return model, scaler, importance_df
+
+
+def main(argv=None):
+    from src.training import TRAINING_PROFILES, DEFAULT_PROFILE
+
+    parser = argparse.ArgumentParser(description="Registro de modelos de importância de atributos.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Treina (ou reutiliza) o modelo para os dados atuais.")
+    train_parser.add_argument("--pokemon", default="pokemon.xlsx")
+    train_parser.add_argument("--combat", default="combat_pokemon.xlsx")
+    train_parser.add_argument("--force", action="store_true", help="Retreina mesmo se já existir artefato.")
+    train_parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(TRAINING_PROFILES),
+                              help="Perfil de treino (ver src/training.py).")
+
+    matchups_parser = subparsers.add_parser("matchups", help="Calcula a matriz de confrontos para os dados atuais.")
+    matchups_parser.add_argument("--pokemon", default="pokemon.xlsx")
+    matchups_parser.add_argument("--combat", default="combat_pokemon.xlsx")
+    matchups_parser.add_argument("--force", action="store_true", help="Recalcula mesmo se a matriz já existir.")
+    matchups_parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(TRAINING_PROFILES),
+                                 help="Perfil de treino do modelo (ver src/training.py).")
+
+    subparsers.add_parser("list", help="Lista os artefatos salvos.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for meta in list_artifacts():
+            print(f"{meta['fingerprint']}  {meta['created_at']}  linhas={meta['n_rows']}  "
+                  f"treino={meta['train_seconds']}s  params={meta['params']}")
+        return 0
+
+    # Importações locais: evitam dependência circular com o módulo de análise
+    from src.data_loader import load_data
+    from src.analysis_utils import prepare_data, train_model
+
+    from src.prediction import build_matchup_artifact
+
+    df_pokemon, df_combat = load_data.__wrapped__(args.pokemon, args.combat)
+
+    if args.command == "train":
+        df_model, feature_cols = prepare_data.__wrapped__(df_pokemon, df_combat)
+
+        start = time.perf_counter()
+        importance_df = train_model.__wrapped__(df_model, feature_cols, force_retrain=args.force,
+                                                profile=args.profile)
+        print(f"Modelo pronto em {time.perf_counter() - start:.2f}s.")
+        print(importance_df.to_string(index=False))
+
+    # Matriz de confrontos do modelo, lida pelo app por memória mapeada
+    start = time.perf_counter()
+    path = build_matchup_artifact(df_pokemon, df_combat, profile=args.profile, force=args.force)
+    print(f"Matriz de confrontos pronta em {time.perf_counter() - start:.2f}s: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Previsão de resultados de combate a partir do modelo de importância de atributos.
+
+O modelo treinado em `train_model` (features de diferença P1 - P2) é reaproveitado para
+prever, em uma única chamada vetorizada, a probabilidade de vitória de lotes de pares
+(first_pokemon, second_pokemon). A matriz completa de confrontos (id × id) é calculada
+offline, uma única vez por modelo, e salva em float16 ao lado do artefato do modelo:
+
+    python -m src.model_registry matchups [--profile full]
+
+O app apenas a lê por memória mapeada (`load_matchup_matrix`): consultas de "quem vence
+quem" e pontuação de equipes viram leituras de array, sem inferência.
+"""
+import hashlib
+import os
+
+import numpy as np
+import streamlit as st
+
+from src.analysis_utils import STAT_ATTRIBUTES, build_stat_matrix, difference_features
+from src.instrumentation import instrumented
+from src.model_registry import REGISTRY_DIR, artifact_dir, compute_fingerprint, load_or_train_model
+from src.training import TRAINING_PROFILES, DEFAULT_PROFILE, fit_importance_model
+
+# Número de primeiros Pokémon por lote ao montar a matriz (limita a memória da inferência)
+MATCHUP_BATCH_ROWS = 64
+# Etapa offline que calcula a matriz de confrontos dos dados atuais
+MATCHUP_BUILD_COMMAND = "python -m src.model_registry matchups"
+
+
+class MatchupMatrixNotFound(FileNotFoundError):
+    """
+    A matriz de confrontos dos dados atuais ainda não foi calculada (ver `MATCHUP_BUILD_COMMAND`).
+    """
+
+
+def load_prediction_model(df_pokemon, df_combat, profile=DEFAULT_PROFILE):
+    """
+    Carrega (ou treina e registra) o modelo usado por `train_model` para os mesmos dados.
+    Retorna (model, scaler, fingerprint).
+    """
+    feature_cols = [f'diff_{attr}' for attr in STAT_ATTRIBUTES]
+    _, diffs, p1_won = difference_features(df_pokemon, df_combat)
+    return load_or_train_model(diffs, p1_won, feature_cols, fit_importance_model, TRAINING_PROFILES[profile])
+
+
+def predict_win_probability(model, scaler, stat_matrix, first_ids, second_ids):
+    """
+    Probabilidade de o primeiro Pokémon vencer, para cada par (first_ids[i], second_ids[i]).
+    """
+    first_ids = np.asarray(first_ids, dtype=np.int64)
+    second_ids = np.asarray(second_ids, dtype=np.int64)
+
+    diffs = stat_matrix[first_ids] - stat_matrix[second_ids]
+    X_scaled = scaler.transform(diffs.astype(np.float64))
+
+    # Coluna da classe 1 (p1_won)
+    class_index = int(np.flatnonzero(model.classes_ == 1)[0])
+    return model.predict_proba(X_scaled)[:, class_index]
+
+
+def _stats_hash(stat_matrix, known):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(stat_matrix).tobytes())
+    digest.update(np.ascontiguousarray(known).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def matchup_matrix_path(fingerprint, stat_matrix, known, registry_dir=REGISTRY_DIR):
+    return os.path.join(artifact_dir(fingerprint, registry_dir),
+                        f"matchups-{_stats_hash(stat_matrix, known)}.npy")
+
+
+@instrumented
+def build_matchup_matrix(model, scaler, stat_matrix, known, path):
+    """
+    Calcula a matriz de confrontos e grava em `path` (float16, formato .npy).
+
+    matrix[a, b] é a probabilidade de `a` vencer atacando primeiro contra `b`. A diagonal e
+    as linhas/colunas de ids inexistentes ficam como NaN.
+    """
+    n_ids = len(known)
+    known_ids = np.flatnonzero(known)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}.npy"
+    matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float16, shape=(n_ids, n_ids))
+    matrix[:] = np.nan
+
+    for start in range(0, len(known_ids), MATCHUP_BATCH_ROWS):
+        batch = known_ids[start:start + MATCHUP_BATCH_ROWS]
+        first = np.repeat(batch, len(known_ids))
+        second = np.tile(known_ids, len(batch))
+        proba = predict_win_probability(model, scaler, stat_matrix, first, second)
+        matrix[np.ix_(batch, known_ids)] = proba.reshape(len(batch), len(known_ids))
+
+    np.fill_diagonal(matrix, np.nan)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_path, path)
+
+
+def matchup_matrix_location(df_pokemon, df_combat, profile=DEFAULT_PROFILE):
+    """
+    Caminho da matriz de confrontos dos dados e do perfil de treino, sem carregar o modelo.
+
+    O caminho depende só do fingerprint dos dados de treino e dos atributos dos Pokémon.
+    Retorna (path, stat_matrix, known).
+    """
+    feature_cols = [f'diff_{attr}' for attr in STAT_ATTRIBUTES]
+    _, diffs, p1_won = difference_features(df_pokemon, df_combat)
+    fingerprint = compute_fingerprint(diffs, p1_won, feature_cols, dict(TRAINING_PROFILES[profile]))
+    stat_matrix, known = build_stat_matrix(df_pokemon)
+    return matchup_matrix_path(fingerprint, stat_matrix, known), stat_matrix, known
+
+
+def build_matchup_artifact(df_pokemon, df_combat, profile=DEFAULT_PROFILE, force=False):
+    """
+    Etapa offline: calcula e grava a matriz de confrontos (treinando e registrando o modelo se
+    preciso). Com a matriz já no disco, só recalcula com `force=True`. Retorna o caminho.
+    """
+    path, stat_matrix, known = matchup_matrix_location(df_pokemon, df_combat, profile)
+    if force or not os.path.exists(path):
+        model, scaler, _ = load_prediction_model(df_pokemon, df_combat, profile)
+        build_matchup_matrix(model, scaler, stat_matrix, known, path)
+    return path
+
+
+@instrumented(cache=st.cache_resource)
+def load_matchup_matrix(df_pokemon, df_combat, profile=DEFAULT_PROFILE):
+    """
+    Retorna a matriz de confrontos (memória mapeada, somente leitura) calculada offline.
+
+    Nada é inferido aqui: sem o arquivo, levanta `MatchupMatrixNotFound`. Exceções não entram
+    no cache do Streamlit, então a matriz é encontrada assim que a etapa offline rodar.
+    """
+    path, _, _ = matchup_matrix_location(df_pokemon, df_combat, profile)
+    if not os.path.exists(path):
+        raise MatchupMatrixNotFound(f"Matriz de confrontos não encontrada para os dados atuais ({path}). "
+                                    f"Calcule-a com `{MATCHUP_BUILD_COMMAND} --profile {profile}`.")
+    return np.load(path, mmap_mode='r')
+
+
+def lookup_win_probability(matrix, first_ids, second_ids):
+    """
+    Lê da matriz a probabilidade de vitória de cada par (first_ids[i], second_ids[i]).
+    """
+    first_ids = np.asarray(first_ids, dtype=np.int64)
+    second_ids = np.asarray(second_ids, dtype=np.int64)
+    return matrix[first_ids, second_ids].astype(np.float32)
+
+
+def head_to_head_probability(matrix, ids_a, ids_b):
+    """
+    Probabilidade de `a` vencer `b` sem considerar quem ataca primeiro
+    (média entre `a` atacando primeiro e `b` atacando primeiro).
+    """
+    ids_a = np.asarray(ids_a, dtype=np.int64)
+    ids_b = np.asarray(ids_b, dtype=np.int64)
+    return (matrix[ids_a, ids_b].astype(np.float32) + 1 - matrix[ids_b, ids_a].astype(np.float32)) / 2
+
+
+def score_team(matrix, team_ids, opponent_ids=None):
+    """
+    Pontua uma equipe pela probabilidade média de seus membros vencerem os oponentes.
+
+    Sem `opponent_ids`, os oponentes são todos os Pokémon conhecidos. Retorna um valor entre
+    0 e 1 (NaN se não houver confrontos válidos).
+    """
+    team_ids = np.asarray(team_ids, dtype=np.int64)
+    if opponent_ids is None:
+        opponent_ids = np.flatnonzero(~np.isnan(matrix).all(axis=1))
+    opponent_ids = np.asarray(opponent_ids, dtype=np.int64)
+
+    forward = matrix[np.ix_(team_ids, opponent_ids)].astype(np.float32)
+    backward = matrix[np.ix_(opponent_ids, team_ids)].astype(np.float32).T
+    return float(np.nanmean((forward + 1 - backward) / 2))
@@ -0,0 +1,236 @@
+"""
+Ratings de Bradley-Terry para todos os Pokémon a partir da tabela de combates.
+
+O modelo supõe P(i vence j) = p_i / (p_i + p_j). Os combates são agregados por par de Pokémon
+e as forças são ajustadas sobre essas contagens esparsas, sem laços em Python por combate:
+
+* passos de Newton sobre log(p), com gradiente e hessiana montados por `np.bincount` a partir
+  dos pares (convergem em ~10 iterações), quando o número de Pokémon cabe em uma hessiana
+  densa (`NEWTON_MAX_IDS`);
+* senão, o algoritmo MM (Hunter 2004), p_i = W_i / sum_j n_ij / (p_i + p_j), vetorizado da
+  mesma forma, que usa memória linear mas precisa de mais iterações.
+
+O custo por iteração depende do número de pares distintos, não do número de combates.
+
+Cada Pokémon recebe ainda `prior` vitórias e `prior` derrotas virtuais contra um oponente de
+força 1, o que mantém as forças finitas para quem só venceu ou só perdeu, fixa a escala
+(o oponente virtual tem log-força 0) e torna o ajuste bem definido mesmo com poucos combates.
+
+`BradleyTerryRatings` mantém as contagens por par e as forças ajustadas: `apply_delta` soma
+os combates novos e reajusta partindo das forças anteriores (warm start), o que converge em
+poucas iterações quando o lote é pequeno. O ajuste é verificado em
+`benchmarks/bench_ratings.py`.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.instrumentation import instrumented
+from src.analysis_utils import compute_combat_stats
+
+# Vitórias (e derrotas) virtuais de cada Pokémon contra um oponente de força 1
+BT_PRIOR = 1.0
+BT_TOLERANCE = 1e-6
+BT_MAX_ITER = 1000
+
+# Maior número de Pokémon com combates para o ajuste por Newton (hessiana densa de NEWTON_MAX_IDS²)
+NEWTON_MAX_IDS = 4000
+# Maior passo de Newton em log-força, para não ultrapassar o máximo partindo de longe
+NEWTON_MAX_STEP = 2.0
+
+# Escala de exibição no estilo Elo: 400 pontos = chance de vitória de 10 para 1
+RATING_BASE = 1500
+RATING_SCALE = 400 / np.log(10)
+
+# Acima deste número de células (n_ids²) as contagens por par usam np.unique em vez de np.bincount
+DENSE_PAIR_LIMIT = 1 << 24
+
+
+def pair_counts(df_combat, n_ids=None):
+    """
+    Agrega os combates por par não ordenado (low < high).
+
+    Retorna (low, high, battles, low_wins, n_ids): uma posição por par distinto, com o número
+    de combates e as vitórias do menor id. Combates de um Pokémon contra ele mesmo não
+    informam nada sobre a força relativa e são ignorados.
+    """
+    first = df_combat['first_pokemon'].to_numpy(dtype=np.int64)
+    second = df_combat['second_pokemon'].to_numpy(dtype=np.int64)
+    winner = df_combat['winner'].to_numpy(dtype=np.int64)
+
+    n_ids = max(n_ids or 0, int(max(first.max(initial=0), second.max(initial=0))) + 1)
+    distinct = first != second
+    first, second, winner = first[distinct], second[distinct], winner[distinct]
+
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    keys = low * n_ids + high
+    low_won = winner == low
+
+    if n_ids * n_ids <= DENSE_PAIR_LIMIT:
+        # Tabela densa de pares: contagem linear no número de combates
+        battles = np.bincount(keys, minlength=n_ids * n_ids)
+        low_wins = np.bincount(keys[low_won], minlength=n_ids * n_ids)
+        keys = np.flatnonzero(battles)
+        battles, low_wins = battles[keys], low_wins[keys]
+    else:
+        keys, inverse, battles = np.unique(keys, return_inverse=True, return_counts=True)
+        low_wins = np.bincount(inverse[low_won], minlength=len(keys))
+
+    low, high = np.divmod(keys, n_ids)
+    return low, high, battles.astype(np.int64), low_wins.astype(np.int64), n_ids
+
+
+def _newton_fit(a, b, battles, low_wins, wins, theta, prior, tol, max_iter):
+    """
+    Passos de Newton sobre as log-forças `theta` (índices compactos `a` < `b` por par).
+    """
+    m = len(theta)
+    for iteration in range(1, max_iter + 1):
+        # 1. Probabilidade de vitória do menor id em cada par e contra o oponente virtual
+        p_low = 1 / (1 + np.exp(theta[b] - theta[a]))
+        p_virtual = 1 / (1 + np.exp(-theta))
+        expected_low = battles * p_low
+        variance = battles * p_low * (1 - p_low)
+
+        # 2. Gradiente (vitórias observadas - esperadas) e hessiana negativa, acumulados por par
+        gradient = (wins - np.bincount(a, weights=expected_low, minlength=m)
+                    - np.bincount(b, weights=battles - expected_low, minlength=m) - 2 * prior * p_virtual)
+        off_diagonal = np.bincount(a * m + b, weights=variance, minlength=m * m).reshape(m, m)
+        hessian = -(off_diagonal + off_diagonal.T)
+        hessian[np.diag_indices(m)] = (np.bincount(a, weights=variance, minlength=m)
+                                       + np.bincount(b, weights=variance, minlength=m)
+                                       + 2 * prior * p_virtual * (1 - p_virtual))
+
+        step = np.clip(np.linalg.solve(hessian, gradient), -NEWTON_MAX_STEP, NEWTON_MAX_STEP)
+        theta = theta + step
+        if np.max(np.abs(step), initial=0.0) < tol:
+            break
+    return theta, iteration
+
+
+def _mm_fit(a, b, battles, wins, theta, prior, tol, max_iter):
+    """
+    Iterações MM sobre as forças (memória linear no número de pares).
+    """
+    m = len(theta)
+    strength = np.exp(theta)
+    for iteration in range(1, max_iter + 1):
+        rate = battles / (strength[a] + strength[b])
+        denominator = (np.bincount(a, weights=rate, minlength=m) + np.bincount(b, weights=rate, minlength=m)
+                       + 2 * prior / (strength + 1))
+        updated = wins / denominator
+        change = np.max(np.abs(np.log(updated) - np.log(strength)), initial=0.0)
+        strength = updated
+        if change < tol:
+            break
+    return np.log(strength), iteration
+
+
+def fit_bradley_terry(low, high, battles, low_wins, n_ids, init=None, prior=BT_PRIOR, tol=BT_TOLERANCE,
+                      max_iter=BT_MAX_ITER):
+    """
+    Ajusta as forças de Bradley-Terry sobre as contagens por par.
+
+    `init` (forças de um ajuste anterior) serve de ponto de partida. Retorna (forças, iterações);
+    quem não tem combates fica com força 1 (a do oponente virtual).
+    """
+    # 1. Índices compactos dos Pokémon com combates
+    active_ids = np.flatnonzero(np.bincount(low, minlength=n_ids) + np.bincount(high, minlength=n_ids))
+    position = np.zeros(n_ids, dtype=np.int64)
+    position[active_ids] = np.arange(len(active_ids))
+    a, b = position[low], position[high]
+    m = len(active_ids)
+
+    # 2. Vitórias de cada Pokémon (mais as virtuais) e ponto de partida
+    battles = battles.astype(np.float64)
+    wins = (np.bincount(a, weights=low_wins, minlength=m)
+            + np.bincount(b, weights=battles - low_wins, minlength=m) + prior)
+    theta = np.zeros(m)
+    if init is not None:
+        known = active_ids < len(init)
+        theta[known] = np.log(np.where(init[active_ids[known]] > 0, init[active_ids[known]], 1.0))
+
+    # 3. Newton quando a hessiana densa cabe em memória; senão MM
+    if m <= NEWTON_MAX_IDS:
+        theta, iterations = _newton_fit(a, b, battles, low_wins, wins, theta, prior, tol, max_iter)
+    else:
+        theta, iterations = _mm_fit(a, b, battles, wins, theta, prior, tol, max_iter)
+
+    strength = np.ones(n_ids)
+    strength[active_ids] = np.exp(theta)
+    return strength, iterations
+
+
+class BradleyTerryRatings:
+    """
+    Contagens por par e forças de Bradley-Terry, atualizáveis com novos combates.
+    """
+
+    def __init__(self, prior=BT_PRIOR):
+        self.prior = prior
+        self.n_ids = 0
+        self.low = np.zeros(0, dtype=np.int64)
+        self.high = np.zeros(0, dtype=np.int64)
+        self.battles = np.zeros(0, dtype=np.int64)
+        self.low_wins = np.zeros(0, dtype=np.int64)
+        self.strength = np.ones(0)
+        self.iterations = 0
+
+    def apply_delta(self, df_delta):
+        """
+        Soma os combates de `df_delta` às contagens por par e reajusta a partir das forças atuais.
+        """
+        low, high, battles, low_wins, n_ids = pair_counts(df_delta, self.n_ids)
+
+        # 1. Junta as contagens novas às existentes (mesmo par → mesma chave)
+        keys = np.concatenate([self.low * n_ids + self.high, low * n_ids + high])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        self.battles = np.bincount(inverse, weights=np.concatenate([self.battles, battles])).astype(np.int64)
+        self.low_wins = np.bincount(inverse, weights=np.concatenate([self.low_wins, low_wins])).astype(np.int64)
+        self.low, self.high = np.divmod(keys, n_ids)
+        self.n_ids = n_ids
+
+        # 2. Warm start com as forças do ajuste anterior
+        self.strength, self.iterations = fit_bradley_terry(self.low, self.high, self.battles, self.low_wins,
+                                                           self.n_ids, init=self.strength, prior=self.prior)
+        return self
+
+    def ratings(self):
+        """
+        Força e rating (escala Elo) por id, apenas para quem participou de algum combate.
+        """
+        totals = (np.bincount(self.low, weights=self.battles, minlength=self.n_ids)
+                  + np.bincount(self.high, weights=self.battles, minlength=self.n_ids))
+        ids = np.flatnonzero(totals)
+        return pd.DataFrame({
+            'id': ids,
+            'Força': self.strength[ids],
+            'Rating': RATING_BASE + RATING_SCALE * np.log(self.strength[ids]),
+        })
+
+
+@instrumented(cache=st.cache_data)
+def analyze_ratings(df_pokemon, df_combat):
+    """
+    Ranking dos Pokémon pelo rating de Bradley-Terry, com as vitórias e combates de cada um.
+    """
+
+    # 1. Ajuste sobre todos os combates
+    df_ratings = BradleyTerryRatings().apply_delta(df_combat).ratings()
+
+    # 2. Vitórias e combates brutos, para comparar com o ranking por número de vitórias
+    combat_stats = compute_combat_stats(df_combat)
+    wins, total = combat_stats['wins'].to_numpy(), combat_stats['total'].to_numpy()
+
+    ids = df_ratings['id'].to_numpy()
+    df_ratings['Total de Vitórias'] = wins[ids]
+    df_ratings['Total de Combates'] = total[ids]
+    df_ratings['Taxa de Vitória (%)'] = wins[ids] / total[ids] * 100
+    df_ratings['Posição por Vitórias'] = df_ratings['Total de Vitórias'].rank(ascending=False, method='min').astype(int)
+
+    # 3. Nome para exibição e ordenação pelo rating
+    df_ratings = df_ratings.merge(df_pokemon[['id', 'name']], on='id', how='left')
+    df_ratings = df_ratings.sort_values('Rating', ascending=False, kind='mergesort').reset_index(drop=True)
+    df_ratings.insert(0, 'Posição', np.arange(1, len(df_ratings) + 1))
+
+    return df_ratings
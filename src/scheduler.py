@@ -0,0 +1,80 @@
+"""
+Executor de etapas independentes com dependências declaradas.
+
+Cada etapa é uma função sem argumentos com a lista das etapas de que depende. As etapas
+sem dependências pendentes rodam ao mesmo tempo em um pool de threads e os resultados são
+entregues na ordem em que terminam, para que o app desenhe cada seção assim que o seu
+resultado fica pronto.
+
+Threads (e não processos) porque as etapas são funções `st.cache_data`/`st.cache_resource`:
+no mesmo processo elas compartilham o cache do Streamlit, e o trabalho pesado (numpy,
+pandas, scikit-learn) libera o GIL. Cada etapa roda em uma cópia do contexto (`contextvars`)
+de quem chamou `run_stages`, então o coletor de registros da execução
+(`src.instrumentation.collect_records`) também vale dentro das threads.
+"""
+import contextvars
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+Stage = namedtuple('Stage', ['name', 'func', 'deps'], defaults=[()])
+
+# elapsed: duração da etapa; finished_at: segundos desde o início da execução até o fim da etapa
+StageResult = namedtuple('StageResult', ['name', 'result', 'elapsed', 'finished_at'])
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run_stages(stages, max_workers=None, initializer=None):
+    """
+    Executa as etapas respeitando as dependências e gera um `StageResult` por etapa, na ordem
+    de término. Uma exceção em qualquer etapa é propagada ao consumidor.
+
+    `initializer` roda em cada thread do pool antes das etapas (ex.: anexar o contexto do
+    Streamlit com `streamlit_thread_initializer`).
+    """
+    pending = {stage.name: stage for stage in stages}
+    for stage in pending.values():
+        missing = [dep for dep in stage.deps if dep not in pending]
+        if missing:
+            raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+
+    done = set()
+    running = {}
+    run_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(pending) or 1, initializer=initializer) as executor:
+        while pending or running:
+            # 1. Dispara todas as etapas cujas dependências já terminaram
+            for name, stage in list(pending.items()):
+                if all(dep in done for dep in stage.deps):
+                    running[executor.submit(contextvars.copy_context().run, _timed, stage.func)] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Dependência circular entre as etapas: {sorted(pending)}")
+
+            # 2. Entrega os resultados assim que cada etapa termina
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                result, elapsed = future.result()
+                done.add(name)
+                yield StageResult(name, result, elapsed, time.perf_counter() - run_start)
+
+
+def streamlit_thread_initializer():
+    """
+    Retorna um `initializer` que anexa o contexto da execução atual do Streamlit às threads
+    do pool (evita os avisos de "missing ScriptRunContext" nas funções em cache).
+    """
+    import threading
+
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
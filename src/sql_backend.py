@@ -0,0 +1,211 @@
+"""
+Backend SQL opcional para as análises do app.
+
+Carrega as tabelas de Pokémon e de combates em um banco analítico embutido (DuckDB, se
+instalado; senão SQLite, da biblioteca padrão) e expressa a taxa de vitória por tipo, os
+maiores vencedores, os atributos médios e a distribuição de vitórias como consultas SQL.
+Os resultados têm as mesmas colunas, ordem e tipos dos DataFrames das funções pandas de
+`src/analysis_utils.py` e `src/analysis_types.py`.
+
+Com DuckDB as consultas rodam em várias threads e, com `database` apontando para um arquivo,
+as tabelas podem ser maiores que a memória. A equivalência com as funções pandas é
+verificada em `benchmarks/bench_sql_backend.py`.
+
+No app, o backend é escolhido pela variável de ambiente `POKEMON_ANALYSIS_BACKEND`
+('pandas', padrão, ou 'sql').
+"""
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.instrumentation import instrumented
+from src.analysis_utils import STAT_ATTRIBUTES, format_attribute_names
+
+ENGINES = ('duckdb', 'sqlite')
+
+# Uma linha por participação em combate: o P1 vence quando é o vencedor, o P2 em todos os outros casos
+PARTICIPATIONS_SQL = """
+    SELECT first_pokemon AS id, CASE WHEN winner = first_pokemon THEN 1 ELSE 0 END AS won, 1 AS first_move
+    FROM combats
+    UNION ALL
+    SELECT second_pokemon AS id, CASE WHEN winner = first_pokemon THEN 0 ELSE 1 END AS won, 0 AS first_move
+    FROM combats
+"""
+
+COMBAT_STATS_SQL = f"""
+    CREATE VIEW combat_stats AS
+    SELECT id,
+           CAST(SUM(won) AS BIGINT) AS wins,
+           CAST(COUNT(*) AS BIGINT) AS total,
+           CAST(SUM(first_move) AS BIGINT) AS first_moves
+    FROM ({PARTICIPATIONS_SQL}) AS participations
+    GROUP BY id
+"""
+
+# Tipos de cada Pokémon (um tipo repetido no mesmo Pokémon conta uma vez)
+POKEMON_TYPES_SQL = """
+    CREATE VIEW pokemon_types AS
+    SELECT id, type1 AS type FROM pokemon WHERE type1 IS NOT NULL
+    UNION
+    SELECT id, type2 AS type FROM pokemon WHERE type2 IS NOT NULL
+"""
+
+TYPE_WIN_RATE_SQL = """
+    SELECT t.type AS "Tipo",
+           (CAST(SUM(s.wins) AS DOUBLE) / SUM(s.total)) * 100 AS "Taxa de Vitória (%)",
+           CAST(SUM(s.total) AS BIGINT) AS "Total de Combates",
+           CAST(SUM(s.wins) AS BIGINT) AS "Total de Vitórias"
+    FROM pokemon_types AS t
+    JOIN combat_stats AS s ON s.id = t.id
+    GROUP BY t.type
+    HAVING SUM(s.total) > 0
+    ORDER BY 2 DESC, 1
+"""
+
+TOP_WINNERS_SQL = """
+    SELECT s.id AS id,
+           s.wins AS "Total de Vitórias",
+           s.total AS "Total de Combates",
+           (CAST(s.wins AS DOUBLE) / s.total) * 100 AS "Taxa de Vitória (%)",
+           p.name AS name
+    FROM combat_stats AS s
+    LEFT JOIN pokemon AS p ON p.id = s.id
+    WHERE s.total > 0
+    ORDER BY s.wins DESC, s.id
+"""
+
+WIN_DISTRIBUTION_SQL = """
+    SELECT id, wins AS "Total de Vitórias"
+    FROM combat_stats
+    WHERE wins > 0
+    ORDER BY wins DESC, id
+"""
+
+
+def _average_attributes_sql(attributes=STAT_ATTRIBUTES):
+    """
+    Médias por status lendário já no formato longo (uma linha por atributo e status).
+    """
+    selects = [
+        f"""SELECT CASE WHEN legendary = 1 THEN 'Lendário' ELSE 'Não Lendário' END AS "Status",
+                   '{attr}' AS "Atributo", {position} AS position, AVG(CAST({attr} AS DOUBLE)) AS "Média do Atributo"
+            FROM pokemon GROUP BY 1"""
+        for position, attr in enumerate(attributes)
+    ]
+    return ('SELECT "Status", "Atributo", "Média do Atributo" FROM ('
+            + " UNION ALL ".join(selects) + ') AS averages ORDER BY position, "Status"')
+
+
+def available_engine(preferred=None):
+    """
+    Retorna o motor a usar: `preferred` se informado; senão DuckDB quando instalado, ou SQLite.
+    """
+    if preferred is not None:
+        if preferred not in ENGINES:
+            raise ValueError(f"Motor SQL desconhecido: {preferred}. Use um de {ENGINES}.")
+        return preferred
+    try:
+        import duckdb  # noqa: F401
+        return 'duckdb'
+    except ImportError:
+        return 'sqlite'
+
+
+def _pokemon_table(df_pokemon):
+    table = df_pokemon[['id', 'name', *STAT_ATTRIBUTES, 'generation']].astype({'id': np.int64})
+    table['legendary'] = df_pokemon['legendary'].astype(np.int8)
+    for col in ('type1', 'type2'):
+        table[col] = df_pokemon[col].astype(object).where(df_pokemon[col].notna(), None)
+    return table
+
+
+def _combat_table(df_combat):
+    return df_combat[['battle_id', 'first_pokemon', 'second_pokemon', 'winner']].astype(np.int64)
+
+
+class SqlBackend:
+    """
+    Conexão com as tabelas `pokemon` e `combats` carregadas e as consultas das análises.
+
+    As consultas são serializadas por um lock, para que a mesma conexão possa ser usada
+    pelas etapas em paralelo do app.
+    """
+
+    def __init__(self, df_pokemon, df_combat, engine=None, database=":memory:"):
+        self.engine = available_engine(engine)
+        self._lock = threading.Lock()
+
+        pokemon = _pokemon_table(df_pokemon)
+        combats = _combat_table(df_combat)
+
+        if self.engine == 'duckdb':
+            import duckdb
+
+            self.connection = duckdb.connect(database)
+            for name, table in (('pokemon', pokemon), ('combats', combats)):
+                self.connection.register(f"{name}_frame", table)
+                self.connection.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM {name}_frame")
+                self.connection.unregister(f"{name}_frame")
+        else:
+            self.connection = sqlite3.connect(database, check_same_thread=False)
+            pokemon.to_sql('pokemon', self.connection, if_exists='replace', index=False)
+            combats.to_sql('combats', self.connection, if_exists='replace', index=False)
+
+        for view in ('combat_stats', 'pokemon_types'):
+            self.connection.execute(f"DROP VIEW IF EXISTS {view}")
+        self.connection.execute(COMBAT_STATS_SQL)
+        self.connection.execute(POKEMON_TYPES_SQL)
+
+    def query(self, sql):
+        with self._lock:
+            if self.engine == 'duckdb':
+                return self.connection.execute(sql).df()
+            return pd.read_sql_query(sql, self.connection)
+
+    def close(self):
+        self.connection.close()
+
+    def type_win_rate(self):
+        """
+        Equivalente a `analyze_type_win_rate`.
+        """
+        df = self.query(TYPE_WIN_RATE_SQL)
+        return df.astype({'Tipo': object, 'Taxa de Vitória (%)': np.float64,
+                          'Total de Combates': np.int64, 'Total de Vitórias': np.int64})
+
+    def top_winners(self):
+        """
+        Equivalente a `analyze_top_winners` (índice sequencial).
+        """
+        df = self.query(TOP_WINNERS_SQL)
+        df = df.astype({'id': np.int64, 'Total de Vitórias': np.int64, 'Total de Combates': np.int64,
+                        'Taxa de Vitória (%)': np.float64})
+        # Ids sem cadastro (ex.: 63) ficam com NaN, como no merge do pandas
+        df['name'] = df['name'].astype(object).where(df['name'].notna(), np.nan)
+        return df
+
+    def average_attributes(self):
+        """
+        Equivalente a `analyze_average_attributes`.
+        """
+        df = self.query(_average_attributes_sql())
+        df['Atributo'] = format_attribute_names(df['Atributo'].astype(object))
+        return df.astype({'Status': object, 'Média do Atributo': np.float64})
+
+    def win_distribution(self):
+        """
+        Equivalente a `analyze_win_distribution`.
+        """
+        df = self.query(WIN_DISTRIBUTION_SQL)
+        return df.astype({'id': np.int64, 'Total de Vitórias': np.int64})
+
+
+@instrumented(cache=st.cache_resource)
+def get_sql_backend(df_pokemon, df_combat, engine=None):
+    """
+    Backend SQL compartilhado entre as execuções do app (as tabelas são carregadas uma vez).
+    """
+    return SqlBackend(df_pokemon, df_combat, engine=engine)
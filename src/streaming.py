@@ -0,0 +1,184 @@
+"""
+Processamento em blocos de logs de combate maiores que a memória.
+
+Em vez de carregar todos os combates em um único DataFrame, a origem é lida em lotes de
+`chunk_size` combates e cada lote atualiza os agregados e é descartado em seguida; o pico de
+memória depende do tamanho do lote, não do número de combates. Origens aceitas:
+
+* planilha `.xlsx` (lida linha a linha com o modo somente leitura do openpyxl);
+* arquivo `.parquet` (lido por memória mapeada, um grupo de linhas por vez; grupos maiores que
+  o lote, como o grupo único do padrão do `fastparquet.write`, são fatiados direto do arquivo
+  quando as colunas estão em PLAIN sem compressão);
+* pasta de combates de `src/combat_sync.py` (as partes são lidas uma a uma).
+
+Agregados calculados: os de `src/aggregate_store.py` (por Pokémon, por tipo e histograma de
+vitórias) e os momentos das features de diferença (P1 - P2) separados pelo resultado do
+combate. O teto de memória é verificado em `benchmarks/bench_streaming.py`.
+
+    python -m src.streaming combat_pokemon.xlsx [--chunk-size 100000]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.aggregate_store import CombatAggregates
+from src.analysis_types import build_type_index
+from src.analysis_utils import STAT_ATTRIBUTES, difference_features
+from src.columnar_cache import mmap_open, open_parquet_mmap, plain_column_views
+from src.combat_sync import COMBAT_COLUMNS, combat_store_parts
+from src.data_loader import apply_combat_schema, read_source_excel
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _rechunk(frames, chunk_size):
+    """
+    Reagrupa uma sequência de DataFrames em lotes de exatamente `chunk_size` linhas (o último pode ser menor).
+    """
+    pending = []
+    pending_rows = 0
+    for df in frames:
+        pending.append(df)
+        pending_rows += len(df)
+        while pending_rows >= chunk_size:
+            buffer = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield buffer.iloc[:chunk_size].reset_index(drop=True)
+            rest = buffer.iloc[chunk_size:]
+            pending = [rest] if len(rest) else []
+            pending_rows = len(rest)
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def _iter_excel(path, chunk_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows)]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _iter_parquet(path, chunk_size):
+    """
+    Lê os combates de um arquivo parquet em DataFrames de até `chunk_size` linhas por grupo de linhas.
+
+    Um grupo maior que o lote é fatiado em intervalos de linhas sobre a memória mapeada
+    (`plain_column_views`) e só cada fatia é copiada. Quando as colunas estão comprimidas ou
+    codificadas, o grupo é lido inteiro: os arquivos de `write_parquet` (cache colunar e
+    sincronização) têm grupos de até `PARQUET_ROW_GROUP_SIZE` linhas.
+    """
+    parquet_file = open_parquet_mmap(path)
+    buffer = None
+    for index, row_group in enumerate(parquet_file.row_groups):
+        if row_group.num_rows > chunk_size:
+            if buffer is None:
+                buffer = np.frombuffer(mmap_open(path), dtype=np.uint8)
+            views = plain_column_views(parquet_file, buffer, row_group, COMBAT_COLUMNS)
+            if views is not None:
+                for start in range(0, row_group.num_rows, chunk_size):
+                    yield pd.DataFrame({name: view[start:start + chunk_size].copy() for name, view in views.items()})
+                continue
+        yield parquet_file[index].to_pandas(columns=COMBAT_COLUMNS)
+
+
+def iter_combat_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Itera os combates de `source` em DataFrames de até `chunk_size` linhas, no esquema compacto
+    de `apply_combat_schema`.
+    """
+    if os.path.isdir(source):
+        frames = (frame for part in combat_store_parts(source) for frame in _iter_parquet(part, chunk_size))
+    elif source.endswith(".parquet"):
+        frames = _iter_parquet(source, chunk_size)
+    elif source.endswith(".xlsx"):
+        frames = _iter_excel(source, chunk_size)
+    else:
+        raise ValueError(f"Formato de origem não suportado: {source}")
+
+    for chunk in _rechunk(frames, chunk_size):
+        yield apply_combat_schema(chunk[COMBAT_COLUMNS])
+
+
+class DifferenceMoments:
+    """
+    Contagem, soma e soma dos quadrados das features de diferença, por resultado do combate
+    (linha 0: P1 perdeu, linha 1: P1 venceu). Apenas combates entre Pokémon conhecidos entram.
+    """
+
+    def __init__(self, attributes=STAT_ATTRIBUTES):
+        self.attributes = attributes
+        self.count = np.zeros(2, dtype=np.int64)
+        self.sums = np.zeros((2, len(attributes)), dtype=np.float64)
+        self.squares = np.zeros((2, len(attributes)), dtype=np.float64)
+
+    def apply_delta(self, df_pokemon, df_delta):
+        _, diffs, p1_won = difference_features(df_pokemon, df_delta, self.attributes)
+        diffs = diffs.astype(np.float64)
+        for outcome in (0, 1):
+            rows = diffs[p1_won == outcome]
+            self.count[outcome] += len(rows)
+            self.sums[outcome] += rows.sum(axis=0)
+            self.squares[outcome] += (rows ** 2).sum(axis=0)
+        return self
+
+    def summary(self):
+        """
+        Média e desvio padrão de cada feature de diferença por resultado.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.count[:, None]
+            stds = np.sqrt(np.maximum(self.squares / self.count[:, None] - means ** 2, 0))
+        return pd.DataFrame({
+            'Atributo': [f'diff_{attr}' for attr in self.attributes],
+            'Média (P1 venceu)': means[1],
+            'Média (P1 perdeu)': means[0],
+            'Desvio (P1 venceu)': stds[1],
+            'Desvio (P1 perdeu)': stds[0],
+        })
+
+
+def stream_aggregates(df_pokemon, source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Percorre `source` em blocos e retorna (aggregates, moments): um `CombatAggregates` e um
+    `DifferenceMoments` com todos os combates da origem.
+    """
+    aggregates = CombatAggregates(build_type_index(df_pokemon))
+    moments = DifferenceMoments()
+    for chunk in iter_combat_chunks(source, chunk_size):
+        aggregates.apply_delta(chunk)
+        moments.apply_delta(df_pokemon, chunk)
+    return aggregates, moments
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrega um log de combates em blocos, sem carregá-lo inteiro.")
+    parser.add_argument("source", help="combat_pokemon.xlsx, arquivo .parquet ou pasta do combat_sync")
+    parser.add_argument("--pokemon", default="pokemon.xlsx")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    df_pokemon = read_source_excel(args.pokemon, "pokemon.xlsx")
+    aggregates, moments = stream_aggregates(df_pokemon, args.source, args.chunk_size)
+
+    print(f"{aggregates.rows:,} combates processados.")
+    print(aggregates.type_win_rate().to_string(index=False))
+    print(moments.summary().to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Montagem otimizada da equipe ideal de 6 Pokémon.
+
+Cada Pokémon recebe uma pontuação individual que combina a sua taxa de vitória nos combates
+(`compute_combat_stats`), a taxa de vitória dos seus tipos (`analyze_type_win_rate`) e a
+probabilidade média de vencer qualquer oponente na matriz de confrontos
+(`src.prediction.load_matchup_matrix`, calculada offline). A equipe é pontuada pela média das pontuações
+individuais e pela cobertura de confrontos: para cada oponente, a melhor probabilidade de
+vitória entre os membros da equipe.
+
+A busca é um beam search sobre um conjunto reduzido de candidatos (os melhores de cada
+função), respeitando as regras da seção 6 do app:
+
+* 2 Ofensivos, 2 Versáteis e 2 Tanques;
+* cobertura de tipos: nenhum tipo repetido em mais de `max_type_repeat` membros e pelo
+  menos `min_distinct_types` tipos diferentes na equipe. As duas regras são aplicadas durante
+  a busca, para que o feixe não se encha de equipes parciais que já não podem ser válidas.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.analysis_utils import compute_combat_stats
+from src.analysis_types import analyze_type_win_rate
+from src.instrumentation import instrumented
+from src.prediction import load_matchup_matrix, score_team
+
+ROLES = ['Ofensivo', 'Versátil', 'Tanque']
+TEAM_SIZE = 6
+ROLE_SLOTS = {role: 2 for role in ROLES}
+# Cada membro acrescenta no máximo dois tipos (primário e secundário)
+MAX_TYPES_PER_POKEMON = 2
+
+# Pesos da pontuação individual (taxa de vitória, tipos, confrontos) e da equipe
+INDIVIDUAL_WEIGHTS = (0.5, 0.25, 0.25)
+TEAM_WEIGHTS = {'individual': 0.6, 'coverage': 0.4}
+
+
+def head_to_head_matrix(matchup_matrix):
+    """
+    Converte a matriz de confrontos (quem ataca primeiro) em probabilidades de `a` vencer `b`
+    sem ordem de ataque. Pares sem previsão ficam com 0.5.
+    """
+    matrix = np.asarray(matchup_matrix, dtype=np.float32)
+    h2h = (matrix + 1 - matrix.T) / 2
+    return np.nan_to_num(h2h, nan=0.5)
+
+
+def assign_roles(df_pokemon):
+    """
+    Classifica cada Pokémon em uma função a partir dos atributos padronizados:
+
+    * Ofensivo: velocidade somada ao maior atributo ofensivo (Attack ou Sp. Attack);
+    * Tanque: HP somado à média das defesas;
+    * Versátil: média de todos os atributos, penalizada pela dispersão entre eles.
+
+    Como os três índices têm escalas diferentes, cada Pokémon fica com a função em que está
+    no maior percentil.
+    """
+    stats = df_pokemon[['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']].astype(np.float64)
+    z = (stats - stats.mean()) / stats.std(ddof=0)
+
+    role_scores = pd.DataFrame({
+        'Ofensivo': z['speed'] + z[['attack', 'sp_attack']].max(axis=1),
+        'Versátil': z.mean(axis=1) - z.std(axis=1, ddof=0),
+        'Tanque': z['hp'] + z[['defense', 'sp_defense']].mean(axis=1),
+    })
+    return role_scores.rank(pct=True).idxmax(axis=1)
+
+
+def build_team_candidates(df_pokemon, combat_stats, df_type_win_rate, matchup_matrix):
+    """
+    Monta a tabela de candidatos com função, códigos de tipo e pontuação individual.
+    """
+    ids = df_pokemon['id'].to_numpy(dtype=np.int64)
+    h2h = head_to_head_matrix(matchup_matrix)
+    known = ~np.isnan(np.asarray(matchup_matrix, dtype=np.float32)).all(axis=1)
+    opponents = np.flatnonzero(known)
+
+    # 1. Taxa de vitória suavizada ((vitórias + 1) / (combates + 2)), para não favorecer quem lutou pouco
+    stats = combat_stats.reindex(ids)
+    win_rate = ((stats['wins'].fillna(0) + 1) / (stats['total'].fillna(0) + 2)).to_numpy()
+
+    # 2. Média da taxa de vitória dos tipos do Pokémon
+    type_rate = df_type_win_rate.set_index('Tipo')['Taxa de Vitória (%)'] / 100
+    type1_rate = df_pokemon['type1'].astype(object).map(type_rate).to_numpy(dtype=np.float64)
+    type2_rate = df_pokemon['type2'].astype(object).map(type_rate).to_numpy(dtype=np.float64)
+    type_score = np.nanmean(np.vstack([type1_rate, type2_rate]), axis=0)
+    type_score = np.nan_to_num(type_score, nan=0.5)
+
+    # 3. Probabilidade média de vencer um oponente qualquer
+    in_matrix = ids < len(h2h)
+    matchup_score = np.full(len(ids), 0.5)
+    matchup_score[in_matrix] = h2h[np.ix_(ids[in_matrix], opponents)].mean(axis=1)
+
+    w_rate, w_type, w_matchup = INDIVIDUAL_WEIGHTS
+    candidates = pd.DataFrame({
+        'id': ids,
+        'name': df_pokemon['name'].to_numpy(),
+        'types': df_pokemon['types'].to_numpy(),
+        'type1_code': df_pokemon['type1'].cat.codes.to_numpy(),
+        'type2_code': df_pokemon['type2'].cat.codes.to_numpy(),
+        'role': assign_roles(df_pokemon).to_numpy(),
+        'win_rate': win_rate,
+        'type_score': type_score,
+        'matchup_score': matchup_score,
+    })
+    candidates['score'] = w_rate * win_rate + w_type * type_score + w_matchup * matchup_score
+
+    # Apenas Pokémon presentes na matriz de confrontos podem compor a equipe
+    candidates = candidates[in_matrix & known[np.minimum(ids, len(known) - 1)]]
+    return candidates.sort_values('score', ascending=False, kind='mergesort').reset_index(drop=True)
+
+
+def _team_objective(mean_individual, coverage):
+    return TEAM_WEIGHTS['individual'] * mean_individual + TEAM_WEIGHTS['coverage'] * coverage
+
+
+@instrumented
+def search_teams(candidates, matchup_matrix, top_k=5, pool_per_role=30, beam_width=200,
+                 max_type_repeat=2, min_distinct_types=6):
+    """
+    Busca as `top_k` melhores equipes com beam search.
+
+    O conjunto de busca é formado pelos `pool_per_role` melhores candidatos de cada função.
+    A cada passo, cada equipe parcial do feixe é estendida com todos os candidatos ainda
+    permitidos (função com vaga, tipos abaixo do limite, ordem crescente para não repetir
+    combinações, e ainda capazes de chegar a `min_distinct_types` tipos com as vagas
+    restantes) e apenas as `beam_width` melhores seguem. A cobertura de confrontos é
+    atualizada de forma incremental com o máximo por oponente.
+
+    Retorna menos de `top_k` equipes (ou um DataFrame vazio) apenas quando o feixe fica sem
+    equipes válidas.
+    """
+    h2h = head_to_head_matrix(matchup_matrix)
+    known = ~np.isnan(np.asarray(matchup_matrix, dtype=np.float32)).all(axis=1)
+    opponents = np.flatnonzero(known)
+
+    # 1. Conjunto de busca: os melhores de cada função, ordenados pela pontuação individual
+    pool = (candidates.sort_values('score', ascending=False, kind='mergesort')
+            .groupby('role', sort=False).head(pool_per_role)
+            .reset_index(drop=True))
+    n_pool = len(pool)
+    n_types = int(max(pool['type1_code'].max(), pool['type2_code'].max())) + 1
+
+    role_index = pool['role'].map({role: i for i, role in enumerate(ROLES)}).to_numpy()
+    role_slots = np.array([ROLE_SLOTS[role] for role in ROLES])
+    type_onehot = np.zeros((n_pool, n_types), dtype=np.int64)
+    for col in ('type1_code', 'type2_code'):
+        codes = pool[col].to_numpy()
+        type_onehot[np.flatnonzero(codes >= 0), codes[codes >= 0]] = 1
+    scores = pool['score'].to_numpy()
+    pool_h2h = h2h[np.ix_(pool['id'].to_numpy(), opponents)]
+
+    # 2. Feixe: (membros, contagem por função, contagem por tipo, soma das pontuações, máximo por oponente)
+    beam = [((), np.zeros(len(ROLES), dtype=np.int64), np.zeros(n_types, dtype=np.int64), 0.0,
+             np.zeros(len(opponents), dtype=np.float32))]
+
+    for depth in range(1, TEAM_SIZE + 1):
+        expansions = []
+        for members, role_count, type_count, score_sum, best in beam:
+            start = members[-1] + 1 if members else 0
+            options = np.arange(start, n_pool)
+
+            # Poda: função sem vaga, tipo acima do limite ou diversidade mínima inalcançável
+            new_type_count = type_count[None, :] + type_onehot[options]
+            allowed = role_count[role_index[options]] < role_slots[role_index[options]]
+            allowed &= (new_type_count <= max_type_repeat).all(axis=1)
+            allowed &= ((new_type_count > 0).sum(axis=1) + MAX_TYPES_PER_POKEMON * (TEAM_SIZE - depth)
+                        >= min_distinct_types)
+            options = options[allowed]
+            if not len(options):
+                continue
+
+            new_best = np.maximum(best[None, :], pool_h2h[options])
+            coverage = new_best.mean(axis=1)
+            objective = _team_objective((score_sum + scores[options]) / depth, coverage)
+
+            for option, value, option_best in zip(options, objective, new_best):
+                expansions.append((value, members, option, option_best))
+
+        if not expansions:
+            return pd.DataFrame()
+
+        expansions.sort(key=lambda item: item[0], reverse=True)
+        next_beam = []
+        for value, members, option, option_best in expansions[:beam_width]:
+            role_count = np.bincount(role_index[list(members) + [option]], minlength=len(ROLES))
+            type_count = type_onehot[list(members) + [option]].sum(axis=0)
+            next_beam.append((members + (option,), role_count, type_count,
+                              scores[list(members) + [option]].sum(), option_best))
+        beam = next_beam
+
+    # 3. Equipes completas (a poda garante a diversidade mínima de tipos em todas)
+    teams = []
+    for members, role_count, type_count, score_sum, best in beam:
+        teams.append({
+            'members': list(members),
+            'Pontuação': _team_objective(score_sum / TEAM_SIZE, best.mean()),
+            'Cobertura de Confrontos (%)': best.mean() * 100,
+            'Tipos Distintos': int((type_count > 0).sum()),
+        })
+        if len(teams) == top_k:
+            break
+
+    results = []
+    for rank, team in enumerate(teams, start=1):
+        members = pool.iloc[team.pop('members')]
+        results.append({
+            'Rank': rank,
+            'Equipe': ', '.join(members['name']),
+            'ids': members['id'].tolist(),
+            **team,
+        })
+    return pd.DataFrame(results)
+
+
+def describe_team(candidates, team_ids):
+    """
+    Tabela de exibição de uma equipe: função, nome, tipos e componentes da pontuação.
+    """
+    team = candidates.set_index('id').loc[team_ids].reset_index()
+    team['role'] = pd.Categorical(team['role'], categories=ROLES, ordered=True)
+    team = team.sort_values(['role', 'score'], ascending=[True, False])
+    return pd.DataFrame({
+        'Função': team['role'].astype(str).to_numpy(),
+        'Pokémon': team['name'].to_numpy(),
+        'Tipo(s)': team['types'].str.replace('/', ' / ').to_numpy(),
+        'Taxa de Vitória (%)': (team['win_rate'] * 100).round(1).to_numpy(),
+        'Vitória Média nos Confrontos (%)': (team['matchup_score'] * 100).round(1).to_numpy(),
+        'Pontuação Individual': team['score'].round(3).to_numpy(),
+    })
+
+
+@instrumented(cache=st.cache_data)
+def suggest_teams(df_pokemon, df_combat, profile='full', top_k=5):
+    """
+    Executa a busca completa da equipe ideal a partir dos dados carregados.
+
+    Retorna (df_teams, df_best_team, estimated_win_rate): o ranking das `top_k` equipes, a
+    tabela de exibição da melhor equipe e a probabilidade média (%) de a melhor equipe vencer
+    um oponente qualquer segundo a matriz de confrontos.
+    """
+    matchup_matrix = load_matchup_matrix(df_pokemon, df_combat, profile)
+    candidates = build_team_candidates(df_pokemon, compute_combat_stats(df_combat),
+                                       analyze_type_win_rate(df_pokemon, df_combat), matchup_matrix)
+
+    df_teams = search_teams(candidates, matchup_matrix, top_k=top_k)
+    if df_teams.empty:
+        return df_teams, pd.DataFrame(), float('nan')
+
+    best_ids = df_teams.iloc[0]['ids']
+    estimated_win_rate = score_team(matchup_matrix, best_ids) * 100
+    return df_teams, describe_team(candidates, best_ids), estimated_win_rate
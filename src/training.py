@@ -0,0 +1,231 @@
+"""
+Perfis de treino do modelo de importância de atributos.
+
+Cada perfil troca precisão por tempo de CPU de um jeito diferente:
+
+* full       – RandomForest com 100 árvores em um núcleo, sobre todas as linhas (referência);
+* parallel   – o mesmo RandomForest ajustado em todos os núcleos (mesmo resultado, menos tempo);
+* subsample  – RandomForest em amostras crescentes de linhas, parando quando o ranking
+               das importâncias converge;
+* hist_gb    – HistGradientBoosting, com importâncias por permutação em uma amostra de validação.
+
+Para comparar os perfis nos dados atuais:
+
+    python -m src.training compare
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# O scikit-learn é importado dentro das funções de ajuste: o app só paga a importação quando
+# precisa treinar (com o artefato no registro de modelos, nunca).
+
+TRAINING_PROFILES = {
+    'full': {'estimator': 'random_forest', 'n_estimators': 100, 'random_state': 42},
+    'parallel': {'estimator': 'random_forest', 'n_estimators': 100, 'random_state': 42, 'n_jobs': -1},
+    'subsample': {'estimator': 'random_forest', 'n_estimators': 100, 'random_state': 42, 'n_jobs': -1,
+                  'initial_rows': 5000, 'growth': 2, 'top_k': 3, 'tolerance': 1.5},
+    'hist_gb': {'estimator': 'hist_gradient_boosting', 'max_iter': 100, 'random_state': 42,
+                'permutation_rows': 20000, 'permutation_repeats': 5},
+}
+DEFAULT_PROFILE = 'full'
+
+RANDOM_FOREST_PARAMS = ('n_estimators', 'random_state', 'n_jobs', 'max_depth', 'min_samples_leaf')
+HIST_GB_PARAMS = ('max_iter', 'random_state', 'learning_rate', 'max_leaf_nodes')
+
+
+def format_importances(importances, feature_cols):
+    """
+    Monta a tabela de importâncias (em %) ordenada, com os nomes dos atributos para exibição.
+    """
+    feature_importances = pd.Series(importances, index=feature_cols)
+    feature_importances = feature_importances.sort_values(ascending=False)
+
+    # Preparar para o gráfico
+    importance_df = pd.DataFrame({
+        'Atributo': feature_importances.index,
+        'Importância': feature_importances.values
+    })
+
+    # Multiplica por 100 para transformar em porcentagem
+    importance_df['Importância'] = importance_df['Importância'] * 100
+
+    # Limpar nomes dos atributos para exibição
+    importance_df['Atributo'] = (
+        importance_df['Atributo']
+        .str.replace('diff_', '')
+        .str.replace('hp', 'HP')
+        .str.replace('sp_', 'Sp. ')
+        # REMOVENDO A LIMPEZA DE 'Vantagem Lendária'
+        .str.capitalize()
+    )
+
+    return importance_df
+
+
+def _select(params, names):
+    return {name: params[name] for name in names if name in params}
+
+
+def _fit_random_forest(X, y, params):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    # Padronizar os dados
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    # Modelo: Random Forest para Feature Importance
+    model = RandomForestClassifier(**_select(params, RANDOM_FOREST_PARAMS))
+    model.fit(X_scaled, y)
+
+    return model, scaler, model.feature_importances_
+
+
+def _fit_subsampled_forest(X, y, params):
+    """
+    Ajusta o RandomForest em amostras que dobram de tamanho até que duas amostras seguidas
+    deem o mesmo ranking para os `top_k` atributos mais importantes, com variação máxima
+    abaixo de `tolerance` pontos percentuais. Retorna também o número de linhas usadas.
+    """
+    n_rows = len(X)
+    rng = np.random.default_rng(params.get('random_state'))
+    order = rng.permutation(n_rows)
+
+    sample_rows = min(params['initial_rows'], n_rows)
+    previous = None
+    while True:
+        rows = order[:sample_rows]
+        model, scaler, importances = _fit_random_forest(X[rows], y[rows], params)
+
+        if previous is not None:
+            top_k = params['top_k']
+            same_ranking = np.array_equal(np.argsort(-importances)[:top_k], np.argsort(-previous)[:top_k])
+            max_change = np.abs(importances - previous).max() * 100
+            if same_ranking and max_change < params['tolerance']:
+                break
+        if sample_rows == n_rows:
+            break
+
+        previous = importances
+        sample_rows = min(sample_rows * params['growth'], n_rows)
+
+    return model, scaler, importances, sample_rows
+
+
+def _fit_hist_gradient_boosting(X, y, params):
+    """
+    Ajusta um HistGradientBoosting e mede a importância por permutação em uma amostra
+    separada. As importâncias negativas são zeradas e o total normalizado para 1, para
+    ficarem na mesma escala das importâncias do RandomForest.
+    """
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.inspection import permutation_importance
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(params.get('random_state'))
+    order = rng.permutation(len(X))
+    n_eval = min(params['permutation_rows'], len(X) // 5)
+    eval_rows, train_rows = order[:n_eval], order[n_eval:]
+
+    # Árvores por histograma não dependem da escala; o scaler é mantido pela interface comum
+    scaler = StandardScaler().fit(X[train_rows])
+    model = HistGradientBoostingClassifier(**_select(params, HIST_GB_PARAMS))
+    model.fit(scaler.transform(X[train_rows]), y[train_rows])
+
+    result = permutation_importance(model, scaler.transform(X[eval_rows]), y[eval_rows],
+                                    n_repeats=params['permutation_repeats'],
+                                    random_state=params.get('random_state'))
+    importances = np.clip(result.importances_mean, 0, None)
+    total = importances.sum()
+    importances = importances / total if total > 0 else importances
+
+    return model, scaler, importances, len(train_rows)
+
+
+def _fit_profile(X, y, feature_cols, params):
+    """
+    Ajusta o modelo descrito por `params`. Retorna (model, scaler, importance_df, linhas_usadas).
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+
+    estimator = params.get('estimator', 'random_forest')
+    if estimator == 'hist_gradient_boosting':
+        model, scaler, importances, rows_used = _fit_hist_gradient_boosting(X, y, params)
+    elif 'initial_rows' in params:
+        model, scaler, importances, rows_used = _fit_subsampled_forest(X, y, params)
+    else:
+        model, scaler, importances = _fit_random_forest(X, y, params)
+        rows_used = len(X)
+
+    return model, scaler, format_importances(importances, feature_cols), rows_used
+
+
+def fit_importance_model(X, y, feature_cols, params):
+    """
+    Ajusta o scaler e o modelo do perfil e monta a tabela de importâncias.
+    Retorna (model, scaler, importance_df), no formato esperado pelo registro de modelos.
+    """
+    model, scaler, importance_df, _ = _fit_profile(X, y, feature_cols, params)
+    return model, scaler, importance_df
+
+
+def compare_training_profiles(X, y, feature_cols, profiles=None):
+    """
+    Treina cada perfil e compara tempo e importâncias com o perfil de referência ('full').
+
+    Retorna um DataFrame com, por perfil, o tempo de treino, as linhas usadas, a maior
+    variação de importância em pontos percentuais e se o ranking é o mesmo da referência.
+    """
+    profiles = list(TRAINING_PROFILES) if profiles is None else list(profiles)
+    if DEFAULT_PROFILE in profiles:
+        profiles.remove(DEFAULT_PROFILE)
+    profiles.insert(0, DEFAULT_PROFILE)
+
+    results = []
+    reference = None
+    for name in profiles:
+        start = time.perf_counter()
+        _, _, importance_df, rows_used = _fit_profile(X, y, feature_cols, TRAINING_PROFILES[name])
+        elapsed = time.perf_counter() - start
+
+        importances = importance_df.set_index('Atributo')['Importância']
+        if reference is None:
+            reference = importances
+        aligned = importances.reindex(reference.index)
+
+        results.append({
+            'Perfil': name,
+            'Tempo (s)': elapsed,
+            'Linhas usadas': rows_used,
+            'Variação máx. (p.p.)': (aligned - reference).abs().max(),
+            'Mesmo ranking': list(importances.index) == list(reference.index),
+        })
+
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara os perfis de treino do modelo de importância.")
+    parser.add_argument("command", choices=["compare"])
+    parser.add_argument("--pokemon", default="pokemon.xlsx")
+    parser.add_argument("--combat", default="combat_pokemon.xlsx")
+    parser.add_argument("--profiles", nargs="+", choices=list(TRAINING_PROFILES))
+    args = parser.parse_args(argv)
+
+    from src.data_loader import load_data
+    from src.analysis_utils import compute_feature_matrix
+
+    df_pokemon, df_combat = load_data.__wrapped__(args.pokemon, args.combat)
+    X, y, feature_cols = compute_feature_matrix.__wrapped__(df_pokemon, df_combat)
+
+    print(compare_training_profiles(X, y, feature_cols, args.profiles).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
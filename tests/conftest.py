@@ -0,0 +1,25 @@
+"""
+Dados sintéticos compartilhados pelos testes (ver `benchmarks/synthetic.py`).
+
+Os testes verificam a equivalência dos caminhos incrementais, em blocos e SQL com as funções
+pandas de `src/`; os tempos ficam nos scripts de `benchmarks/`.
+"""
+import pytest
+
+from benchmarks.synthetic import make_combats, make_pokemon
+
+N_POKEMON = 120
+N_BATTLES = 20_000
+# Id presente nos combates e ausente na tabela de Pokémon (como o id 63 dos dados reais)
+MISSING_ID = N_POKEMON + 1
+SEED = 7
+
+
+@pytest.fixture(scope="session")
+def df_pokemon():
+    return make_pokemon(N_POKEMON, seed=SEED)
+
+
+@pytest.fixture(scope="session")
+def df_combat(df_pokemon):
+    return make_combats(df_pokemon, N_BATTLES, seed=SEED, missing_ids=(MISSING_ID,))
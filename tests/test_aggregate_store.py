@@ -0,0 +1,53 @@
+from benchmarks.bench_aggregate_store import check_parity
+from benchmarks.synthetic import make_pokemon
+from src.aggregate_store import AGGREGATES_FILE, CombatAggregates, refresh_aggregates
+from src.analysis_types import build_type_index
+
+
+def test_refresh_in_batches_matches_full_recompute(df_pokemon, df_combat, tmp_path):
+    path = str(tmp_path / AGGREGATES_FILE)
+    cuts = [1, 37, 5_000, 5_001, 12_345, len(df_combat)]
+    applied_total = 0
+    for end in cuts:
+        aggregates, applied = refresh_aggregates(df_pokemon, df_combat.iloc[:end], path)
+        applied_total += applied
+        check_parity(aggregates, df_pokemon, df_combat.iloc[:end])
+    # Cada combate é aplicado uma única vez
+    assert applied_total == len(df_combat)
+
+
+def test_refresh_without_new_battles_applies_nothing(df_pokemon, df_combat, tmp_path):
+    path = str(tmp_path / AGGREGATES_FILE)
+    refresh_aggregates(df_pokemon, df_combat, path)
+    aggregates, applied = refresh_aggregates(df_pokemon, df_combat, path)
+    assert applied == 0
+    check_parity(aggregates, df_pokemon, df_combat)
+
+
+def test_rewritten_log_is_recomputed(df_pokemon, df_combat, tmp_path):
+    path = str(tmp_path / AGGREGATES_FILE)
+    refresh_aggregates(df_pokemon, df_combat.iloc[:8_000], path)
+
+    df_rewritten = df_combat.iloc[:10_000].assign(battle_id=lambda df: df['battle_id'] + 10**6)
+    aggregates, applied = refresh_aggregates(df_pokemon, df_rewritten, path)
+    assert applied == len(df_rewritten)
+    check_parity(aggregates, df_pokemon, df_rewritten)
+
+
+def test_snapshot_with_other_type_index_rebuilds_type_totals(df_pokemon, df_combat, tmp_path):
+    path = str(tmp_path / AGGREGATES_FILE)
+    refresh_aggregates(df_pokemon, df_combat, path)
+
+    # Mesmos ids, tipos sorteados de novo
+    df_retyped = df_pokemon.assign(types=make_pokemon(len(df_pokemon), seed=99)['types'])
+    aggregates = CombatAggregates.load(path, build_type_index(df_retyped))
+    assert aggregates is not None
+    check_parity(aggregates, df_retyped, df_combat)
+
+
+def test_win_histogram_counts_participants(df_pokemon, df_combat):
+    aggregates = CombatAggregates(build_type_index(df_pokemon)).apply_delta(df_combat)
+    stats = aggregates.combat_stats()
+    assert aggregates.win_histogram.sum() == (stats['total'] > 0).sum()
+    assert aggregates.rows == len(df_combat)
+    assert aggregates.last_battle_id == int(df_combat['battle_id'].iloc[-1])
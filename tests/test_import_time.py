@@ -0,0 +1,10 @@
+from benchmarks.check_import_time import LAZY_MODULES, app_src_modules, measure
+
+
+def test_app_modules_do_not_import_lazy_dependencies():
+    modules = app_src_modules()
+    assert modules
+    imported = measure(modules)
+    eager = sorted(name for name in imported for lazy in LAZY_MODULES
+                   if name == lazy or name.startswith(f"{lazy}."))
+    assert not eager, f"dependências de carga sob demanda importadas pelo app: {eager}"
@@ -0,0 +1,84 @@
+import threading
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+from src.instrumentation import collect_records, get_records, instrumented, record_count
+from src.scheduler import Stage, run_stages
+
+calls = []
+
+
+@instrumented(cache=st.cache_data)
+def cached_total(df):
+    calls.append('cached_total')
+    return int(df['value'].sum())
+
+
+@instrumented(cache=st.cache_data)
+def cached_report(df):
+    calls.append('cached_report')
+    return cached_total(df) * 2
+
+
+@instrumented
+def uncached_total(df):
+    return int(df['value'].sum())
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    cached_total.clear()
+    cached_report.clear()
+    calls.clear()
+
+
+def frame(n_rows):
+    return pd.DataFrame({'value': range(n_rows)})
+
+
+def test_miss_then_hit():
+    with collect_records() as records:
+        assert cached_total(frame(10)) == 45
+        assert cached_total(frame(10)) == 45
+        cached_total(frame(20))
+
+    assert calls == ['cached_total', 'cached_total']
+    assert [record['cache'] for record in records] == ['miss', 'hit', 'miss']
+    assert [record['input_rows'] for record in records] == [10, 10, 20]
+    assert {record['stage'] for record in records} == {'cached_total'}
+
+
+def test_nested_calls_are_recorded_only_on_miss():
+    with collect_records() as records:
+        cached_report(frame(10))
+        cached_report(frame(10))
+
+    # A chamada interna só roda (e só é registrada) na falta do cache externo
+    assert [(record['stage'], record['cache']) for record in records] == [
+        ('cached_total', 'miss'), ('cached_report', 'miss'), ('cached_report', 'hit')]
+
+
+def test_uncached_function_has_no_cache_result():
+    with collect_records() as records:
+        uncached_total(frame(5))
+    assert [record['cache'] for record in records] == [None]
+
+
+def test_collector_sees_only_its_own_run():
+    start = record_count()
+    cached_total(frame(3))
+    with collect_records() as records:
+        cached_total(frame(3))
+
+        # As etapas do run_stages rodam em threads com uma cópia do contexto e entram no coletor
+        list(run_stages([Stage('total', lambda: cached_total(frame(4)))]))
+
+        # Uma execução simultânea, fora do contexto, não entra
+        other = threading.Thread(target=cached_total, args=(frame(5),))
+        other.start()
+        other.join()
+
+    assert [(record['input_rows'], record['cache']) for record in records] == [(3, 'hit'), (4, 'miss')]
+    assert [record['input_rows'] for record in get_records(since=start)] == [3, 3, 4, 5]
@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.bench_sql_backend import check_parity
+from src.sql_backend import ENGINES, SqlBackend
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+    return request.param
+
+
+def test_queries_match_pandas(engine, df_pokemon, df_combat):
+    backend = SqlBackend(df_pokemon, df_combat, engine=engine)
+    try:
+        check_parity(backend, df_pokemon, df_combat)
+    finally:
+        backend.close()
+
+
+def test_queries_match_pandas_on_partial_log(engine, df_pokemon, df_combat):
+    # Poucos combates: parte dos Pokémon e dos tipos fica sem nenhum combate
+    df_head = df_combat.iloc[:50].reset_index(drop=True)
+    backend = SqlBackend(df_pokemon, df_head, engine=engine)
+    try:
+        check_parity(backend, df_pokemon, df_head)
+    finally:
+        backend.close()
@@ -0,0 +1,96 @@
+import fastparquet
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_aggregate_store import check_parity
+from src import columnar_cache
+from src.analysis_utils import difference_features
+from src.columnar_cache import write_parquet
+from src.combat_sync import COMBAT_COLUMNS, empty_checkpoint, write_checkpoint
+from src.streaming import iter_combat_chunks, stream_aggregates
+
+CHUNK_SIZES = [1_000, 4_096, 50_000]
+# Grupos menores que o padrão, para que os arquivos de `write_parquet` tenham vários grupos
+ROW_GROUP_SIZE = 3_000
+EXCEL_BATTLES = 2_000
+
+
+def write_single_group(tmp_path, df_combat):
+    # Padrão do fastparquet.write: um único grupo, colunas em PLAIN sem compressão
+    path = str(tmp_path / "single.parquet")
+    fastparquet.write(path, df_combat)
+    assert len(fastparquet.ParquetFile(path).row_groups) == 1
+    return path
+
+
+def write_snappy_single_group(tmp_path, df_combat):
+    # Grupo único comprimido: não dá para fatiar, é lido inteiro
+    path = str(tmp_path / "snappy.parquet")
+    fastparquet.write(path, df_combat, compression="SNAPPY")
+    return path
+
+
+def write_row_groups(tmp_path, df_combat):
+    path = str(tmp_path / "groups.parquet")
+    write_parquet(df_combat, path)
+    assert len(fastparquet.ParquetFile(path).row_groups) > 1
+    return path
+
+
+def write_store(tmp_path, df_combat):
+    store_dir = tmp_path / "combat_store"
+    store_dir.mkdir()
+    checkpoint = empty_checkpoint()
+    middle = len(df_combat) // 2
+    for index, part in enumerate([df_combat.iloc[:middle], df_combat.iloc[middle:]]):
+        name = f"part-{index:05d}.parquet"
+        write_parquet(part.reset_index(drop=True), str(store_dir / name))
+        checkpoint['parts'].append(name)
+    write_checkpoint(str(store_dir), checkpoint)
+    return str(store_dir)
+
+
+WRITERS = [write_single_group, write_snappy_single_group, write_row_groups, write_store]
+
+
+@pytest.fixture(params=WRITERS, ids=lambda writer: writer.__name__)
+def source(request, tmp_path, df_combat, monkeypatch):
+    monkeypatch.setattr(columnar_cache, 'PARQUET_ROW_GROUP_SIZE', ROW_GROUP_SIZE)
+    return request.param(tmp_path, df_combat)
+
+
+def assert_chunks_match(source, df_combat, chunk_size):
+    chunks = list(iter_combat_chunks(source, chunk_size))
+    sizes = [len(chunk) for chunk in chunks]
+    assert all(size == chunk_size for size in sizes[:-1])
+    assert 0 < sizes[-1] <= chunk_size
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True),
+                                  df_combat[COMBAT_COLUMNS].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_parquet_chunks_match_source(source, df_combat, chunk_size):
+    assert_chunks_match(source, df_combat, chunk_size)
+
+
+def test_excel_chunks_match_source(tmp_path, df_combat):
+    df_head = df_combat.iloc[:EXCEL_BATTLES]
+    path = str(tmp_path / "combats.xlsx")
+    df_head.to_excel(path, index=False)
+    assert_chunks_match(path, df_head, 300)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_stream_aggregates_match_batch(source, df_pokemon, df_combat, chunk_size):
+    aggregates, moments = stream_aggregates(df_pokemon, source, chunk_size)
+    check_parity(aggregates, df_pokemon, df_combat)
+
+    # Momentos das features de diferença contra o cálculo sobre todos os combates
+    _, diffs, p1_won = difference_features(df_pokemon, df_combat)
+    diffs = diffs.astype(np.float64)
+    summary = moments.summary()
+    for outcome, label in [(1, 'venceu'), (0, 'perdeu')]:
+        rows = diffs[p1_won == outcome]
+        np.testing.assert_allclose(summary[f'Média (P1 {label})'], rows.mean(axis=0))
+        np.testing.assert_allclose(summary[f'Desvio (P1 {label})'], rows.std(axis=0), atol=1e-9)